@@ -0,0 +1,169 @@
+#! /usr/bin/python3
+#
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2023 MBition GmbH
+#
+# Micro benchmark for decoding only a few parameters of a large
+# response. The response is synthetic: It reads a data identifier
+# (UDS service 0x22) whose data record consists of a variable-length
+# byte field followed by a large number of scaled 16 bit values.
+import argparse
+import timeit
+from typing import List
+
+from odxtools.compumethods import IdenticalCompuMethod, LinearCompuMethod
+from odxtools.dataobjectproperty import DataObjectProperty
+from odxtools.diagcodedtypes import LeadingLengthInfoType, StandardLengthType
+from odxtools.odxlink import OdxDocFragment, OdxLinkDatabase, OdxLinkId, OdxLinkRef
+from odxtools.odxtypes import DataType
+from odxtools.parameters import CodedConstParameter, Parameter, ValueParameter
+from odxtools.physicaltype import PhysicalType
+from odxtools.structures import Response
+
+doc_frags = [OdxDocFragment("projectionbenchmark", "CONTAINER")]
+
+
+def uint_type(bit_length: int) -> StandardLengthType:
+    return StandardLengthType(
+        base_data_type="A_UINT32",
+        base_type_encoding=None,
+        bit_length=bit_length,
+        bit_mask=None,
+        is_condensed_raw=None,
+        is_highlow_byte_order_raw=None,
+    )
+
+
+def create_response(num_values: int) -> Response:
+    """Create a positive response featuring a given number of
+    scaled values"""
+    odxlinks = OdxLinkDatabase()
+    value_dop = DataObjectProperty(
+        odx_id=OdxLinkId("DOP.value", doc_frags),
+        short_name="value",
+        long_name=None,
+        description=None,
+        is_visible_raw=None,
+        diag_coded_type=uint_type(16),
+        physical_type=PhysicalType(DataType.A_FLOAT64, display_radix=None, precision=None),
+        compu_method=LinearCompuMethod(
+            offset=-40,
+            factor=0.25,
+            denominator=1,
+            internal_type=DataType.A_UINT32,
+            physical_type=DataType.A_FLOAT64,
+            internal_lower_limit=None,
+            internal_upper_limit=None,
+        ),
+        unit_ref=None,
+        sdgs=[],
+    )
+    bytes_dop = DataObjectProperty(
+        odx_id=OdxLinkId("DOP.bytes", doc_frags),
+        short_name="bytes",
+        long_name=None,
+        description=None,
+        is_visible_raw=None,
+        diag_coded_type=LeadingLengthInfoType(
+            base_data_type="A_BYTEFIELD",
+            bit_length=8,
+            base_type_encoding=None,
+            is_highlow_byte_order_raw=None,
+        ),
+        physical_type=PhysicalType(DataType.A_BYTEFIELD, display_radix=None, precision=None),
+        compu_method=IdenticalCompuMethod(
+            internal_type=DataType.A_BYTEFIELD, physical_type=DataType.A_BYTEFIELD),
+        unit_ref=None,
+        sdgs=[],
+    )
+    odxlinks.update({value_dop.odx_id: value_dop, bytes_dop.odx_id: bytes_dop})
+
+    def value_param(short_name: str, dop: DataObjectProperty) -> ValueParameter:
+        return ValueParameter(
+            short_name=short_name,
+            long_name=None,
+            description=None,
+            semantic=None,
+            dop_ref=OdxLinkRef.from_id(dop.odx_id),
+            dop_snref=None,
+            physical_default_value_raw=None,
+            byte_position=None,
+            bit_position=None,
+            sdgs=[],
+        )
+
+    parameters: List[Parameter] = [
+        CodedConstParameter(
+            short_name="sid",
+            long_name=None,
+            description=None,
+            semantic=None,
+            diag_coded_type=uint_type(8),
+            coded_value=0x62,
+            byte_position=None,
+            bit_position=None,
+            sdgs=[],
+        ),
+        CodedConstParameter(
+            short_name="did",
+            long_name=None,
+            description=None,
+            semantic=None,
+            diag_coded_type=uint_type(16),
+            coded_value=0x1234,
+            byte_position=None,
+            bit_position=None,
+            sdgs=[],
+        ),
+        value_param("vin_fragment", bytes_dop),
+    ]
+    parameters += [value_param(f"value_{i:03d}", value_dop) for i in range(num_values)]
+    for param in parameters:
+        param._resolve_references(None, odxlinks)  # type: ignore[arg-type]
+
+    return Response(
+        odx_id=OdxLinkId("PR.read_1234", doc_frags),
+        short_name="read_1234_pr",
+        long_name=None,
+        description=None,
+        is_visible_raw=None,
+        response_type="POS-RESPONSE",
+        parameters=parameters,
+        byte_size=None,
+    )
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(
+        description="Compare the time required to decode all parameters of a large response "
+        "to the time required to decode a few of them.")
+    argparser.add_argument(
+        "-v",
+        "--values",
+        type=int,
+        default=200,
+        help="Number of values of the response (default: 200)",
+    )
+    argparser.add_argument(
+        "-n",
+        "--number",
+        type=int,
+        default=2000,
+        help="Number of iterations of each benchmark (default: 2000)",
+    )
+    args = argparser.parse_args()
+
+    response = create_response(args.values)
+    message = bytes([0x62, 0x12, 0x34, 0x03, 0x41, 0x42, 0x43]) + bytes(2 * args.values)
+    selections = [
+        ("full decode", None),
+        ("did + first value", ["did", "value_000"]),
+        ("did + middle value", ["did", f"value_{args.values // 2:03d}"]),
+        ("did + last value", ["did", f"value_{args.values - 1:03d}"]),
+    ]
+    for name, fields in selections:
+        seconds = min(
+            timeit.repeat(
+                lambda: response.decode(message, fields=fields), number=args.number, repeat=3))
+        usec_per_message = 1e6 * seconds / args.number
+        print(f"{name:>20s}: {usec_per_message:8.2f} us per message")
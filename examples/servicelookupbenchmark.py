@@ -0,0 +1,195 @@
+#! /usr/bin/python3
+#
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2023 MBition GmbH
+#
+# Micro benchmark for looking up the services of diagnostic layers
+# featuring a large number of services. The layer is synthetic: Each
+# service reads a single data identifier (UDS service 0x22).
+import argparse
+import random
+import time
+import timeit
+from typing import Any, Callable, List, Tuple
+
+from odxtools.diagcodedtypes import StandardLengthType
+from odxtools.diaglayer import DiagLayer
+from odxtools.diaglayertype import DIAG_LAYER_TYPE
+from odxtools.odxlink import OdxDocFragment, OdxLinkId
+from odxtools.parameters import CodedConstParameter, MatchingRequestParameter
+from odxtools.service import DiagService
+from odxtools.structures import Request, Response
+
+doc_frags = [OdxDocFragment("servicelookupbenchmark", "CONTAINER")]
+
+
+def uint_type(bit_length: int) -> StandardLengthType:
+    return StandardLengthType(
+        base_data_type="A_UINT32",
+        base_type_encoding=None,
+        bit_length=bit_length,
+        bit_mask=None,
+        is_condensed_raw=None,
+        is_highlow_byte_order_raw=None,
+    )
+
+
+def coded_const(short_name: str, bit_length: int, coded_value: int) -> CodedConstParameter:
+    return CodedConstParameter(
+        short_name=short_name,
+        long_name=None,
+        description=None,
+        semantic=None,
+        diag_coded_type=uint_type(bit_length),
+        coded_value=coded_value,
+        byte_position=None,
+        bit_position=None,
+        sdgs=[],
+    )
+
+
+def matching_request(short_name: str, request_byte_position: int,
+                     byte_length: int) -> MatchingRequestParameter:
+    return MatchingRequestParameter(
+        short_name=short_name,
+        long_name=None,
+        description=None,
+        semantic=None,
+        request_byte_position=request_byte_position,
+        byte_length=byte_length,
+        byte_position=None,
+        bit_position=None,
+        sdgs=[],
+    )
+
+
+def create_layer(num_services: int) -> DiagLayer:
+    """Create a diag layer with a given number of services which
+    read a data identifier each"""
+    neg_response = Response(
+        odx_id=OdxLinkId("NR.generic", doc_frags),
+        short_name="generic_nr",
+        long_name=None,
+        description=None,
+        is_visible_raw=None,
+        response_type="NEG-RESPONSE",
+        parameters=[coded_const("sid", 8, 0x7F),
+                    matching_request("rq_sid", 0, 1)],
+        byte_size=None,
+    )
+
+    requests: List[Request] = []
+    pos_responses: List[Response] = []
+    services: List[DiagService] = []
+    for did in range(num_services):
+        request = Request(
+            odx_id=OdxLinkId(f"RQ.read_{did:04x}", doc_frags),
+            short_name=f"read_{did:04x}_rq",
+            long_name=None,
+            description=None,
+            is_visible_raw=None,
+            parameters=[coded_const("sid", 8, 0x22),
+                        coded_const("did", 16, did)],
+            byte_size=None,
+        )
+        pos_response = Response(
+            odx_id=OdxLinkId(f"PR.read_{did:04x}", doc_frags),
+            short_name=f"read_{did:04x}_pr",
+            long_name=None,
+            description=None,
+            is_visible_raw=None,
+            response_type="POS-RESPONSE",
+            parameters=[
+                coded_const("sid", 8, 0x62),
+                matching_request("did", 1, 2),
+                coded_const("data", 8, did % 256),
+            ],
+            byte_size=None,
+        )
+        service = DiagService(
+            odx_id=OdxLinkId(f"DC.read_{did:04x}", doc_frags),
+            short_name=f"read_{did:04x}",
+            long_name=None,
+            description=None,
+            admin_data=None,
+            semantic=None,
+            audience=None,
+            functional_class_refs=[],
+            pre_condition_state_refs=[],
+            state_transition_refs=[],
+            request=request,
+            positive_responses=[pos_response],
+            negative_responses=[neg_response],
+            sdgs=[],
+        )
+        requests.append(request)
+        pos_responses.append(pos_response)
+        services.append(service)
+
+    return DiagLayer(
+        variant_type=DIAG_LAYER_TYPE.BASE_VARIANT,
+        odx_id=OdxLinkId("BV.servicelookupbenchmark", doc_frags),
+        short_name="servicelookupbenchmark",
+        long_name=None,
+        description=None,
+        parent_refs=[],
+        communication_parameters=[],
+        services=services,
+        requests=requests,
+        positive_responses=pos_responses,
+        negative_responses=[neg_response],
+        single_ecu_jobs=[],
+        diag_comm_refs=[],
+        diag_data_dictionary_spec=None,
+        additional_audiences=[],
+        functional_classes=[],
+        states=[],
+        state_transitions=[],
+        import_refs=[],
+        sdgs=[],
+    )
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(
+        description="Measure the time required to find the services of a large diag layer.")
+    argparser.add_argument(
+        "-s",
+        "--services",
+        type=int,
+        default=2048,
+        help="Number of services of the diag layer (default: 2048)",
+    )
+    argparser.add_argument(
+        "-n",
+        "--number",
+        type=int,
+        default=20000,
+        help="Number of messages to look up (default: 20000)",
+    )
+    args = argparser.parse_args()
+
+    dl = create_layer(args.services)
+
+    start = time.perf_counter()
+    dl.finalize_init()
+    print(f"finalize_init (including prepare): {time.perf_counter() - start:.3f} s")
+    print(f"trie statistics: {dl.service_prefix_trie.statistics}")
+
+    rng = random.Random(42)
+    requests = [
+        bytes([0x22, *rng.randrange(args.services).to_bytes(2, "big")]) for _ in range(1000)
+    ]
+    responses = [bytes([0x62, *rq[1:], rq[2]]) for rq in requests]
+
+    benchmarks: List[Tuple[str, List[bytes], Callable[[bytes], Any]]] = [
+        ("find services", requests, dl._find_services_for_uds),
+        ("decode request", requests, dl.decode),
+        ("decode response", responses, dl.decode),
+    ]
+    for name, messages, func in benchmarks:
+        num_rounds = max(1, args.number // len(messages))
+        seconds = min(
+            timeit.repeat(lambda: [func(m) for m in messages], number=num_rounds, repeat=3))
+        usec_per_message = 1e6 * seconds / (num_rounds * len(messages))
+        print(f"{name:>20s}: {usec_per_message:8.2f} us per message")
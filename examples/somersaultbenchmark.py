@@ -0,0 +1,134 @@
+#! /usr/bin/python3
+#
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2023 MBition GmbH
+#
+# Micro benchmarks for the decoding and encoding of the messages of
+# the somersault ECU
+import argparse
+import pathlib
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+
+import odxtools
+from odxtools.codingpolicy import CODING_POLICIES, coding_policy
+from odxtools.decodecache import DecodeCache
+
+somersault_pdx = pathlib.Path(__file__).parent / "somersault.pdx"
+
+
+def somersault_telegrams(ecu: odxtools.DiagLayer) -> List[Tuple[bytes, bytes]]:
+    """Return a list of (request, positive response) telegrams
+    which can be decoded using the given ECU variant."""
+    services = ecu.services
+    rq_params: Dict[str, Dict[str, Any]] = {
+        "do_forward_flips": {
+            "forward_soberness_check": 0x12,
+            "num_flips": 3
+        },
+        "report_status": {},
+        "session_start": {},
+    }
+    rsp_params: Dict[str, Dict[str, Any]] = {
+        "do_forward_flips": {},
+        "report_status": {
+            "dizzyness_level": 42,
+            "happiness_level": 100
+        },
+        "session_start": {
+            "can_do_backward_flips": "false"
+        },
+    }
+
+    result = []
+    for service_name, params in rq_params.items():
+        service = services[service_name]
+        assert isinstance(service, odxtools.DiagService)
+        assert service.positive_responses is not None
+        request = bytes(service.encode_request(**params))
+        response = bytes(service.positive_responses[0].encode(request, **rsp_params[service_name]))
+        result.append((request, response))
+
+    return result
+
+
+def bench_decode(ecu: odxtools.DiagLayer, telegrams: List[Tuple[bytes, bytes]]) -> None:
+    for request, _ in telegrams:
+        ecu.decode(request)
+
+
+def bench_decode_response(ecu: odxtools.DiagLayer, telegrams: List[Tuple[bytes, bytes]]) -> None:
+    for request, response in telegrams:
+        ecu.decode_response(response, request)
+
+
+decode_cache = DecodeCache()
+
+
+def bench_decode_cached(ecu: odxtools.DiagLayer, telegrams: List[Tuple[bytes, bytes]]) -> None:
+    ecu.decode_cache = decode_cache
+    for request, response in telegrams:
+        ecu.decode(request)
+        ecu.decode_response(response, request)
+    ecu.decode_cache = None
+
+
+def bench_encode(ecu: odxtools.DiagLayer, telegrams: List[Tuple[bytes, bytes]]) -> None:
+    ecu.services["do_forward_flips"](forward_soberness_check=0x12, num_flips=3)
+    ecu.services["report_status"]()
+    ecu.services["session_start"]()
+
+
+BENCHMARKS: Dict[str, Callable[[odxtools.DiagLayer, List[Tuple[bytes, bytes]]], None]] = {
+    "decode": bench_decode,
+    "decode_response": bench_decode_response,
+    "decode_cached": bench_decode_cached,
+    "encode": bench_encode,
+}
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(
+        description="Measure the time required to decode and encode the somersault telegrams.")
+    argparser.add_argument(
+        "benchmarks",
+        metavar="BENCHMARK",
+        nargs="*",
+        choices=[[], *BENCHMARKS.keys()],
+        help=f"The benchmarks to run (default: all of {', '.join(BENCHMARKS.keys())})",
+    )
+    argparser.add_argument(
+        "-n",
+        "--number",
+        type=int,
+        default=2000,
+        help="Number of iterations of each benchmark (default: 2000)",
+    )
+    argparser.add_argument(
+        "--conversion-tables",
+        action="store_true",
+        help="Precompute the conversion tables of the DOPs before running the benchmarks",
+    )
+    argparser.add_argument(
+        "-p",
+        "--policies",
+        nargs="+",
+        choices=CODING_POLICIES.keys(),
+        default=["permissive"],
+        help="The coding policies for which the benchmarks are run (default: permissive)",
+    )
+    args = argparser.parse_args()
+
+    db = odxtools.load_pdx_file(str(somersault_pdx))
+    ecu = db.ecus.somersault_lazy
+    if args.conversion_tables:
+        ecu.build_conversion_tables()
+    telegrams = somersault_telegrams(ecu)
+
+    for policy in args.policies:
+        with coding_policy(policy):
+            for name in args.benchmarks or BENCHMARKS.keys():
+                bench = BENCHMARKS[name]
+                seconds = min(
+                    timeit.repeat(lambda: bench(ecu, telegrams), number=args.number, repeat=3))
+                usec_per_telegram = 1e6 * seconds / (args.number * len(telegrams))
+                print(f"{policy:>10s} {name:>20s}: {usec_per_telegram:8.2f} us per telegram")
@@ -0,0 +1,82 @@
+#! /usr/bin/python3
+#
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2023 MBition GmbH
+#
+# Micro benchmark for decoding variable-length strings and byte
+# fields, i.e., values which are coded using a min-max length type
+# and which are terminated by a zero byte or by 0xFF.
+import argparse
+import timeit
+from typing import List, Tuple
+
+from odxtools.decodestate import DecodeState
+from odxtools.diagcodedtypes import MinMaxLengthType
+
+CASES: List[Tuple[str, str, str, int]] = [
+    # (name, base data type, termination, length of a character)
+    ("ASCII, ZERO", "A_ASCIISTRING", "ZERO", 1),
+    ("UTF-8, ZERO", "A_UTF8STRING", "ZERO", 1),
+    ("UTF-16, ZERO", "A_UNICODE2STRING", "ZERO", 2),
+    ("bytes, HEX-FF", "A_BYTEFIELD", "HEX-FF", 1),
+]
+
+
+def create_message(base_data_type: str, termination: str, length: int) -> bytes:
+    """Create a message which consists of a one byte service ID, a
+    terminated value of a given number of characters and a few
+    trailing bytes"""
+    if base_data_type == "A_BYTEFIELD":
+        value = bytes(i % 0xFF for i in range(length))
+    elif base_data_type == "A_UNICODE2STRING":
+        # use characters whose coded form contains zero bytes
+        value = "".join(chr(0x100 + i % 26) for i in range(length)).encode("utf-16-be")
+    else:
+        value = "".join(chr(ord("A") + i % 26) for i in range(length)).encode("ascii")
+
+    char_length = 2 if base_data_type == "A_UNICODE2STRING" else 1
+    termination_char = bytes([0x00 if termination == "ZERO" else 0xFF] * char_length)
+    return bytes([0x62]) + value + termination_char + bytes([0x12, 0x34])
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(
+        description="Measure the throughput of decoding terminated strings and byte fields.")
+    argparser.add_argument(
+        "-l",
+        "--lengths",
+        type=int,
+        nargs="+",
+        default=[17, 256, 4096],
+        help="Numbers of characters of the decoded values (default: 17 256 4096)",
+    )
+    argparser.add_argument(
+        "-n",
+        "--number",
+        type=int,
+        default=2000,
+        help="Number of iterations of each benchmark (default: 2000)",
+    )
+    args = argparser.parse_args()
+
+    for name, base_data_type, termination, char_length in CASES:
+        dct = MinMaxLengthType(
+            base_data_type=base_data_type,
+            base_type_encoding=None,
+            min_length=0,
+            max_length=None,
+            termination=termination,
+            is_highlow_byte_order_raw=None,
+        )
+        for length in args.lengths:
+            message = create_message(base_data_type, termination, length)
+            decode_state = DecodeState(message, [], next_byte_position=1)
+            seconds = min(
+                timeit.repeat(
+                    lambda: dct.convert_bytes_to_internal(decode_state),
+                    number=args.number,
+                    repeat=3))
+            usec_per_value = 1e6 * seconds / args.number
+            mbytes_per_second = length * char_length * args.number / seconds / 1e6
+            print(f"{name:>15s}, {length:5d} chars: {usec_per_value:8.2f} us per value, "
+                  f"{mbytes_per_second:8.2f} MB/s")
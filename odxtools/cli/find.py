@@ -27,8 +27,9 @@ def get_display_value(v, _param):
 def print_decoded_message(service: DiagService, message: bytes):
     decoded = service.decode_message(message)
     print(f"\nDecoded {decoded.structure}:")
+    parameter_index = decoded.structure.layout.parameter_index
     for k, v in decoded.param_dict.items():
-        param = decoded.structure.parameter_dict()[k]
+        param = parameter_index[k].parameter
         print(f"\t{k}: {get_display_value(v, param)}")
     pass
 
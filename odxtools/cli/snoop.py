@@ -29,19 +29,39 @@ def handle_telegram(telegram_id, payload):
     global last_request
 
     if telegram_id == ecu_tx_id:
-        if uds.is_reponse_pending(payload):
+        if odx_diag_layer is None:
+            if uds.is_reponse_pending(payload):
+                print(f" -> response pending")
+            else:
+                print(f" -> unrecognized response of {len(payload)} bytes length: "
+                      f"0x{payload.hex()}")
+            return
+
+        # negative responses are classified without decoding them. The
+        # structured decode is only done if the diag layer specifies a
+        # matching negative response.
+        negative_response = odx_diag_layer.classify_negative_response(payload)
+        if negative_response is not None and negative_response.is_response_pending:
             print(f" -> response pending")
             return
 
         decoded_message = None
         if last_request is not None:
             try:
-                decoded_message = odx_diag_layer.decode_response(payload, last_request)[0]
+                if negative_response is None:
+                    decoded_message = odx_diag_layer.decode_response(payload, last_request)[0]
+                elif len(negative_response.candidates) > 0:
+                    decoded_message = negative_response.decode(last_request)[0]
             except odxtools.DecodeError:
                 pass
 
         if decoded_message is not None:
             print(f" -> {decoded_message}")
+        elif negative_response is not None:
+            nrc = negative_response.nrc
+            nrc_name = nrc.name if nrc is not None else "unknown"
+            print(f" -> negative response to service 0x{negative_response.request_sid:02x}: "
+                  f"{nrc_name} (0x{negative_response.response_code:02x})")
         else:
             print(f" -> unrecognized response of {len(payload)} bytes length: "
                   f"0x{payload.hex()}")
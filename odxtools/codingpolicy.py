@@ -0,0 +1,102 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2022 MBition GmbH
+import warnings
+from contextlib import contextmanager
+from typing import Dict, Iterator, NamedTuple, Union
+
+from .exceptions import DecodeError, EncodeError, OdxWarning
+
+
+class CodingPolicy(NamedTuple):
+    """Specifies how thoroughly messages are checked while they are
+    decoded or encoded.
+
+    Three policies are predefined:
+
+    * `STRICT`: Inconsistencies, e.g., constant parameters which do
+      not match, trailing bytes of decoded messages or encoded
+      messages which do not exhibit the expected length, raise a
+      `DecodeError` or an `EncodeError`.
+    * `PERMISSIVE` (the default): Inconsistencies are reported using
+      `warnings.warn()`. Note that `DecodeError` warnings are turned
+      into exceptions by default (see `odxtools.exceptions`).
+    * `FAST`: The checks which do not influence the result are
+      skipped, and no debug messages are formatted. This is intended
+      for bulk decoding of traces which are known to be valid.
+      Constant parameters are still checked because they are
+      required to determine the service of a message.
+    """
+
+    name: str
+    raise_errors: bool
+    """Raise exceptions instead of issuing warnings"""
+    check_consistency: bool
+    """Check for trailing bytes, non-zero reserved bits and the
+    length or overlapping parameters of encoded messages"""
+    debug_logging: bool
+    """Format the debug messages of the encoder"""
+
+    def report_decode_error(self, message: str) -> None:
+        """Report an inconsistency of a decoded message"""
+        if self.raise_errors:
+            raise DecodeError(message)
+        warnings.warn(message, DecodeError, stacklevel=3)
+
+    def report_encode_error(self, message: str) -> None:
+        """Report an inconsistency of an encoded message"""
+        if self.raise_errors:
+            raise EncodeError(message)
+        warnings.warn(message, OdxWarning, stacklevel=3)
+
+
+STRICT = CodingPolicy(name="strict", raise_errors=True, check_consistency=True, debug_logging=True)
+PERMISSIVE = CodingPolicy(
+    name="permissive", raise_errors=False, check_consistency=True, debug_logging=True)
+FAST = CodingPolicy(name="fast", raise_errors=False, check_consistency=False, debug_logging=False)
+
+CODING_POLICIES: Dict[str, CodingPolicy] = {p.name: p for p in (STRICT, PERMISSIVE, FAST)}
+
+_coding_policy = PERMISSIVE
+
+
+def get_coding_policy() -> CodingPolicy:
+    """Return the policy which is currently used for decoding and
+    encoding messages"""
+    return _coding_policy
+
+
+def set_coding_policy(policy: Union[CodingPolicy, str]) -> CodingPolicy:
+    """Set the policy for decoding and encoding messages.
+
+    The policy may be specified by its name. The previous policy is
+    returned. Note that the policy is global, i.e., it applies to
+    all threads.
+    """
+    global _coding_policy
+
+    if isinstance(policy, str):
+        if policy not in CODING_POLICIES:
+            raise ValueError(f"Unknown coding policy '{policy}'. Valid policies are "
+                             f"{', '.join(CODING_POLICIES)}")
+        policy = CODING_POLICIES[policy]
+
+    previous_policy = _coding_policy
+    _coding_policy = policy
+    return previous_policy
+
+
+@contextmanager
+def coding_policy(policy: Union[CodingPolicy, str]) -> Iterator[CodingPolicy]:
+    """Temporarily use a given policy for decoding and encoding:
+
+    .. code-block:: python
+
+        with coding_policy("fast"):
+            for request, response in trace:
+                ecu.decode_response(response, request)
+    """
+    previous_policy = set_coding_policy(policy)
+    try:
+        yield get_coding_policy()
+    finally:
+        set_coding_policy(previous_policy)
@@ -8,7 +8,7 @@ into the internal type and vice versa.
 All compu methods inherit from the abstract base class CompuMethod.
 Each category is represented by a different sub class.
 """
-from .compumethodbase import CompuMethod
+from .compumethodbase import NOT_CONVERTIBLE, CompuMethod
 from .compurationalcoeffs import CompuRationalCoeffs
 from .compuscale import CompuScale
 from .createanycompumethod import create_any_compu_method_from_et
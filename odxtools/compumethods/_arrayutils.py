@@ -0,0 +1,54 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2022 MBition GmbH
+"""Helper functions for the conversion of NumPy arrays by compu methods.
+
+NumPy is an optional dependency of odxtools. The functions of this
+module are only called if arrays are passed to the compu methods,
+i.e., if NumPy is available.
+"""
+from typing import Any, Optional
+
+from ..odxtypes import DataType
+from .limit import Limit
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore[assignment]
+
+
+def limits_mask(values: Any, lower_limit: Optional[Limit], upper_limit: Optional[Limit]) -> Any:
+    """Return a boolean array which specifies for each value whether
+    it complies to the given limits."""
+    mask = np.ones(np.shape(values), dtype=bool)
+    if lower_limit is not None:
+        mask &= lower_limit.complies_to_lower(values)
+    if upper_limit is not None:
+        mask &= upper_limit.complies_to_upper(values)
+    return mask
+
+
+def dtype_matches(values: Any, python_type: type) -> bool:
+    """Check whether the elements of an array are considered to be of
+    the given python type by the scalar conversion functions"""
+    kind = np.asarray(values).dtype.kind
+    if python_type == int:
+        return kind in "iu"
+    elif python_type == float:
+        return kind in "iuf"
+    else:
+        return kind in "OUSV"
+
+
+def numeric_dtype(data_type: DataType) -> str:
+    """Return the NumPy dtype used for arrays of a numeric data type"""
+    return "int64" if data_type.as_python_type() == int else "float64"
+
+
+def make_array_from(data_type: DataType, values: Any) -> Any:
+    """Array version of `DataType.make_from()` for numeric types.
+
+    Like `int()`, the conversion to integer types truncates towards
+    zero.
+    """
+    return values.astype(numeric_dtype(data_type))
@@ -0,0 +1,145 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2022 MBition GmbH
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ._arrayutils import limits_mask, np
+from .limit import IntervalType, Limit
+
+Interval = Tuple[Optional[Limit], Optional[Limit]]
+
+
+def _bound(limit: Optional[Limit], infinity: float) -> Tuple[float, bool]:
+    """Return the value of a limit and whether it is closed"""
+    if limit is None or limit.interval_type == IntervalType.INFINITE:
+        return infinity, True
+    assert isinstance(limit.value, (int, float))
+    return limit.value, limit.interval_type == IntervalType.CLOSED
+
+
+def _is_inside(value: Any, lower: Any, lower_closed: bool, upper: Any, upper_closed: bool) -> bool:
+    if lower > value or (lower == value and not lower_closed):
+        return False
+    if value > upper or (value == upper and not upper_closed):
+        return False
+    return True
+
+
+class IntervalIndex:
+    """Finds the first interval of a list which contains a given value.
+
+    An interval is a pair of an optional lower and an optional upper
+    limit, i.e., a value is contained by an interval if it complies
+    to both limits. If all limits are numbers and the non-empty
+    intervals are pairwise disjoint, which is the case for almost all
+    compu methods, the intervals are sorted once and subsequently
+    looked up using a binary search. Intervals which consist of a
+    single point are additionally put into a dictionary. Otherwise,
+    the intervals are scanned linearly.
+    """
+
+    def __init__(self, intervals: Sequence[Interval]) -> None:
+        self.intervals = list(intervals)
+
+        self._points: Dict[Any, int] = {}
+        self._lowers: List[Any] = []
+        self._bounds: List[Tuple[Any, bool, Any, bool]] = []
+        self._indices: List[int] = []
+        self._arrays: Optional[Tuple[Any, ...]] = None
+        self.is_indexed = self._build_index()
+
+    def _build_index(self) -> bool:
+        entries = []
+        for i, (lower_limit, upper_limit) in enumerate(self.intervals):
+            for limit in [lower_limit, upper_limit]:
+                if limit is not None and limit.interval_type != IntervalType.INFINITE and \
+                        (not isinstance(limit.value, (int, float)) or limit.value != limit.value):
+                    return False
+            lower, lower_closed = _bound(lower_limit, float("-inf"))
+            upper, upper_closed = _bound(upper_limit, float("inf"))
+            if lower > upper or (lower == upper and not (lower_closed and upper_closed)):
+                # the interval is empty
+                continue
+            entries.append((lower, upper, i, lower_closed, upper_closed))
+
+        entries.sort()
+        for (_, upper, _, _, upper_closed), (lower, _, _, lower_closed, _) in \
+                zip(entries[:-1], entries[1:]):
+            if upper > lower or (upper == lower and upper_closed and lower_closed):
+                # the intervals overlap, so the first matching one
+                # cannot be determined by a binary search
+                return False
+
+        for lower, upper, i, lower_closed, upper_closed in entries:
+            if lower == upper:
+                self._points[lower] = i
+            self._lowers.append(lower)
+            self._bounds.append((lower, lower_closed, upper, upper_closed))
+            self._indices.append(i)
+
+        return True
+
+    def find(self, value: Any) -> int:
+        """Return the index of the first interval which contains the
+        value, or -1 if there is none."""
+        if not self.is_indexed or not isinstance(value, (int, float)) or value != value:
+            return self._find_linearly(value)
+
+        result = self._points.get(value)
+        if result is not None:
+            return result
+
+        # since the intervals are disjoint, the only candidates are
+        # the last interval which starts at or below the value and,
+        # if this one starts with an open limit at the value, its
+        # predecessor
+        pos = bisect_right(self._lowers, value) - 1
+        for candidate in range(pos, max(pos - 2, -1), -1):
+            if _is_inside(value, *self._bounds[candidate]):
+                return self._indices[candidate]
+        return -1
+
+    def _find_linearly(self, value: Any) -> int:
+        for i, (lower_limit, upper_limit) in enumerate(self.intervals):
+            if lower_limit is not None and not lower_limit.complies_to_lower(value):
+                continue
+            if upper_limit is not None and not upper_limit.complies_to_upper(value):
+                continue
+            return i
+        return -1
+
+    def find_array(self, values: Any) -> Any:
+        """Array version of `find()`"""
+        values = np.asarray(values)
+        result = np.full(values.shape, -1, dtype="int64")
+        unresolved = np.ones(values.shape, dtype=bool)
+
+        if self.is_indexed and len(self._bounds) > 0 and values.dtype.kind in "iuf":
+            if self._arrays is None:
+                self._arrays = (*(np.array(x) for x in zip(*self._bounds)), np.array(self._indices))
+            lowers, lowers_closed, uppers, uppers_closed, indices = self._arrays
+            pos = np.searchsorted(lowers, values, side="right") - 1
+            for candidates in [pos, pos - 1]:
+                candidates = np.maximum(candidates, 0)
+                lower = lowers[candidates]
+                upper = uppers[candidates]
+                is_inside = (lower < values) | ((lower == values) & lowers_closed[candidates])
+                is_inside &= (values < upper) | ((values == upper) & uppers_closed[candidates])
+                is_inside &= unresolved
+                result[is_inside] = indices[candidates[is_inside]]
+                unresolved &= ~is_inside
+            # values which are not located inside any of the indexed
+            # intervals can only be contained by an infinite interval
+            # if they are NaN
+            if values.dtype.kind == "f":
+                unresolved &= np.isnan(values)
+            else:
+                unresolved[:] = False
+
+        if unresolved.any():
+            for i, (lower_limit, upper_limit) in enumerate(self.intervals):
+                is_inside = unresolved & limits_mask(values, lower_limit, upper_limit)
+                result[is_inside] = i
+                unresolved &= ~is_inside
+
+        return result
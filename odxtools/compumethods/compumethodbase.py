@@ -1,9 +1,15 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
 import abc
-from typing import Union
+from typing import Any, Callable, Union
 
 from ..odxtypes import DataType
+from ._arrayutils import np
+
+NOT_CONVERTIBLE: Any = object()
+"""Returned by the functions created by
+`CompuMethod.compile_internal_to_physical()` for internal values
+which are invalid"""
 
 
 class CompuMethod:
@@ -26,5 +32,52 @@ class CompuMethod:
     def is_valid_internal_value(self, internal_value):
         raise NotImplementedError()
 
+    def compile_internal_to_physical(self) -> Callable[[Any], Any]:
+        """Return a function which converts internal values to
+        physical values.
+
+        Instead of raising an exception, the returned function
+        returns `NOT_CONVERTIBLE` if an internal value is invalid.
+        Compu methods override this to return a specialized function
+        into which their parameters are bound. The default
+        implementation calls `is_valid_internal_value()` and
+        `convert_internal_to_physical()`.
+        """
+        is_valid_internal_value = self.is_valid_internal_value
+        convert_internal_to_physical = self.convert_internal_to_physical
+
+        def internal_to_physical(internal_value):
+            if not is_valid_internal_value(internal_value):
+                return NOT_CONVERTIBLE
+            return convert_internal_to_physical(internal_value)
+
+        return internal_to_physical
+
+    def convert_physical_to_internal_array(self, physical_values):
+        """Convert a NumPy array of physical values to internal values.
+
+        The default implementation converts the values one by one.
+        """
+        return np.array([self.convert_physical_to_internal(x) for x in physical_values.tolist()])
+
+    def convert_internal_to_physical_array(self, internal_values):
+        """Convert a NumPy array of internal values to physical values.
+
+        The default implementation converts the values one by one.
+        """
+        return np.array([self.convert_internal_to_physical(x) for x in internal_values.tolist()])
+
+    def is_valid_physical_array(self, physical_values):
+        """Return a boolean NumPy array which specifies whether each
+        of the physical values is valid."""
+        return np.array([self.is_valid_physical_value(x) for x in physical_values.tolist()],
+                        dtype=bool)
+
+    def is_valid_internal_array(self, internal_values):
+        """Return a boolean NumPy array which specifies whether each
+        of the internal values is valid."""
+        return np.array([self.is_valid_internal_value(x) for x in internal_values.tolist()],
+                        dtype=bool)
+
     def get_valid_physical_values(self):
         return None
@@ -1,9 +1,10 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
-from typing import Union
+from typing import Any, Callable, Union
 
 from ..odxtypes import DataType
-from .compumethodbase import CompuMethod
+from ._arrayutils import dtype_matches, np
+from .compumethodbase import NOT_CONVERTIBLE, CompuMethod
 
 
 class IdenticalCompuMethod(CompuMethod):
@@ -18,8 +19,42 @@ class IdenticalCompuMethod(CompuMethod):
     def convert_internal_to_physical(self, internal_value):
         return internal_value
 
+    def compile_internal_to_physical(self) -> Callable[[Any], Any]:
+        # the types accepted by DataType.isinstance()
+        expected_type = self.internal_type.as_python_type()
+        accepted_types: Any = expected_type
+        if expected_type == float:
+            accepted_types = (int, float)
+        elif self.internal_type == DataType.A_BYTEFIELD:
+            accepted_types = (expected_type, bytearray, bytes)
+
+        def internal_to_physical(internal_value):
+            if not isinstance(internal_value, accepted_types):
+                return NOT_CONVERTIBLE
+            return internal_value
+
+        return internal_to_physical
+
+    def convert_physical_to_internal_array(self, physical_values):
+        return physical_values
+
+    def convert_internal_to_physical_array(self, internal_values):
+        return internal_values
+
     def is_valid_physical_value(self, physical_value):
         return self.physical_type.isinstance(physical_value)
 
     def is_valid_internal_value(self, internal_value):
         return self.internal_type.isinstance(internal_value)
+
+    def is_valid_physical_array(self, physical_values):
+        if physical_values.dtype.kind == "O":
+            return super().is_valid_physical_array(physical_values)
+        return np.full(physical_values.shape,
+                       dtype_matches(physical_values, self.physical_type.as_python_type()))
+
+    def is_valid_internal_array(self, internal_values):
+        if internal_values.dtype.kind == "O":
+            return super().is_valid_internal_array(internal_values)
+        return np.full(internal_values.shape,
+                       dtype_matches(internal_values, self.internal_type.as_python_type()))
@@ -1,9 +1,10 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
-from typing import Optional, Union
+from typing import Any, Callable, Optional, Union
 
 from ..odxtypes import DataType
-from .compumethodbase import CompuMethod
+from ._arrayutils import dtype_matches, limits_mask, make_array_from, np
+from .compumethodbase import NOT_CONVERTIBLE, CompuMethod
 from .limit import IntervalType, Limit
 
 
@@ -162,6 +163,62 @@ class LinearCompuMethod(CompuMethod):
         assert self.is_valid_internal_value(internal_value)
         return self._convert_internal_to_physical(internal_value)
 
+    def compile_internal_to_physical(self) -> Callable[[Any], Any]:
+        physical_python_type = self.physical_type.as_python_type()
+        if physical_python_type not in [int, float] or self.denominator is None:
+            return super().compile_internal_to_physical()
+
+        expected_type = self.internal_type.as_python_type()
+        accepted_types = (int, float) if expected_type == float else (expected_type,)
+
+        # bind the limits to local variables. Infinite limits do not
+        # need to be checked
+        lower_limit = self.internal_lower_limit
+        upper_limit = self.internal_upper_limit
+        assert lower_limit is not None and upper_limit is not None
+        has_lower = lower_limit.interval_type != IntervalType.INFINITE
+        lower = lower_limit.value
+        is_lower_closed = lower_limit.interval_type == IntervalType.CLOSED
+        has_upper = upper_limit.interval_type != IntervalType.INFINITE
+        upper = upper_limit.value
+        is_upper_closed = upper_limit.interval_type == IntervalType.CLOSED
+
+        offset = self.offset
+        factor = self.factor
+        denominator = self.denominator
+        do_round = self.internal_type == DataType.A_FLOAT64 and self.physical_type in [
+            DataType.A_INT32,
+            DataType.A_UINT32,
+        ]
+
+        def internal_to_physical(internal_value):
+            if type(internal_value) not in accepted_types:
+                return NOT_CONVERTIBLE
+            if has_lower and not (lower < internal_value or
+                                  (is_lower_closed and lower == internal_value)):
+                return NOT_CONVERTIBLE
+            if has_upper and not (internal_value < upper or
+                                  (is_upper_closed and internal_value == upper)):
+                return NOT_CONVERTIBLE
+
+            result = (offset + factor * internal_value) / denominator
+            if do_round:
+                result = round(result)
+            return physical_python_type(result)
+
+        return internal_to_physical
+
+    def convert_internal_to_physical_array(self, internal_values):
+        assert self.is_valid_internal_array(internal_values).all()
+        result = (self.offset + self.factor * internal_values) / self.denominator
+
+        if self.internal_type == DataType.A_FLOAT64 and self.physical_type in [
+                DataType.A_INT32,
+                DataType.A_UINT32,
+        ]:
+            result = result.round()
+        return make_array_from(self.physical_type, result)
+
     def convert_physical_to_internal(self, physical_value):
         assert self.is_valid_physical_value(
             physical_value
@@ -178,12 +235,37 @@ class LinearCompuMethod(CompuMethod):
             result = round(result)
         return self.internal_type.make_from(result)
 
-    def is_valid_physical_value(self, physical_value):
-        # Do type checks
+    def convert_physical_to_internal_array(self, physical_values):
+        is_valid = self.is_valid_physical_array(physical_values)
+        assert is_valid.all(
+        ), f"physical value {physical_values[~is_valid][0]} is not valid. Expected type {self.physical_type} with internal range {self.internal_lower_limit} to {self.internal_upper_limit}"
+        result = ((physical_values * self.denominator) - self.offset) / self.factor
+
+        if self.physical_type == DataType.A_FLOAT64 and self.internal_type in [
+                DataType.A_INT32,
+                DataType.A_UINT32,
+        ]:
+            result = result.round()
+        return make_array_from(self.internal_type, result)
+
+    def has_valid_physical_type(self, physical_value) -> bool:
+        """Check whether the type of a physical value is accepted,
+        regardless of the limits"""
         expected_type = self.physical_type.as_python_type()
-        if expected_type == float and type(physical_value) not in [int, float]:
-            return False
-        elif expected_type != float and type(physical_value) != expected_type:
+        if expected_type == float:
+            return type(physical_value) in [int, float]
+        return type(physical_value) == expected_type
+
+    def has_valid_internal_type(self, internal_value) -> bool:
+        """Check whether the type of an internal value is accepted,
+        regardless of the limits"""
+        expected_type = self.internal_type.as_python_type()
+        if expected_type == float:
+            return type(internal_value) in [int, float]
+        return type(internal_value) == expected_type
+
+    def is_valid_physical_value(self, physical_value):
+        if not self.has_valid_physical_type(physical_value):
             return False
 
         # Compare to the limits
@@ -194,10 +276,7 @@ class LinearCompuMethod(CompuMethod):
         return True
 
     def is_valid_internal_value(self, internal_value):
-        expected_type = self.internal_type.as_python_type()
-        if expected_type == float and type(internal_value) not in [int, float]:
-            return False
-        elif expected_type != float and type(internal_value) != expected_type:
+        if not self.has_valid_internal_type(internal_value):
             return False
 
         if not self.internal_lower_limit.complies_to_lower(internal_value):
@@ -206,3 +285,21 @@ class LinearCompuMethod(CompuMethod):
             return False
 
         return True
+
+    def is_valid_physical_array(self, physical_values):
+        expected_type = self.physical_type.as_python_type()
+        if expected_type not in [int, float]:
+            return super().is_valid_physical_array(physical_values)
+        if not dtype_matches(physical_values, expected_type):
+            return np.zeros(physical_values.shape, dtype=bool)
+
+        return limits_mask(physical_values, self.physical_lower_limit, self.physical_upper_limit)
+
+    def is_valid_internal_array(self, internal_values):
+        expected_type = self.internal_type.as_python_type()
+        if expected_type not in [int, float]:
+            return super().is_valid_internal_array(internal_values)
+        if not dtype_matches(internal_values, expected_type):
+            return np.zeros(internal_values.shape, dtype=bool)
+
+        return limits_mask(internal_values, self.internal_lower_limit, self.internal_upper_limit)
@@ -1,9 +1,12 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
-from typing import Iterable
+from typing import Any, Callable, Iterable, Optional
 
+from ..exceptions import DecodeError
 from ..globals import logger
-from .compumethodbase import CompuMethod
+from ._arrayutils import dtype_matches, np, numeric_dtype
+from ._intervalindex import IntervalIndex
+from .compumethodbase import NOT_CONVERTIBLE, CompuMethod
 from .linearcompumethod import LinearCompuMethod
 
 
@@ -16,25 +19,131 @@ class ScaleLinearCompuMethod(CompuMethod):
             category="SCALE-LINEAR",
         )
         self.linear_methods = list(linear_methods)
+
+        # if all scales use the same data types, the type checks of
+        # the scales are equivalent and the scales can be looked up
+        # using their limits only
+        self._has_uniform_types = all(
+            scale.internal_type == self.internal_type and scale.physical_type == self.physical_type
+            for scale in self.linear_methods)
+        self._internal_index = IntervalIndex([(scale.internal_lower_limit,
+                                               scale.internal_upper_limit)
+                                              for scale in self.linear_methods])
+        self._physical_index = IntervalIndex([(scale.physical_lower_limit,
+                                               scale.physical_upper_limit)
+                                              for scale in self.linear_methods])
         logger.debug("Created scale linear compu method!")
 
+    def _find_scale_by_internal(self, internal_value) -> Optional[LinearCompuMethod]:
+        """Return the scale which is used to convert an internal value"""
+        if not self._has_uniform_types:
+            return next((scale for scale in self.linear_methods
+                         if scale.is_valid_internal_value(internal_value)), None)
+        if not self.linear_methods[0].has_valid_internal_type(internal_value):
+            return None
+        i = self._internal_index.find(internal_value)
+        return self.linear_methods[i] if i >= 0 else None
+
+    def _find_scale_by_physical(self, physical_value) -> Optional[LinearCompuMethod]:
+        """Return the scale which is used to convert a physical value"""
+        if not self._has_uniform_types:
+            return next((scale for scale in self.linear_methods
+                         if scale.is_valid_physical_value(physical_value)), None)
+        if not self.linear_methods[0].has_valid_physical_type(physical_value):
+            return None
+        i = self._physical_index.find(physical_value)
+        return self.linear_methods[i] if i >= 0 else None
+
     def convert_physical_to_internal(self, physical_value):
-        assert self.is_valid_physical_value(
-            physical_value
+        lin_method = self._find_scale_by_physical(physical_value)
+        assert (
+            lin_method is not None
         ), f"cannot convert the invalid physical value {physical_value} of type {type(physical_value)}"
-        lin_method = next(
-            scale for scale in self.linear_methods if scale.is_valid_physical_value(physical_value))
         return lin_method.convert_physical_to_internal(physical_value)
 
     def convert_internal_to_physical(self, internal_value):
-        lin_method = next(
-            scale for scale in self.linear_methods if scale.is_valid_internal_value(internal_value))
+        lin_method = self._find_scale_by_internal(internal_value)
+        if lin_method is None:
+            raise DecodeError(f"Scale linear compu method could not decode {internal_value}")
         return lin_method.convert_internal_to_physical(internal_value)
 
     def is_valid_physical_value(self, physical_value):
-        return any(
-            True for scale in self.linear_methods if scale.is_valid_physical_value(physical_value))
+        return self._find_scale_by_physical(physical_value) is not None
 
     def is_valid_internal_value(self, internal_value):
-        return any(
-            True for scale in self.linear_methods if scale.is_valid_internal_value(internal_value))
+        return self._find_scale_by_internal(internal_value) is not None
+
+    def compile_internal_to_physical(self) -> Callable[[Any], Any]:
+        if not self._has_uniform_types:
+            return super().compile_internal_to_physical()
+
+        has_valid_internal_type = self.linear_methods[0].has_valid_internal_type
+        find_scale = self._internal_index.find
+        scale_functions = [scale.compile_internal_to_physical() for scale in self.linear_methods]
+
+        def internal_to_physical(internal_value):
+            if not has_valid_internal_type(internal_value):
+                return NOT_CONVERTIBLE
+            i = find_scale(internal_value)
+            if i < 0:
+                return NOT_CONVERTIBLE
+            return scale_functions[i](internal_value)
+
+        return internal_to_physical
+
+    def _select_scales_by_internal(self, internal_values):
+        """Return the index of the scale which is used to convert each
+        internal value, or -1 if there is none."""
+        if not dtype_matches(internal_values, self.internal_type.as_python_type()):
+            return np.full(internal_values.shape, -1, dtype="int64")
+        return self._internal_index.find_array(internal_values)
+
+    def _select_scales_by_physical(self, physical_values):
+        """Return the index of the scale which is used to convert each
+        physical value, or -1 if there is none."""
+        if not dtype_matches(physical_values, self.physical_type.as_python_type()):
+            return np.full(physical_values.shape, -1, dtype="int64")
+        return self._physical_index.find_array(physical_values)
+
+    def convert_physical_to_internal_array(self, physical_values):
+        if self.physical_type.as_python_type() not in [int, float] or not self._has_uniform_types:
+            return super().convert_physical_to_internal_array(physical_values)
+
+        scale_indices = self._select_scales_by_physical(physical_values)
+        is_valid = scale_indices >= 0
+        assert is_valid.all(
+        ), f"cannot convert the invalid physical value {physical_values[~is_valid][0]}"
+
+        result = np.empty(physical_values.shape, dtype=numeric_dtype(self.internal_type))
+        for i in np.unique(scale_indices):
+            selection = scale_indices == i
+            result[selection] = self.linear_methods[i].convert_physical_to_internal_array(
+                physical_values[selection])
+        return result
+
+    def convert_internal_to_physical_array(self, internal_values):
+        if self.internal_type.as_python_type() not in [int, float] or not self._has_uniform_types:
+            return super().convert_internal_to_physical_array(internal_values)
+
+        scale_indices = self._select_scales_by_internal(internal_values)
+        is_valid = scale_indices >= 0
+        if not is_valid.all():
+            raise DecodeError(
+                f"Scale linear compu method could not decode {internal_values[~is_valid][0]}")
+
+        result = np.empty(internal_values.shape, dtype=numeric_dtype(self.physical_type))
+        for i in np.unique(scale_indices):
+            selection = scale_indices == i
+            result[selection] = self.linear_methods[i].convert_internal_to_physical_array(
+                internal_values[selection])
+        return result
+
+    def is_valid_physical_array(self, physical_values):
+        if self.physical_type.as_python_type() not in [int, float] or not self._has_uniform_types:
+            return super().is_valid_physical_array(physical_values)
+        return self._select_scales_by_physical(physical_values) >= 0
+
+    def is_valid_internal_array(self, internal_values):
+        if self.internal_type.as_python_type() not in [int, float] or not self._has_uniform_types:
+            return super().is_valid_internal_array(internal_values)
+        return self._select_scales_by_internal(internal_values) >= 0
@@ -1,10 +1,12 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
+from bisect import bisect_left
 from typing import List, Tuple, Union
 
 from ..exceptions import DecodeError, EncodeError
 from ..globals import logger
 from ..odxtypes import DataType
+from ._arrayutils import make_array_from, np
 from .compumethodbase import CompuMethod
 from .limit import IntervalType, Limit
 
@@ -85,6 +87,11 @@ class TabIntpCompuMethod(CompuMethod):
         logger.debug("Created compu method of type tab interpolated !")
         self._assert_validity()
 
+        self._internal_to_physical_points = list(zip(self.internal_points, self.physical_points))
+        self._physical_to_internal_points = list(zip(self.physical_points, self.internal_points))
+        self._is_internal_increasing = _is_strictly_increasing(self.internal_points)
+        self._is_physical_increasing = _is_strictly_increasing(self.physical_points)
+
     @property
     def physical_lower_limit(self) -> Limit:
         return self._physical_lower_limit
@@ -111,18 +118,64 @@ class TabIntpCompuMethod(CompuMethod):
         ], ("Physical data type of tab-intp compumethod must be one of"
             " [DataType.A_INT32, DataType.A_UINT32, DataType.A_FLOAT32, DataType.A_FLOAT64]")
 
-    def _piecewise_linear_interpolate(self, x: Union[int, float],
-                                      points: List[Tuple[Union[int, float],
-                                                         Union[int, float]]]) -> Union[float, None]:
+    def _piecewise_linear_interpolate(self,
+                                      x: Union[int, float],
+                                      points: List[Tuple[Union[int, float], Union[int, float]]],
+                                      is_increasing: bool = False) -> Union[float, None]:
+        if is_increasing and len(points) >= 2 and isinstance(x, (int, float)):
+            # the segment which contains x can be determined using a
+            # binary search. values at a support point belong to the
+            # segment left of it.
+            if not (points[0][0] <= x and x <= points[-1][0]):
+                return None
+            i = min(max(bisect_left(points, (x,)) - 1, 0), len(points) - 2)
+            (x0, y0), (x1, y1) = points[i], points[i + 1]
+            return y0 + (x - x0) * (y1 - y0) / (x1 - x0)
+
         for ((x0, y0), (x1, y1)) in zip(points[:-1], points[1:]):
             if x0 <= x and x <= x1:
                 return y0 + (x - x0) * (y1 - y0) / (x1 - x0)
 
         return None
 
+    def _piecewise_linear_interpolate_array(self, x, x_points: List[Union[int, float]],
+                                            y_points: List[Union[int, float]]):
+        """Array version of `_piecewise_linear_interpolate()`.
+
+        Returns the interpolated values and a boolean array which
+        specifies whether each value is covered by a segment. Like
+        for the scalar version, the first matching segment is used.
+        """
+        x = np.asarray(x)
+        xp = np.array(x_points)
+        yp = np.array(y_points)
+        result = np.zeros(x.shape, dtype="float64")
+        is_inside = np.zeros(x.shape, dtype=bool)
+        if len(xp) < 2:
+            return result, is_inside
+
+        if _is_strictly_increasing(x_points):
+            # the points are strictly increasing: determine the
+            # segment of each value using a binary search. values at
+            # a support point belong to the segment left of it.
+            segment = np.clip(np.searchsorted(xp, x, side="left") - 1, 0, len(xp) - 2)
+            x0, x1 = xp[segment], xp[segment + 1]
+            y0, y1 = yp[segment], yp[segment + 1]
+            is_inside = (xp[0] <= x) & (x <= xp[-1])
+            result[is_inside] = (y0 + (x - x0) * (y1 - y0) / (x1 - x0))[is_inside]
+            return result, is_inside
+
+        for x0, y0, x1, y1 in zip(xp[:-1], yp[:-1], xp[1:], yp[1:]):
+            selection = ~is_inside & (x0 <= x) & (x <= x1)
+            result[selection] = y0 + (x[selection] - x0) * (y1 - y0) / (x1 - x0)
+            is_inside |= selection
+
+        return result, is_inside
+
     def convert_physical_to_internal(self, physical_value: Union[int, float]) -> Union[int, float]:
-        reference_points = list(zip(self.physical_points, self.internal_points))
-        result = self._piecewise_linear_interpolate(physical_value, reference_points)
+        result = self._piecewise_linear_interpolate(physical_value,
+                                                    self._physical_to_internal_points,
+                                                    self._is_physical_increasing)
 
         if result is None:
             raise EncodeError(f"Internal value {physical_value} must be inside the range"
@@ -132,8 +185,9 @@ class TabIntpCompuMethod(CompuMethod):
         return res
 
     def convert_internal_to_physical(self, internal_value: Union[int, float]) -> Union[int, float]:
-        reference_points = list(zip(self.internal_points, self.physical_points))
-        result = self._piecewise_linear_interpolate(internal_value, reference_points)
+        result = self._piecewise_linear_interpolate(internal_value,
+                                                    self._internal_to_physical_points,
+                                                    self._is_internal_increasing)
 
         if result is None:
             raise DecodeError(f"Internal value {internal_value} must be inside the range"
@@ -142,6 +196,28 @@ class TabIntpCompuMethod(CompuMethod):
         assert isinstance(res, (int, float))
         return res
 
+    def convert_physical_to_internal_array(self, physical_values):
+        result, is_inside = self._piecewise_linear_interpolate_array(physical_values,
+                                                                     self.physical_points,
+                                                                     self.internal_points)
+
+        if not is_inside.all():
+            raise EncodeError(f"Internal value {physical_values[~is_inside][0]} must be inside"
+                              f" the range [{min(self.physical_points)},"
+                              f" {max(self.physical_points)}]")
+        return make_array_from(self.internal_type, result)
+
+    def convert_internal_to_physical_array(self, internal_values):
+        result, is_inside = self._piecewise_linear_interpolate_array(internal_values,
+                                                                     self.internal_points,
+                                                                     self.physical_points)
+
+        if not is_inside.all():
+            raise DecodeError(f"Internal value {internal_values[~is_inside][0]} must be inside"
+                              f" the range [{min(self.internal_points)},"
+                              f" {max(self.internal_points)}]")
+        return make_array_from(self.physical_type, result)
+
     def is_valid_physical_value(self, physical_value: Union[int, float]) -> bool:
         return min(self.physical_points) <= physical_value and physical_value <= max(
             self.physical_points)
@@ -149,3 +225,15 @@ class TabIntpCompuMethod(CompuMethod):
     def is_valid_internal_value(self, internal_value: Union[int, float]) -> bool:
         return min(self.internal_points) <= internal_value and internal_value <= max(
             self.internal_points)
+
+    def is_valid_physical_array(self, physical_values):
+        return (min(self.physical_points) <= physical_values) & (
+            physical_values <= max(self.physical_points))
+
+    def is_valid_internal_array(self, internal_values):
+        return (min(self.internal_points) <= internal_values) & (
+            internal_values <= max(self.internal_points))
+
+
+def _is_strictly_increasing(points: List[Union[int, float]]) -> bool:
+    return all(a < b for a, b in zip(points[:-1], points[1:]))
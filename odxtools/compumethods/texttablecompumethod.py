@@ -1,10 +1,12 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
-from typing import List
+from typing import Any, Callable, Dict, List
 
 from ..exceptions import DecodeError
 from ..odxtypes import DataType
-from .compumethodbase import CompuMethod
+from ._arrayutils import np
+from ._intervalindex import IntervalIndex
+from .compumethodbase import NOT_CONVERTIBLE, CompuMethod
 from .compuscale import CompuScale
 
 
@@ -21,44 +23,84 @@ class TexttableCompuMethod(CompuMethod):
         assert all(scale.lower_limit is not None or scale.upper_limit is not None for scale in
                    self.internal_to_phys), "Text table compu method doesn't have expected format!"
 
+        self._scale_index = IntervalIndex([
+            (scale.lower_limit, scale.upper_limit) for scale in self.internal_to_phys
+        ])
+        # the first scale for each physical value
+        self._scales_by_compu_const: Dict[Any, CompuScale] = {}
+        for scale in reversed(self.internal_to_phys):
+            self._scales_by_compu_const[scale.compu_const] = scale
+
+    def __find_scale_by_compu_const(self, physical_value):
+        try:
+            return self._scales_by_compu_const.get(physical_value)
+        except TypeError:
+            # unhashable values are not valid compu constants
+            return None
+
     def convert_physical_to_internal(self, physical_value):
-        scale = next(
-            filter(lambda scale: scale.compu_const == physical_value, self.internal_to_phys), None)
+        scale = self.__find_scale_by_compu_const(physical_value)
         if scale is not None:
-            res = (
-                scale.compu_inverse_value
-                if scale.compu_inverse_value is not None else scale.lower_limit.value)
-            assert self.internal_type.isinstance(res)
-            return res
-
-    def __is_internal_in_scale(self, internal_value, scale: CompuScale):
-        if scale.lower_limit is not None and not scale.lower_limit.complies_to_lower(
-                internal_value):
-            return False
-        if scale.upper_limit is not None and not scale.upper_limit.complies_to_upper(
-                internal_value):
-            return False
-        # value complies to the defined limits
-        return True
+            return self.__internal_value_of(scale)
+
+    def __internal_value_of(self, scale: CompuScale):
+        res: Any
+        if scale.compu_inverse_value is not None:
+            res = scale.compu_inverse_value
+        else:
+            assert scale.lower_limit is not None
+            res = scale.lower_limit.value
+        assert self.internal_type.isinstance(res)
+        return res
 
     def convert_internal_to_physical(self, internal_value):
-        try:
-            scale = next(
-                filter(
-                    lambda scale: self.__is_internal_in_scale(internal_value, scale),
-                    self.internal_to_phys,
-                ))
-        except StopIteration:
+        i = self._scale_index.find(internal_value)
+        if i < 0:
             raise DecodeError(
                 f"Texttable compu method could not decode {internal_value} to string.")
-        return scale.compu_const
+        return self.internal_to_phys[i].compu_const
+
+    def compile_internal_to_physical(self) -> Callable[[Any], Any]:
+        find_scale = self._scale_index.find
+        compu_consts = [scale.compu_const for scale in self.internal_to_phys]
+
+        def internal_to_physical(internal_value):
+            i = find_scale(internal_value)
+            if i < 0:
+                return NOT_CONVERTIBLE
+            return compu_consts[i]
+
+        return internal_to_physical
+
+    def convert_physical_to_internal_array(self, physical_values):
+        # only look up each distinct physical value once
+        unique_values, inverse = np.unique(physical_values, return_inverse=True)
+        unique_results = [self.convert_physical_to_internal(x) for x in unique_values.tolist()]
+        if None in unique_results:
+            return np.array(unique_results, dtype=object)[inverse]
+        return np.array(unique_results)[inverse]
+
+    def convert_internal_to_physical_array(self, internal_values):
+        scale_indices = self._scale_index.find_array(internal_values)
+        is_valid = scale_indices >= 0
+        if not is_valid.all():
+            raise DecodeError(f"Texttable compu method could not decode "
+                              f"{internal_values[~is_valid][0]} to string.")
+        compu_consts = np.array([scale.compu_const for scale in self.internal_to_phys],
+                                dtype=object)
+        return compu_consts[scale_indices]
 
     def is_valid_physical_value(self, physical_value):
-        return physical_value in [x.compu_const for x in self.internal_to_phys]
+        return self.__find_scale_by_compu_const(physical_value) is not None
 
     def is_valid_internal_value(self, internal_value):
-        return any(
-            self.__is_internal_in_scale(internal_value, scale) for scale in self.internal_to_phys)
+        return self._scale_index.find(internal_value) >= 0
+
+    def is_valid_physical_array(self, physical_values):
+        return np.isin(physical_values, self.get_valid_physical_values())
+
+    def is_valid_internal_array(self, internal_values):
+        return self._scale_index.find_array(internal_values) >= 0
 
     def get_valid_physical_values(self):
         return [x.compu_const for x in self.internal_to_phys]
@@ -113,6 +113,9 @@ class Database:
                 if dl.variant_type == dl_type_name:
                     dl._resolve_references(self._odxlinks)
 
+        for dl in self.diag_layers:
+            dl.prepare()
+
     @property
     def odxlinks(self) -> OdxLinkDatabase:
         """A map from odx_id to object"""
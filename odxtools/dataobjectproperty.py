@@ -1,9 +1,9 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Union, cast
+from typing import Any, Callable, Dict, List, Optional, Set, Union, cast
 
-from .compumethods import CompuMethod, create_any_compu_method_from_et
+from .compumethods import NOT_CONVERTIBLE, CompuMethod, create_any_compu_method_from_et
 from .decodestate import DecodeState
 from .diagcodedtypes import DiagCodedType, StandardLengthType, create_any_diag_coded_type_from_et
 from .encodestate import EncodeState
@@ -11,12 +11,20 @@ from .exceptions import DecodeError, EncodeError
 from .globals import logger
 from .nameditemlist import NamedItemList
 from .odxlink import OdxDocFragment, OdxLinkDatabase, OdxLinkId, OdxLinkRef
-from .odxtypes import odxstr_to_bool
+from .odxtypes import DataType, odxstr_to_bool
 from .physicaltype import PhysicalType
 from .specialdata import SpecialDataGroup, create_sdgs_from_et
 from .units import Unit
 from .utils import create_description_from_et, short_name_as_id
 
+MAX_CONVERSION_TABLE_BIT_LENGTH = 16
+"""The maximum bit length of the coded types for which the conversion
+from internal to physical values can be tabulated"""
+
+MAX_UNDOCUMENTED_DTCS = 4096
+"""The maximum number of placeholder objects for undocumented trouble
+codes which are cached by each DTC-DOP"""
+
 
 class DopBase:
     """Base class for all DOPs.
@@ -89,6 +97,15 @@ class DataObjectProperty(DopBase):
         self.unit_ref = unit_ref
         self._unit = None
 
+        # the specialized conversion function of the compu method. It
+        # is compiled when the references are resolved or on first use.
+        self._internal_to_physical: Optional[Callable[[Any], Any]] = None
+
+        # the conversion table and the internal value which
+        # corresponds to its first entry
+        self._conversion_table: Optional[List[Any]] = None
+        self._conversion_table_offset = 0
+
     @staticmethod
     def from_et(et_element, doc_frags: List[OdxDocFragment]) -> "DataObjectProperty":
         """Reads a DATA-OBJECT-PROP or a DTC-DOP."""
@@ -171,6 +188,72 @@ class DataObjectProperty(DopBase):
         else:
             return None
 
+    @property
+    def conversion_table_size(self) -> Optional[int]:
+        """The number of entries of the conversion table of this DOP,
+        or None if no conversion table can be built for it.
+
+        See `build_conversion_table()`.
+        """
+        internal_range = self._get_conversion_table_range()
+        if internal_range is None:
+            return None
+        return len(internal_range)
+
+    @property
+    def has_conversion_table(self) -> bool:
+        return self._conversion_table is not None
+
+    def _get_conversion_table_range(self) -> Optional[range]:
+        dct = self.diag_coded_type
+        if not isinstance(dct, StandardLengthType) or dct.bit_mask is not None:
+            return None
+        if not 0 < dct.bit_length <= MAX_CONVERSION_TABLE_BIT_LENGTH:
+            return None
+
+        if dct.base_data_type == DataType.A_UINT32:
+            return range(0, 1 << dct.bit_length)
+        elif dct.base_data_type == DataType.A_INT32:
+            return range(-(1 << (dct.bit_length - 1)), 1 << (dct.bit_length - 1))
+
+        return None
+
+    def build_conversion_table(self) -> bool:
+        """Precompute the physical values of all internal values.
+
+        This is possible if the DOP uses a standard length type for
+        integers which is at most `MAX_CONVERSION_TABLE_BIT_LENGTH`
+        bits long. Decoding a value then boils down to a list lookup
+        instead of evaluating the compu method. The table needs
+        memory for `conversion_table_size` entries, so it is not
+        built by default. Use `DiagLayer.build_conversion_tables()`
+        to build the tables of all DOPs of a diag layer within a
+        given memory budget.
+
+        Returns True if the conversion table is available.
+        """
+        internal_range = self._get_conversion_table_range()
+        if internal_range is None:
+            return False
+
+        internal_to_physical = self.compu_method.compile_internal_to_physical()
+        table: List[Any] = []
+        for internal in internal_range:
+            try:
+                physical = internal_to_physical(internal)
+            except Exception:
+                # values which cannot be converted are handled by the
+                # regular code path, which raises the same exception
+                physical = NOT_CONVERTIBLE
+            table.append(physical)
+
+        self._conversion_table = table
+        self._conversion_table_offset = internal_range.start
+        return True
+
+    def clear_conversion_table(self) -> None:
+        self._conversion_table = None
+
     def convert_physical_to_internal(self, physical_value):
         assert self.physical_type.base_data_type.isinstance(
             physical_value
@@ -196,13 +279,26 @@ class DataObjectProperty(DopBase):
         internal, next_byte_position = self.diag_coded_type.convert_bytes_to_internal(
             decode_state, bit_position=bit_position)
 
-        if self.compu_method.is_valid_internal_value(internal):
-            return self.compu_method.convert_internal_to_physical(internal), next_byte_position
-        else:
+        if self._conversion_table is not None:
+            physical = self._conversion_table[internal - self._conversion_table_offset]
+            if physical is not NOT_CONVERTIBLE:
+                return physical, next_byte_position
+
+        internal_to_physical = self._internal_to_physical
+        if internal_to_physical is None:
+            internal_to_physical = self._compile_internal_to_physical()
+
+        physical = internal_to_physical(internal)
+        if physical is NOT_CONVERTIBLE:
             # TODO: How to prevent this?
             raise DecodeError(
                 f"DOP {self.short_name} could not convert the coded value "
                 f" {repr(internal)} to physical type {self.physical_type.base_data_type}.")
+        return physical, next_byte_position
+
+    def _compile_internal_to_physical(self) -> Callable[[Any], Any]:
+        self._internal_to_physical = self.compu_method.compile_internal_to_physical()
+        return self._internal_to_physical
 
     def is_valid_physical_value(self, physical_value):
         return self.compu_method.is_valid_physical_value(physical_value)
@@ -217,6 +313,9 @@ class DataObjectProperty(DopBase):
         if self.unit_ref:
             self._unit = odxlinks.resolve(self.unit_ref)
 
+        self._compile_internal_to_physical()
+        self.clear_conversion_table()
+
     def __repr__(self) -> str:
         return (f"DataObjectProperty('{self.short_name}', " + ", ".join([
             f"category='{self.compu_method.category}'",
@@ -322,6 +421,12 @@ class DtcDop(DataObjectProperty):
         self.dtcs_raw = dtcs_raw
         self.linked_dtc_dops = linked_dtc_dops
 
+        self._dtcs_by_trouble_code: Dict[int, DiagnosticTroubleCode] = {}
+        self._dtcs_by_short_name: Dict[str, DiagnosticTroubleCode] = {}
+        self._ambiguous_trouble_codes: Set[int] = set()
+        # placeholders for trouble codes which are not described
+        self._undocumented_dtcs: Dict[int, DiagnosticTroubleCode] = {}
+
     @property
     def dtcs(self) -> NamedItemList[DiagnosticTroubleCode]:
         return self._dtcs
@@ -330,28 +435,31 @@ class DtcDop(DataObjectProperty):
         trouble_code, next_byte = super().convert_bytes_to_physical(
             decode_state, bit_position=bit_position)
 
-        dtcs = [x for x in self.dtcs if x.trouble_code == trouble_code]
-
-        assert len(dtcs) < 2, f"Multiple matching DTCs for trouble code 0x{trouble_code:06x}"
-
-        if len(dtcs) == 1:
+        dtc = self._dtcs_by_trouble_code.get(trouble_code)
+        if dtc is not None:
+            assert trouble_code not in self._ambiguous_trouble_codes, \
+                f"Multiple matching DTCs for trouble code 0x{trouble_code:06x}"
             # we found exactly one described DTC
-            return dtcs[0], next_byte
+            return dtc, next_byte
 
         # the DTC was not specified. This probably means that the
         # diagnostic description file is incomplete. We do not bail
         # out but we cannot provide an interpretation for it out of the
         # box...
-        dtc = DiagnosticTroubleCode(
-            trouble_code=trouble_code,
-            odx_id=None,
-            short_name=None,
-            text=None,
-            display_trouble_code=None,
-            level=None,
-            is_temporary_raw=None,
-            sdgs=[],
-        )
+        dtc = self._undocumented_dtcs.get(trouble_code)
+        if dtc is None:
+            dtc = DiagnosticTroubleCode(
+                trouble_code=trouble_code,
+                odx_id=None,
+                short_name=None,
+                text=None,
+                display_trouble_code=None,
+                level=None,
+                is_temporary_raw=None,
+                sdgs=[],
+            )
+            if len(self._undocumented_dtcs) < MAX_UNDOCUMENTED_DTCS:
+                self._undocumented_dtcs[trouble_code] = dtc
 
         return dtc, next_byte
 
@@ -363,7 +471,10 @@ class DtcDop(DataObjectProperty):
             trouble_code = physical_value
         elif isinstance(physical_value, str):
             # assume that physical value is the short_name
-            dtc = next(filter(lambda dtc: dtc.short_name == physical_value, self.dtcs))
+            dtc = self._dtcs_by_short_name.get(physical_value)
+            if dtc is None:
+                raise EncodeError(f"The DTC-DOP {self.short_name} does not feature a DTC"
+                                  f" named '{physical_value}'.")
             trouble_code = dtc.trouble_code
         else:
             raise EncodeError(f"The DTC-DOP {self.short_name} expected a"
@@ -392,3 +503,14 @@ class DtcDop(DataObjectProperty):
             elif isinstance(dtc_proxy, OdxLinkRef):
                 dtc = odxlinks.resolve(dtc_proxy, DiagnosticTroubleCode)
                 self._dtcs.append(dtc)
+
+        self._dtcs_by_trouble_code = {}
+        self._dtcs_by_short_name = {}
+        self._ambiguous_trouble_codes = set()
+        self._undocumented_dtcs = {}
+        for dtc in self._dtcs:
+            if dtc.trouble_code in self._dtcs_by_trouble_code:
+                self._ambiguous_trouble_codes.add(dtc.trouble_code)
+            self._dtcs_by_trouble_code.setdefault(dtc.trouble_code, dtc)
+            if dtc.short_name is not None:
+                self._dtcs_by_short_name.setdefault(dtc.short_name, dtc)
@@ -0,0 +1,85 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2022 MBition GmbH
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Hashable, Iterable, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .message import Message
+
+
+class DecodeCache:
+    """Bounded least-recently-used cache for the results of
+    `DiagLayer.decode()` and `DiagLayer.decode_response()`.
+
+    In traces of diagnostic communication, a large fraction of the
+    telegrams is usually byte-identical (e.g., tester present
+    messages, periodic reads of data identifiers or "response
+    pending" negative responses). To avoid decoding these over and
+    over again, a cache can be assigned to diag layers:
+
+    .. code-block:: python
+
+        cache = DecodeCache(max_size=4096)
+        for ecu in db.ecus:
+            ecu.decode_cache = cache
+
+    Cached `Message` objects are shared between all callers which
+    decode the same telegram. They -- including their `param_dict`
+    -- must thus be treated as read-only. Also, warnings which were
+    issued while decoding a telegram are not repeated if the result
+    is retrieved from the cache, and failed decodes are not cached.
+    Since the result of decoding a telegram depends on the coding
+    policy (see `odxtools.codingpolicy`), telegrams are cached
+    separately for each policy.
+
+    Note that the cache is not synchronized, i.e., concurrent use
+    from multiple threads requires external locking.
+    """
+
+    def __init__(self, max_size: int = 1024) -> None:
+        if max_size < 1:
+            raise ValueError(f"The size limit of decode caches must be positive, not {max_size}")
+
+        self.max_size = max_size
+        """Maximum number of cached telegrams"""
+        self.hits = 0
+        """Number of lookups which were answered by the cache"""
+        self.misses = 0
+        """Number of lookups for telegrams which were not cached"""
+        self.evictions = 0
+        """Number of entries which were discarded due to the size limit"""
+
+        self._entries: "OrderedDict[Hashable, Tuple[Message, ...]]" = OrderedDict()
+
+    def lookup(self, key: Hashable) -> Optional[Tuple["Message", ...]]:
+        """Return the cached messages for a key or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def store(self, key: Hashable, messages: Iterable["Message"]) -> None:
+        """Add the decoded messages for a key, evicting the least
+        recently used entries if necessary"""
+        self._entries[key] = tuple(messages)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries from the cache.
+
+        The hit, miss and eviction counters are not reset."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return (f"DecodeCache(max_size={self.max_size}, size={len(self)}, hits={self.hits}, "
+                f"misses={self.misses}, evictions={self.evictions})")
@@ -1,9 +1,12 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
-from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .odxlink import OdxLinkId
 
 if TYPE_CHECKING:
     from .parameters.parameterbase import Parameter
+    from .table import TableRow
 
 
 class ParameterValuePair(NamedTuple):
@@ -11,12 +14,92 @@ class ParameterValuePair(NamedTuple):
     value: Union[str, int, bytes, bytearray, Dict]
 
 
-class DecodeState(NamedTuple):
-    """Utility class to be used while decoding a message."""
+class DecodeState:
+    """Utility class to be used while decoding a message.
+
+    A decode state is a mutable cursor: Structures create a single
+    decode state for all of their parameters and advance it in place
+    instead of creating a new object for each parameter. For
+    compatibility with the former `NamedTuple` based implementation,
+    the `_replace()` and `_asdict()` methods as well as iteration are
+    still supported.
+
+    The values of all length keys which have been decoded so far are
+    stored in the `length_keys` dict. This dict is shared with the
+    decode states of nested structures, i.e., it allows parameters
+    with a `ParamLengthInfoType` to look up their length in constant
+    time. Similarly, the `table_keys` dict maps the short names of
+    the table key parameters which have been decoded so far to the
+    selected table rows.
+    """
+
+    __slots__ = (
+        "coded_message",
+        "parameter_value_pairs",
+        "next_byte_position",
+        "length_keys",
+        "table_keys",
+    )
+
+    _fields: Tuple[str, ...] = __slots__
+
+    def __init__(
+        self,
+        coded_message: Union[bytes, bytearray],
+        parameter_value_pairs: Optional[List[ParameterValuePair]] = None,
+        next_byte_position: int = 0,
+        length_keys: Optional[Dict[OdxLinkId, int]] = None,
+        table_keys: Optional[Dict[str, "TableRow"]] = None,
+    ) -> None:
+        self.coded_message = coded_message
+        """bytes to be decoded"""
+        self.parameter_value_pairs: List[ParameterValuePair] = (
+            parameter_value_pairs if parameter_value_pairs is not None else [])
+        """values of already decoded parameters"""
+        self.next_byte_position = next_byte_position
+        """Position of the next parameter if its position is not specified in ODX"""
+        if length_keys is None:
+            length_keys = {
+                pv.parameter.odx_id: pv.value  # type: ignore
+                for pv in self.parameter_value_pairs
+                if pv.parameter.parameter_type == "LENGTH-KEY"
+            }
+        self.length_keys: Dict[OdxLinkId, int] = length_keys
+        """Mapping from IDs to bit lengths (specified by LengthKeyParameters)"""
+        self.table_keys: Dict[str, "TableRow"] = table_keys if table_keys is not None else {}
+        """Mapping from short names to table rows (specified by TableKeyParameters)"""
+
+    def _replace(self, **kwargs: Any) -> "DecodeState":
+        """Return a copy of the decode state with some attributes changed.
+
+        Note that the list of already decoded parameters and the
+        dicts of length keys and table keys are shared between the
+        original and the copy.
+        """
+        result = DecodeState(self.coded_message, self.parameter_value_pairs,
+                             self.next_byte_position, self.length_keys, self.table_keys)
+        for key, value in kwargs.items():
+            setattr(result, key, value)
+        return result
+
+    def _asdict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self._fields}
+
+    def __iter__(self) -> Iterator[Any]:
+        return (getattr(self, name) for name in self._fields)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DecodeState):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    # decode states are mutable, i.e., they must not be used as keys
+    # of dicts or as members of sets
+    __hash__ = None  # type: ignore[assignment]
 
-    coded_message: Union[bytes, bytearray]
-    """bytes to be decoded"""
-    parameter_value_pairs: List[ParameterValuePair]
-    """values of already decoded parameters"""
-    next_byte_position: int
-    """Position of the next parameter if its position is not specified in ODX"""
+    def __repr__(self) -> str:
+        return (f"DecodeState(coded_message={self.coded_message!r}, "
+                f"parameter_value_pairs={self.parameter_value_pairs!r}, "
+                f"next_byte_position={self.next_byte_position}, "
+                f"length_keys={self.length_keys!r}, "
+                f"table_keys={self.table_keys!r})")
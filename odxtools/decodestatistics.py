@@ -0,0 +1,22 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2022 MBition GmbH
+from dataclasses import dataclass
+
+
+@dataclass
+class DecodeStatistics:
+    """Counters which are updated by the decoding functions of
+    `DiagLayer` if passed an object of this class.
+
+    The same object may be passed to several calls in order to
+    accumulate the counts.
+    """
+
+    num_messages: int = 0
+    """Number of messages which were attempted to be decoded"""
+    num_candidates: int = 0
+    """Number of services which matched the constant prefix of a message"""
+    num_pruned: int = 0
+    """Number of candidate services which were rejected by cheap checks"""
+    num_failed: int = 0
+    """Number of candidate services for which the full decode failed"""
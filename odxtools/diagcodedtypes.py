@@ -2,7 +2,7 @@
 # Copyright (c) 2022 MBition GmbH
 import abc
 import math
-from typing import Any, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import bitstruct
 
@@ -25,6 +25,37 @@ ODX_TYPE_TO_FORMAT_LETTER = {
 }
 
 
+def _find_termination(coded_message: Union[bytes, bytearray], termination_char: bytes, start: int,
+                      end: int) -> Tuple[int, bool]:
+    """Find the first termination character of a value.
+
+    Only positions which are a multiple of the length of the
+    termination character away from `start` are considered, i.e.,
+    for UTF-16 strings, a terminating pair of bytes must be aligned
+    to the beginning of the characters. A termination character
+    which starts before `end` is accepted even if it extends beyond
+    it. Returns the position of the termination character and
+    whether one was found. If no termination character was found,
+    the returned position is the first eligible position at or
+    after `end`.
+    """
+    char_length = len(termination_char)
+    if start >= end:
+        return start, False
+
+    search_end = min(len(coded_message), end + char_length - 1)
+    pos = coded_message.find(termination_char, start, search_end)
+    while pos >= 0:
+        misalignment = (pos - start) % char_length
+        if misalignment == 0:
+            return pos, True
+        # the match straddles two characters: continue with the
+        # next character boundary
+        pos = coded_message.find(termination_char, pos + char_length - misalignment, search_end)
+
+    return start + (end - start + char_length - 1) // char_length * char_length, False
+
+
 class DiagCodedType(abc.ABC):
 
     def __init__(
@@ -53,10 +84,16 @@ class DiagCodedType(abc.ABC):
         base_data_type: DataType,
         is_highlow_byte_order: bool,
         bit_mask: Optional[int] = None,
+        compiled_format: Optional[bitstruct.CompiledFormat] = None,
     ):
         """Extract the internal value.
 
         Helper method for `DiagCodedType.convert_bytes_to_internal`.
+
+        If `compiled_format` is specified, it must be the result of
+        `_compile_format()` for the same bit position, bit length and
+        base data type. It is then used instead of parsing the format
+        string anew.
         """
         # If the bit length is zero, return "empty" values of each type
         if bit_length == 0:
@@ -81,10 +118,24 @@ class DiagCodedType(abc.ABC):
         ]:
             extracted_bytes = extracted_bytes[::-1]
 
-        format_letter = ODX_TYPE_TO_FORMAT_LETTER[base_data_type]
-        padding = 8 * byte_length - (bit_length + bit_position)
-        internal_value = bitstruct.unpack_from(
-            f"{format_letter}{bit_length}", extracted_bytes, offset=padding)[0]
+        if compiled_format is not None:
+            internal_value = compiled_format.unpack_from(extracted_bytes)[0]
+        elif bit_position == 0 and bit_length % 8 == 0 and base_data_type in [
+                DataType.A_UNICODE2STRING,
+                DataType.A_BYTEFIELD,
+                DataType.A_ASCIISTRING,
+                DataType.A_UTF8STRING,
+        ]:
+            # byte aligned strings and byte fields do not need to be
+            # unpacked bit by bit
+            internal_value = bytes(extracted_bytes)
+            if base_data_type in [DataType.A_ASCIISTRING, DataType.A_UTF8STRING]:
+                internal_value = internal_value.decode("utf-8")
+        else:
+            format_letter = ODX_TYPE_TO_FORMAT_LETTER[base_data_type]
+            padding = 8 * byte_length - (bit_length + bit_position)
+            internal_value = bitstruct.unpack_from(
+                f"{format_letter}{bit_length}", extracted_bytes, offset=padding)[0]
 
         if base_data_type == DataType.A_UNICODE2STRING:
             # Convert bytes to string with utf-16 decoding
@@ -103,8 +154,12 @@ class DiagCodedType(abc.ABC):
         base_data_type,
         is_highlow_byte_order,
         bit_mask=None,
+        compiled_format: Optional[bitstruct.CompiledFormat] = None,
     ):
-        """Convert the internal_value to bytes."""
+        """Convert the internal_value to bytes.
+
+        See `_extract_internal()` for the meaning of `compiled_format`.
+        """
         # Check that bytes and strings actually fit into the bit length
         if base_data_type in [DataType.A_BYTEFIELD] and 8 * len(internal_value) > bit_length:
             raise EncodeError(f"The bytefield {internal_value.hex()} is too large."
@@ -126,14 +181,6 @@ class DiagCodedType(abc.ABC):
                     f"The number {repr(internal_value)} cannot be encoded into {bit_length} bits.")
             return bytes()
 
-        char = ODX_TYPE_TO_FORMAT_LETTER[base_data_type]
-
-        # The coded byte is divided into (0..0)(value)(0..0) with bit lengths (left_pad)(bit_length)(bit_position)
-        offset = (8 - ((bit_length + bit_position) % 8)) % 8
-        assert (0 <= offset and offset < 8 and (offset + bit_length + bit_position) % 8
-                == 0), f"Computational mistake, offset={offset}"
-        left_pad = f"p{offset}" if offset > 0 else ""
-
         # Convert string to bytes with utf-16 encoding
         if base_data_type == DataType.A_UNICODE2STRING:
             if is_highlow_byte_order:
@@ -141,7 +188,9 @@ class DiagCodedType(abc.ABC):
             else:
                 internal_value = internal_value.encode("utf-16-le")
 
-        code = bitstruct.pack(f"{left_pad}{char}{bit_length}", internal_value)
+        if compiled_format is None:
+            compiled_format = self._compile_format(bit_position, bit_length, base_data_type)
+        code = compiled_format.pack(internal_value)
 
         if not is_highlow_byte_order and base_data_type not in [
                 DataType.A_UNICODE2STRING,
@@ -157,6 +206,24 @@ class DiagCodedType(abc.ABC):
 
         return code
 
+    @staticmethod
+    def _compile_format(bit_position: int, bit_length: int,
+                        base_data_type: DataType) -> bitstruct.CompiledFormat:
+        """Compile the bitstruct format of a value.
+
+        The coded bytes are divided into (0..0)(value)(0..0) with the
+        bit lengths (left_pad)(bit_length)(bit_position). The trailing
+        bits are implicitly zero-padded by bitstruct.
+        """
+        char = ODX_TYPE_TO_FORMAT_LETTER[base_data_type]
+
+        left_pad = (8 - ((bit_length + bit_position) % 8)) % 8
+        assert (0 <= left_pad and left_pad < 8 and (left_pad + bit_length + bit_position) % 8
+                == 0), f"Computational mistake, left_pad={left_pad}"
+        pad_str = f"p{left_pad}" if left_pad > 0 else ""
+
+        return bitstruct.compile(f"{pad_str}{char}{bit_length}")
+
     def _minimal_byte_length_of(self, internal_value: Union[bytes, str]) -> int:
         """Helper method to get the minimal byte length.
         (needed for LeadingLength- and MinMaxLengthType)
@@ -403,15 +470,12 @@ class MinMaxLengthType(DiagCodedType):
             # or if a termination character is found.
             char_length = len(termination_char)  # either 1 or 2
 
-            termination_byte = byte_position + self.min_length
-            found_char = False
-            # Search the termination character
-            while termination_byte < max_termination_byte and not found_char:
-                found_char = (
-                    coded_message[termination_byte:termination_byte +
-                                  char_length] == termination_char)
-                if not found_char:
-                    termination_byte += char_length
+            termination_byte, found_char = _find_termination(
+                coded_message,
+                termination_char,
+                start=byte_position + self.min_length,
+                end=max_termination_byte,
+            )
 
             byte_length = termination_byte - byte_position
 
@@ -514,19 +578,10 @@ class ParamLengthInfoType(DiagCodedType):
 
     def convert_bytes_to_internal(self, decode_state: DecodeState, bit_position: int = 0):
         # Find length key with matching ID.
-        bit_length = 0
-        for parameter, value in decode_state.parameter_value_pairs:
-            # if isinstance(param_value.parameter, LengthKeyParameter) would be prettier,
-            # but leads to cyclic import...
-            if (parameter.parameter_type == "LENGTH-KEY" and
-                    parameter.odx_id == self.length_key_id  # type: ignore
-               ):
-                # The bit length of the parameter to be extracted is given by the length key.
-                assert isinstance(value, int)
-                bit_length = value
-                break
-
-        assert bit_length is not None, f"Did not find any length key with ID {self.length_key_id}"
+        bit_length = decode_state.length_keys.get(self.length_key_id)
+
+        if bit_length is None:
+            raise DecodeError(f"Did not find any length key with ID {self.length_key_id}")
 
         # Extract the internal value and return.
         return self._extract_internal(
@@ -572,6 +627,23 @@ class StandardLengthType(DiagCodedType):
         self.bit_mask = bit_mask
         self.is_condensed_raw = is_condensed_raw
 
+        # bitstruct formats compiled for each bit position this coded
+        # type has been used at. The bit length and the byte order are
+        # fixed, so these only need to be compiled once.
+        self._compiled_formats: Dict[int, bitstruct.CompiledFormat] = {}
+
+    def _get_compiled_format(self, bit_position: int) -> Optional[bitstruct.CompiledFormat]:
+        if self.bit_length == 0:
+            return None
+
+        compiled_format = self._compiled_formats.get(bit_position)
+        if compiled_format is None:
+            compiled_format = self._compile_format(bit_position, self.bit_length,
+                                                   self.base_data_type)
+            self._compiled_formats[bit_position] = compiled_format
+
+        return compiled_format
+
     def convert_internal_to_bytes(self, internal_value, encode_state: EncodeState,
                                   bit_position: int) -> bytes:
         return self._to_bytes(
@@ -581,6 +653,7 @@ class StandardLengthType(DiagCodedType):
             self.base_data_type,
             is_highlow_byte_order=self.is_highlow_byte_order,
             bit_mask=self.bit_mask,
+            compiled_format=self._get_compiled_format(bit_position),
         )
 
     def convert_bytes_to_internal(self, decode_state: DecodeState, bit_position: int = 0):
@@ -592,6 +665,7 @@ class StandardLengthType(DiagCodedType):
             self.base_data_type,
             self.is_highlow_byte_order,
             bit_mask=self.bit_mask,
+            compiled_format=self._get_compiled_format(bit_position),
         )
 
     def __repr__(self) -> str:
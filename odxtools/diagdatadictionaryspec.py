@@ -167,7 +167,7 @@ class DiagDataDictionarySpec:
         for obj in self.end_of_pdu_fields:
             obj._resolve_references(parent_dl, odxlinks)
         for obj in self.env_data_descs:
-            obj._resolve_references(odxlinks)
+            obj._resolve_references(parent_dl, odxlinks)
         for obj in self.env_datas:
             obj._resolve_references(parent_dl, odxlinks)
         for obj in self.muxs:
@@ -3,7 +3,7 @@
 import warnings
 from copy import copy
 from itertools import chain
-from typing import Any, Dict, Iterable, List, Optional, Tuple, Union, cast
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union, cast
 from xml.etree import ElementTree
 
 from deprecation import deprecated
@@ -12,23 +12,31 @@ from odxtools.ecu_variant_patterns import EcuVariantPattern, create_ecu_variant_
 
 from .admindata import AdminData
 from .audience import AdditionalAudience, Audience
+from .codingpolicy import get_coding_policy
 from .communicationparameter import CommunicationParameterRef
 from .companydata import CompanyData, create_company_datas_from_et
-from .dataobjectproperty import DopBase
+from .dataobjectproperty import DataObjectProperty, DopBase
+from .decodecache import DecodeCache
+from .decodestatistics import DecodeStatistics
 from .diagdatadictionaryspec import DiagDataDictionarySpec
 from .diaglayertype import DIAG_LAYER_TYPE
 from .exceptions import DecodeError, OdxWarning
 from .functionalclass import FunctionalClass
 from .globals import logger, xsi
 from .message import Message
+from .messagebatch import BatchDecodeResult, MessageBatch
 from .nameditemlist import NamedItemList
+from .negativeresponse import NegativeResponse, NegativeResponseIndex
 from .odxlink import OdxDocFragment, OdxLinkDatabase, OdxLinkId, OdxLinkRef
+from .requestcorrelation import RequestCorrelationIndex
 from .service import DiagService
+from .serviceprefixtrie import ServicePrefixTrie
 from .singleecujob import SingleEcuJob
 from .specialdata import SpecialDataGroup, create_sdgs_from_et
 from .state import State
 from .state_transition import StateTransition
-from .structures import Request, Response, create_any_structure_from_et
+from .structures import BasicStructure, Request, Response, create_any_structure_from_et
+from .uds import NegativeResponseId
 from .utils import create_description_from_et, short_name_as_id
 
 # Defines priority of overriding objects
@@ -212,6 +220,14 @@ class DiagLayer:
             short_name_as_id, [])
         self._data_object_properties: NamedItemList[DopBase] = NamedItemList(short_name_as_id, [])
 
+        # Data structures for decoding which are computed by prepare()
+        self._service_prefix_trie: Optional[ServicePrefixTrie] = None
+        self._negative_response_index: Optional[NegativeResponseIndex] = None
+        self._request_correlation_index: Optional[RequestCorrelationIndex] = None
+
+        self.decode_cache: Optional[DecodeCache] = None
+        """Optional cache for the results of decode() and decode_response()"""
+
         self.import_refs = import_refs
 
     @staticmethod
@@ -395,6 +411,7 @@ class DiagLayer:
 
         odxlinks.update(self._build_odxlinks())
         self._resolve_references(odxlinks)
+        self.prepare()
 
     def _build_odxlinks(self) -> Dict[OdxLinkId, Any]:
         """Construct a mapping from IDs to all objects that are contained in this diagnostic layer."""
@@ -468,6 +485,14 @@ class DiagLayer:
         if self.local_diag_data_dictionary_spec:
             self.local_diag_data_dictionary_spec._resolve_references(self, odxlinks)
 
+        # the services may have changed, so the data structures for
+        # decoding need to be recomputed
+        self._service_prefix_trie = None
+        self._negative_response_index = None
+        self._request_correlation_index = None
+        if self.decode_cache is not None:
+            self.decode_cache.clear()
+
     def __gather_local_services(
             self, odxlinks: OdxLinkDatabase) -> List[Union[DiagService, SingleEcuJob]]:
         diagcomms_by_name: Dict[str, Union[DiagService, SingleEcuJob]] = {}
@@ -538,118 +563,391 @@ class DiagLayer:
         return sorted(
             self.parent_refs, key=lambda pr: pr.get_inheritance_priority(), reverse=reverse)
 
-    def _build_coded_prefix_tree(self):
-        """Constructs the coded prefix tree of the services.
-        Each leaf node is a list of `DiagService`s.
-        (This is because navigating from a service to the request/ responses is easier than finding the service for a given request/response object.)
-
-        Example:
-        Let there be four services with corresponding requests:
-        * Request 1 has the coded constant prefix `12 34`.
-        * Request 2 has the coded constant prefix `12 34`.
-        * Request 3 has the coded constant prefix `12 56`.
-        * Request 4 has the coded constant prefix `12 56 00`.
-
-        Then, the constructed prefix tree is the dict
-        ```
-        {0x12: {0x34: {-1: [<Service 1>, <Service 2>]},
-                0x56: {-1: [<Service 3>],
-                       0x0: {-1: [<Service 4>]}
-                       }}}
-        ```
-        Note, that the inner `-1` are constant to distinguish them from possible service IDs.
-
-        Also note, that it is actually allowed that
-        (a) SIDs for different services are the same like for service 1 and 2 (thus each leaf node is a list) and
-        (b) one SID is the prefix of another SID like for service 3 and 4 (thus the constant `-1` key).
+    def prepare(self) -> None:
+        """Precompute the data structures required for decoding messages.
+
+        This is done automatically by `finalize_init()` and whenever a
+        database is loaded. If the references of the diag layer are
+        resolved by other means, calling this method avoids the
+        latency of computing these data structures when the first
+        message is decoded.
         """
         services = [s for s in self._services if isinstance(s, DiagService)]
-        prefix_tree = {}
-        for s in services:
-            # Compute prefixes for the request and all responses
-            request_prefix = s.request.coded_const_prefix()
-            prefixes = [request_prefix] + [
-                message.coded_const_prefix(request_prefix=request_prefix)
-                for message in chain(s.positive_responses, s.negative_responses)
-            ]
-            for coded_prefix in prefixes:
-                # Traverse prefix tree
-                sub_tree = prefix_tree
-                for b in coded_prefix:
-                    if sub_tree.get(b) is None:
-                        sub_tree[b] = {}
-                    sub_tree = sub_tree.get(b)
-
-                    assert isinstance(
-                        sub_tree,
-                        dict), f"{sub_tree} has type {type(sub_tree)}. How did this happen?"
-                # Add service as leaf to prefix tree
-                if sub_tree.get(-1) is None:
-                    sub_tree[-1] = [s]
-                else:
-                    sub_tree[-1].append(s)
-        return prefix_tree
-
-    def _find_services_for_uds(self, message: Union[bytes, bytearray]):
-        if not hasattr(self, "_prefix_tree"):
-            # Compute the prefix tree the first time this decode function is called.
-            self._prefix_tree = self._build_coded_prefix_tree()
-        prefix_tree = self._prefix_tree
-
-        # Find matching service(s) in prefix tree
-        possible_services = []
-        for b in message:
-            if prefix_tree.get(b) is not None:
-                assert isinstance(prefix_tree.get(b), dict)
-                prefix_tree = prefix_tree.get(b)
-            else:
-                break
-            if -1 in prefix_tree:
-                possible_services += prefix_tree[-1]
-        return possible_services
+        self._service_prefix_trie = ServicePrefixTrie(services)
+        self._negative_response_index = NegativeResponseIndex(services)
+        self._request_correlation_index = RequestCorrelationIndex(self._service_prefix_trie)
 
-    def decode(self, message: Union[bytes, bytearray]) -> Iterable[Message]:
-        possible_services = self._find_services_for_uds(message)
+    @property
+    def service_prefix_trie(self) -> ServicePrefixTrie:
+        """The trie which maps the constant prefixes of messages to
+        the services of the diag layer."""
+        if self._service_prefix_trie is None:
+            self.prepare()
+        assert self._service_prefix_trie is not None
+        return self._service_prefix_trie
 
-        if possible_services is None:
-            raise DecodeError(f"Couldn't find corresponding service for message {message.hex()}.")
+    @property
+    def request_correlation_index(self) -> RequestCorrelationIndex:
+        """The index which maps raw requests to the services which
+        are able to decode them. It is used by `decode_response()`."""
+        if self._request_correlation_index is None:
+            self.prepare()
+        assert self._request_correlation_index is not None
+        return self._request_correlation_index
 
-        decoded_messages = []
+    @property
+    def negative_response_index(self) -> NegativeResponseIndex:
+        """The index which maps the request SIDs and response codes
+        of negative responses to the services of the diag layer."""
+        if self._negative_response_index is None:
+            self.prepare()
+        assert self._negative_response_index is not None
+        return self._negative_response_index
+
+    def classify_negative_response(self, message: Union[bytes,
+                                                        bytearray]) -> Optional[NegativeResponse]:
+        """Classify a UDS negative response without decoding it.
+
+        If the message is not a negative response, i.e., it does not
+        start with 0x7F or it is shorter than three bytes, None is
+        returned. Otherwise, the result provides the request SID, the
+        response code and the negative responses of the services
+        which match these. This is much cheaper than `decode()`,
+        which is particularly relevant for the frequent "response
+        pending" messages. The structured decode can be done using
+        `NegativeResponse.decode()`.
+        """
+        if len(message) < 3 or message[0] != NegativeResponseId:
+            return None
 
+        request_sid = message[1]
+        response_code = message[2]
+        return NegativeResponse(
+            coded_message=bytes(message),
+            request_sid=request_sid,
+            response_code=response_code,
+            candidates=self.negative_response_index.find(request_sid, response_code),
+            diag_layer=self,
+        )
+
+    def _find_services_for_uds(self, message: Union[bytes, bytearray]) -> List[DiagService]:
+        return self.service_prefix_trie.find(message)
+
+    def _decode_using_services(
+        self,
+        message: Union[bytes, bytearray],
+        possible_services: List[DiagService],
+        triggering_request: Optional[Union[bytes, bytearray]],
+        stats: Optional[DecodeStatistics],
+        lazy: bool = False,
+        fields: Optional[Iterable[str]] = None,
+    ) -> List[Message]:
+        # only run the full decoding machinery for the services which
+        # pass the cheap admissibility checks.
+        candidates = []
         for service in possible_services:
+            message_type = service._find_admissible_message_type(message, triggering_request)
+            if message_type is not None:
+                candidates.append((service, message_type))
+
+        if stats is not None:
+            stats.num_messages += 1
+            stats.num_candidates += len(possible_services)
+            if candidates:
+                stats.num_pruned += len(possible_services) - len(candidates)
+
+        decoded_messages = []
+        if len(candidates) == 0:
+            # if the message is not admissible for any service, try
+            # all of them: the rejections of the admissibility checks
+            # correspond to DecodeErrors, which may have been
+            # configured to be mere warnings.
+            for service in possible_services:
+                try:
+                    decoded_messages.append(
+                        service.decode_message(message, lazy=lazy, fields=fields))
+                except DecodeError:
+                    if stats is not None:
+                        stats.num_failed += 1
+            return decoded_messages
+
+        for service, message_type in candidates:
             try:
-                decoded_messages.append(service.decode_message(message))
-            except DecodeError as e:
-                pass
+                decoded_messages.append(
+                    service._decode_message_as(message, message_type, lazy=lazy, fields=fields))
+            except DecodeError:
+                if stats is not None:
+                    stats.num_failed += 1
+
+        return decoded_messages
+
+    def decode(self,
+               message: Union[bytes, bytearray],
+               stats: Optional[DecodeStatistics] = None,
+               lazy: bool = False,
+               fields: Optional[Iterable[str]] = None) -> Iterable[Message]:
+        """Decode a request or response message.
+
+        If a `DecodeStatistics` object is passed, it is updated with
+        the number of candidate services which were considered. If
+        the diag layer features a decode cache, messages which are
+        retrieved from the cache are not counted.
+
+        If `lazy` is true, only the services and structures which are
+        able to decode the message are determined. The parameters of
+        the returned messages are decoded on first access (see
+        `Message`). Since it is not known whether a full decode would
+        succeed, more messages than in non-lazy mode may be returned.
+        Lazy decoding bypasses the decode cache.
+
+        If `fields` is specified, the parameter dicts of the returned
+        messages only contain the parameters with the given short
+        names. The remaining parameters are only processed as far as
+        this is required to locate the requested ones (see
+        `BasicStructure.decode()`). Such partially decoded messages
+        are not cached either.
+        """
+        if fields is not None:
+            fields = frozenset(fields)
+
+        cache_key = None
+        if self.decode_cache is not None and not lazy and fields is None:
+            message = bytes(message)
+            cache_key = (self, get_coding_policy(), None, message)
+            cached_messages = self.decode_cache.lookup(cache_key)
+            if cached_messages is not None:
+                return list(cached_messages)
+
+        possible_services = self._find_services_for_uds(message)
+
+        decoded_messages = self._decode_using_services(
+            message, possible_services, None, stats, lazy=lazy, fields=fields)
         if len(decoded_messages) == 0:
             raise DecodeError(
                 f"None of the services {possible_services} could parse {message.hex()}.")
+
+        if self.decode_cache is not None and cache_key is not None:
+            self.decode_cache.store(cache_key, decoded_messages)
         return decoded_messages
 
-    def decode_response(self, response: Union[bytes, bytearray],
-                        request: Union[bytes, bytearray, Message]) -> Iterable[Message]:
+    def decode_response(self,
+                        response: Union[bytes, bytearray],
+                        request: Union[bytes, bytearray, Message],
+                        stats: Optional[DecodeStatistics] = None,
+                        lazy: bool = False,
+                        fields: Optional[Iterable[str]] = None) -> Iterable[Message]:
+        """Decode a response message given the request which triggered it.
+
+        If a `DecodeStatistics` object is passed, it is updated with
+        the number of candidate services which were considered. If
+        the diag layer features a decode cache, messages which are
+        retrieved from the cache are not counted. For the `lazy`
+        and `fields` parameters, see `decode()`.
+
+        The services which are able to decode a raw request are
+        looked up using `request_correlation_index`, and only their
+        responses are considered.
+        """
+        if fields is not None:
+            fields = frozenset(fields)
+
+        request_service = None
         if isinstance(request, Message):
-            possible_services = [request.service]
+            request_service = request.service
+            request = request.coded_message
+        elif not isinstance(request, (bytes, bytearray)):
+            raise TypeError(f"Request parameter must have type "
+                            f"Message, bytes or bytearray but was {type(request)}")
+
+        cache_key = None
+        if self.decode_cache is not None and not lazy and fields is None:
+            response = bytes(response)
+            cache_key = (self, get_coding_policy(), (request_service, bytes(request)), response)
+            cached_messages = self.decode_cache.lookup(cache_key)
+            if cached_messages is not None:
+                return list(cached_messages)
+
+        if request_service is not None:
+            possible_services = [request_service]
         else:
-            if not isinstance(request, (bytes, bytearray)):
-                raise TypeError(f"Request parameter must have type "
-                                f"Message, bytes or bytearray but was {type(request)}")
-            possible_services = self._find_services_for_uds(request)
-        if possible_services is None:
-            raise DecodeError(f"Couldn't find corresponding service for request {request.hex()}.")
+            possible_services = self.request_correlation_index.find(request)
 
-        decoded_messages = []
-
-        for service in possible_services:
-            try:
-                decoded_messages.append(service.decode_message(response))
-            except DecodeError as e:
-                pass
+        decoded_messages = self._decode_using_services(
+            response, possible_services, request, stats, lazy=lazy, fields=fields)
         if len(decoded_messages) == 0:
             raise DecodeError(
                 f"None of the services {possible_services} could parse {response.hex()}.")
+
+        if self.decode_cache is not None and cache_key is not None:
+            self.decode_cache.store(cache_key, decoded_messages)
         return decoded_messages
 
+    def decode_iter(self,
+                    message: Union[bytes, bytearray],
+                    short_name: str,
+                    request: Optional[Union[bytes, bytearray, Message]] = None) -> Iterator[Any]:
+        """Decode the items of an end of PDU field of a message one by
+        one.
+
+        This is intended for responses which feature a very large
+        number of repeated items, e.g., ReadDTCInformation responses:
+
+        .. code-block:: python
+
+            for dtc_record in ecu.decode_iter(response, "dtc_records", request):
+                print(dtc_record)
+
+        The structure of the message is determined like for lazy
+        decoding (see `decode()`), and if the request is specified,
+        like for `decode_response()`. It must feature an end of PDU
+        field with the given short name, and it must be unique. The
+        items are then decoded by `BasicStructure.decode_iter()`.
+        """
+        if request is None:
+            messages = self.decode(message, lazy=True)
+        else:
+            messages = self.decode_response(message, request, lazy=True)
+
+        structures = []
+        for m in messages:
+            if m.structure not in structures and \
+                    m.structure.parameters.get(short_name) is not None:
+                structures.append(m.structure)
+        if len(structures) != 1:
+            raise DecodeError(f"The message {message.hex()} cannot be attributed to a single "
+                              f"structure featuring a field named '{short_name}'")
+
+        return structures[0].decode_iter(message, short_name)
+
+    def decode_batch(self, messages: Iterable[Union[bytes, bytearray]]) -> BatchDecodeResult:
+        """Decode a large number of request or response messages.
+
+        The messages are grouped by the service and the structure
+        which is able to decode them. If the structure exhibits a
+        static layout (see `VectorizedLayout`) and NumPy is
+        available, all messages of a group are decoded at once.
+        Otherwise, and for messages which cannot be attributed to a
+        single structure up front or which fail the checks of the
+        vectorized decoder, `decode()` is called for each message
+        individually.
+
+        The batches of the result are `MessageBatch` objects, each of
+        which stores the decoded values of a group of messages in
+        columns. Note that there may be several batches for the same
+        structure, e.g., a vectorized one and one for the messages
+        which needed to be decoded individually. Like for `decode()`,
+        a message which can be decoded by several structures is
+        ambiguous. It is included in the batches of all of these
+        structures, i.e., its index appears more than once.
+
+        Messages which cannot be decoded do not abort the batch. Their
+        indices are reported as the `failures` of the result instead.
+        """
+        coded_messages = [bytes(message) for message in messages]
+
+        groups: Dict[Tuple[DiagService, BasicStructure], List[int]] = {}
+        individual_indices: List[int] = []
+        for i, message in enumerate(coded_messages):
+            candidates = []
+            for service in self._find_services_for_uds(message):
+                message_type = service._find_admissible_message_type(message, None)
+                if message_type is not None:
+                    candidates.append((service, message_type))
+
+            if len(candidates) == 1:
+                groups.setdefault(candidates[0], []).append(i)
+            else:
+                individual_indices.append(i)
+
+        result: List[MessageBatch] = []
+        for (service, structure), indices in groups.items():
+            layout = structure.vectorized_layout
+            if layout is None:
+                individual_indices += indices
+                continue
+
+            vectorized_indices = [
+                i for i in indices if len(coded_messages[i]) == layout.byte_length
+            ]
+            individual_indices += [
+                i for i in indices if len(coded_messages[i]) != layout.byte_length
+            ]
+            if len(vectorized_indices) == 0:
+                continue
+
+            columns, is_valid = layout.decode([coded_messages[i] for i in vectorized_indices])
+            if not is_valid.all():
+                individual_indices += [i for i, v in zip(vectorized_indices, is_valid) if not v]
+                vectorized_indices = [i for i, v in zip(vectorized_indices, is_valid) if v]
+
+            result.append(
+                MessageBatch(
+                    service=service,
+                    structure=structure,
+                    indices=vectorized_indices,
+                    columns=columns,
+                    is_vectorized=True,
+                ))
+
+        individual_batches: Dict[Tuple[DiagService, BasicStructure], MessageBatch] = {}
+        failures: Dict[int, DecodeError] = {}
+        for i in sorted(individual_indices):
+            try:
+                decoded_messages = self.decode(coded_messages[i])
+            except DecodeError as e:
+                failures[i] = e
+                continue
+
+            for decoded_message in decoded_messages:
+                key = (decoded_message.service, decoded_message.structure)
+                batch = individual_batches.get(key)
+                if batch is None:
+                    batch = MessageBatch(
+                        service=decoded_message.service,
+                        structure=decoded_message.structure,
+                        indices=[],
+                        columns={},
+                        is_vectorized=False,
+                    )
+                    individual_batches[key] = batch
+
+                batch.indices.append(i)
+                for short_name, value in decoded_message.param_dict.items():
+                    batch.columns.setdefault(short_name, []).append(value)
+
+        result += individual_batches.values()
+        return BatchDecodeResult(batches=result, failures=failures)
+
+    def build_conversion_tables(self, max_entries: int = 1 << 20) -> int:
+        """Precompute the conversion tables of the DOPs of this diag layer.
+
+        Only DOPs featuring a short integer coded type can be
+        tabulated (cf. `DataObjectProperty.build_conversion_table()`).
+        The tables are built in the order of their size until the
+        total number of entries would exceed `max_entries`. Tables
+        which already exist count towards this limit.
+
+        Returns the number of DOPs which feature a conversion table.
+        """
+        dops = [
+            dop for dop in self.data_object_properties
+            if isinstance(dop, DataObjectProperty) and dop.conversion_table_size is not None
+        ]
+        dops.sort(key=lambda dop: (not dop.has_conversion_table, dop.conversion_table_size))
+
+        num_entries = 0
+        num_tables = 0
+        for dop in dops:
+            size = dop.conversion_table_size
+            assert size is not None
+            if num_entries + size > max_entries:
+                break
+            if dop.has_conversion_table or dop.build_conversion_table():
+                num_entries += size
+                num_tables += 1
+
+        return num_tables
+
     def get_communication_parameter(
         self,
         name: str,
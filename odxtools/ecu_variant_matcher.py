@@ -8,6 +8,7 @@ from odxtools.diaglayer import DiagLayer
 from odxtools.diaglayertype import DIAG_LAYER_TYPE
 from odxtools.ecu_variant_patterns import MatchingParameter
 from odxtools.exceptions import OdxError
+from odxtools.parameteraccessor import ParameterAccessor
 from odxtools.service import DiagService
 from odxtools.structures import Response
 
@@ -73,23 +74,28 @@ class EcuVariantMatcher:
         if service.negative_responses is not None:
             pos_neg_responses.extend(service.negative_responses)
 
+        # resolve the snref / snpathref before anything is decoded
+        accessors: List[ParameterAccessor] = []
         for any_response in pos_neg_responses:
-            decoded_val = any_response.decode(response_bytes)
-            # disassemble snref / snpathref
-            path_ref = matching_param.out_param_if.split(".")
-            for ref in path_ref:
-                if ref in decoded_val:
-                    decoded_val = decoded_val[ref]
-                else:
-                    decoded_val = None
-                    break
+            try:
+                accessors.append(any_response.accessor(matching_param.out_param_if))
+            except OdxError:
+                pass
+
+        if len(accessors) == 0:
+            raise OdxError(f"The snref or snpathref '{matching_param.out_param_if}' cannot be "
+                           f"resolved for any positive or negative response.")
+
+        for accessor in accessors:
+            if not accessor.structure.is_admissible(response_bytes):
+                continue
 
-            if decoded_val is not None:
-                if isinstance(decoded_val, str) or isinstance(decoded_val, int):
-                    return str(decoded_val)
+            decoded_val = accessor(response_bytes)
+            if isinstance(decoded_val, str) or isinstance(decoded_val, int):
+                return str(decoded_val)
 
-        raise OdxError(f"The snref or snpathref '{matching_param.out_param_if}' is cannot be \
-                resolved for any positive or negative response.")
+        raise OdxError(f"The value of '{matching_param.out_param_if}' cannot be extracted from "
+                       f"the response {response_bytes.hex()}.")
 
     def __init__(self, ecu_variant_candidates: List[DiagLayer], use_cache: bool = True):
 
@@ -1,31 +1,89 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
-from typing import Any, Dict, NamedTuple, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional, Tuple, Union
 
 from .odxlink import OdxLinkId
 
+if TYPE_CHECKING:
+    from .table import TableRow
 
-class EncodeState(NamedTuple):
+
+class EncodeState:
     """Utility class to be used while encoding a message.
 
-    While encoding parameters may update the dicts with new keys
-    but this is the only allowed change.
-    In particular the coded_message is not updated in-place.
-    Instead the new encode state can be constructed with::
+    While encoding, parameters may update the dicts with new keys
+    but this is the only allowed change. In particular, the
+    coded_message is not updated in-place by the parameters. Instead,
+    the structure which encodes the parameters advances the encode
+    state::
 
         for p in self.parameters:
-            prefix = p.encode_into_pdu(encode_state)
-            encode_state = encode_state._replace(coded_message=prefix)
+            encode_state.coded_message = p.encode_into_pdu(encode_state)
 
+    For compatibility with the former `NamedTuple` based
+    implementation, the `_replace()` and `_asdict()` methods as well
+    as iteration are still supported.
     """
 
-    coded_message: bytes
-    """payload that is constructed so far"""
-    parameter_values: Dict[str, Any]
-    """a mapping from short name to value for each parameter"""
-    triggering_request: Optional[Union[bytes, bytearray]] = None
-    """If encoding a response: request that triggered the response"""
-    length_keys: Dict[OdxLinkId, int] = {}
-    """Mapping from IDs to bit lengths (specified by LengthKeyParameters)"""
-    is_end_of_pdu: bool = False
-    """Flag whether the parameter is the last on the PDU (needed for MinMaxLengthType)"""
+    __slots__ = (
+        "coded_message",
+        "parameter_values",
+        "triggering_request",
+        "length_keys",
+        "is_end_of_pdu",
+        "table_keys",
+    )
+
+    _fields: Tuple[str, ...] = __slots__
+
+    def __init__(
+        self,
+        coded_message: Union[bytes, bytearray],
+        parameter_values: Dict[str, Any],
+        triggering_request: Optional[Union[bytes, bytearray]] = None,
+        length_keys: Optional[Dict[OdxLinkId, int]] = None,
+        is_end_of_pdu: bool = False,
+        table_keys: Optional[Dict[str, "TableRow"]] = None,
+    ) -> None:
+        self.coded_message = coded_message
+        """payload that is constructed so far"""
+        self.parameter_values = parameter_values
+        """a mapping from short name to value for each parameter"""
+        self.triggering_request = triggering_request
+        """If encoding a response: request that triggered the response"""
+        self.length_keys: Dict[OdxLinkId, int] = length_keys if length_keys is not None else {}
+        """Mapping from IDs to bit lengths (specified by LengthKeyParameters)"""
+        self.is_end_of_pdu = is_end_of_pdu
+        """Flag whether the parameter is the last on the PDU (needed for MinMaxLengthType)"""
+        self.table_keys: Dict[str, "TableRow"] = table_keys if table_keys is not None else {}
+        """Mapping from short names to table rows (specified by TableKeyParameters)"""
+
+    def _replace(self, **kwargs: Any) -> "EncodeState":
+        """Return a copy of the encode state with some attributes changed.
+
+        Note that the dicts of parameter values, length keys and
+        table keys are shared between the original and the copy.
+        """
+        result = EncodeState(*self)
+        for key, value in kwargs.items():
+            setattr(result, key, value)
+        return result
+
+    def _asdict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self._fields}
+
+    def __iter__(self) -> Iterator[Any]:
+        return (getattr(self, name) for name in self._fields)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, EncodeState):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    # encode states are mutable, i.e., they must not be used as keys
+    # of dicts or as members of sets
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return "EncodeState(" + ", ".join(
+            f"{name}={getattr(self, name)!r}" for name in self._fields) + ")"
@@ -1,10 +1,11 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
-from typing import TYPE_CHECKING, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Iterator, List, Optional, Union
 
 from .dataobjectproperty import DopBase
 from .decodestate import DecodeState
 from .encodestate import EncodeState
+from .exceptions import DecodeError
 from .odxlink import OdxDocFragment, OdxLinkDatabase, OdxLinkId, OdxLinkRef
 from .odxtypes import odxstr_to_bool
 from .structures import BasicStructure
@@ -119,28 +120,64 @@ class EndOfPduField(DopBase):
                               list), "The value of an End-of-PDU-field must be a list or a dict."
             # If the value is given as a list, each list element is a encoded seperately using the structure.
             coded_rpc = bytes()
+            item_encode_state = encode_state._replace()
             for value in physical_value:
-                encode_state = encode_state._replace(coded_message=bytes())
-                coded_rpc += self.structure.convert_physical_to_bytes(value, encode_state)
+                item_encode_state.coded_message = bytes()
+                coded_rpc += self.structure.convert_physical_to_bytes(value, item_encode_state)
             return coded_rpc
 
     def convert_bytes_to_physical(self, decode_state: DecodeState, bit_position: int = 0):
-        next_byte_position = decode_state.next_byte_position
-        byte_code = decode_state.coded_message
+        # the items are decoded using a private cursor which is
+        # advanced in place
+        item_decode_state = decode_state._replace()
+
+        value = list(self._iter_items(item_decode_state, bit_position, max_number_of_items=None))
+
+        return value, item_decode_state.next_byte_position
+
+    def decode_iter(self, decode_state: DecodeState, bit_position: int = 0) -> Iterator[Any]:
+        """Decode the repeated items one by one.
+
+        In contrast to `convert_bytes_to_physical()`, which returns
+        the list of all items, the items are decoded lazily, i.e., a
+        large number of items can be processed without keeping them
+        in memory. `decode_state` is advanced in place, i.e., after
+        an item has been yielded, `decode_state.next_byte_position`
+        is the position of the next item.
+
+        Decoding stops after `max_number_of_items` items even if the
+        PDU is not exhausted. If the PDU ends before
+        `min_number_of_items` items have been decoded, a
+        `DecodeError` is raised.
+        """
+        num_items = 0
+        for item in self._iter_items(decode_state, bit_position, self.max_number_of_items):
+            num_items += 1
+            yield item
+
+        if self.min_number_of_items is not None and num_items < self.min_number_of_items:
+            raise DecodeError(f"End of PDU field {self.short_name} contains {num_items} items, "
+                              f"but at least {self.min_number_of_items} are required")
+
+    def _iter_items(self, decode_state: DecodeState, bit_position: int,
+                    max_number_of_items: Optional[int]) -> Iterator[Any]:
+        num_items = 0
+        while len(decode_state.coded_message) > decode_state.next_byte_position:
+            if max_number_of_items is not None and num_items >= max_number_of_items:
+                return
 
-        value = []
-        while len(byte_code) > next_byte_position:
             # ATTENTION: the ODX specification is very misleading
             # here: it says that the item is repeated until the end of
             # the PDU, but it means that DOP of the items that are
             # repeated are identical, not their values
-            new_value, next_byte_position = self.structure.convert_bytes_to_physical(
+            value, next_byte_position = self.structure.convert_bytes_to_physical(
                 decode_state, bit_position=bit_position)
-            # Update next byte_position
-            decode_state = decode_state._replace(next_byte_position=next_byte_position)
-            value.append(new_value)
-
-        return value, next_byte_position
+            if next_byte_position <= decode_state.next_byte_position:
+                raise DecodeError(f"Item of end of PDU field {self.short_name} does not "
+                                  f"consume any bytes")
+            decode_state.next_byte_position = next_byte_position
+            num_items += 1
+            yield value
 
     def _resolve_references(  # type: ignore[override]
             self, parent_dl: "DiagLayer", odxlinks: OdxLinkDatabase) -> None:
@@ -155,6 +192,11 @@ class EndOfPduField(DopBase):
         elif self.env_data_desc_snref is not None:
             self._env_data_desc = parent_dl.data_object_properties[self.env_data_desc_snref]
 
+        if self.env_data_desc_ref is not None or self.env_data_desc_snref is not None:
+            # the items are decoded using the environment data
+            # description
+            self._structure = self._env_data_desc
+
     def __repr__(self) -> str:
         return f"EndOfPduField(short_name='{self.short_name}', ref='{self.structure.odx_id}')"
 
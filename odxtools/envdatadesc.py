@@ -1,18 +1,21 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-from .dataobjectproperty import DopBase
+from .dataobjectproperty import DiagnosticTroubleCode, DopBase
 from .decodestate import DecodeState
 from .encodestate import EncodeState
 from .envdata import EnvironmentData
-from .exceptions import DecodeError, EncodeError
+from .exceptions import DecodeError, EncodeError, OdxError
 from .globals import logger
-from .odxlink import OdxDocFragment, OdxLinkId, OdxLinkRef
+from .odxlink import OdxDocFragment, OdxLinkDatabase, OdxLinkId, OdxLinkRef
 from .odxtypes import odxstr_to_bool
 from .utils import create_description_from_et
 
+if TYPE_CHECKING:
+    from .diaglayer import DiagLayer
+
 
 class EnvironmentDataDescription(DopBase):
     """This class represents Environment Data Description, which is a complex DOP
@@ -38,6 +41,9 @@ class EnvironmentDataDescription(DopBase):
         self.param_snref = param_snref
         self.param_snpathref = param_snpathref
 
+        self._env_datas: List[EnvironmentData] = list(env_datas)
+        self._build_env_data_index()
+
     @staticmethod
     def from_et(et_element, doc_frags: List[OdxDocFragment]) -> "EnvironmentDataDescription":
         """Reads Environment Data Description from Diag Layer."""
@@ -96,19 +102,152 @@ class EnvironmentDataDescription(DopBase):
             f"env_data_refs='{self.env_data_refs}'",
         ]) + ")")
 
+    def _resolve_references(  # type: ignore[override]
+            self, parent_dl: "DiagLayer", odxlinks: OdxLinkDatabase) -> None:
+        super()._resolve_references(odxlinks)
+
+        for ed in self.env_datas:
+            ed._resolve_references(parent_dl, odxlinks)
+
+        self._env_datas = list(self.env_datas)
+        for ref in self.env_data_refs:
+            env_data = odxlinks.resolve(ref)
+            assert isinstance(env_data, EnvironmentData)
+            self._env_datas.append(env_data)
+
+        self._build_env_data_index()
+
+    def _build_env_data_index(self) -> None:
+        """Build the dict which maps the DTCs to the applicable
+        environment data objects.
+
+        ODX mandates that there is at most one environment data
+        object for all DTCs (ALL-VALUE) and at most one for each
+        individual DTC. If there are more, the first one is used.
+        """
+        self._all_value_env_data: Optional[EnvironmentData] = None
+        self._env_datas_by_dtc: Dict[int, EnvironmentData] = {}
+        for env_data in self._env_datas:
+            if not env_data.dtc_values:
+                # environment data objects which do not specify any
+                # DTC values apply to all DTCs
+                if self._all_value_env_data is None:
+                    self._all_value_env_data = env_data
+                continue
+
+            for dtc_value in env_data.dtc_values:
+                self._env_datas_by_dtc.setdefault(dtc_value, env_data)
+
+    def get_env_datas(self, trouble_code: int) -> List[EnvironmentData]:
+        """Return the environment data objects which apply to a DTC.
+
+        These are the environment data object for all DTCs (if any),
+        followed by the one for the specific DTC (if any).
+        """
+        result = []
+        if self._all_value_env_data is not None:
+            result.append(self._all_value_env_data)
+        env_data = self._env_datas_by_dtc.get(trouble_code)
+        if env_data is not None:
+            result.append(env_data)
+        return result
+
+    def _get_trouble_code(self, dtc_value: Any) -> int:
+        if isinstance(dtc_value, DiagnosticTroubleCode):
+            return dtc_value.trouble_code
+        elif isinstance(dtc_value, int):
+            return dtc_value
+        raise OdxError(f"The value {dtc_value!r} of the DTC parameter referenced by "
+                       f"{self.short_name} is not a trouble code")
+
+    @property
+    def dtc_parameter_path(self) -> Optional[List[str]]:
+        """The short names of the path to the parameter which
+        specifies the DTC (None if it is not referenced)
+
+        The parameter is referenced either by its short name or by a
+        path of short names which is separated by dots.
+        """
+        if self.param_snref is not None:
+            return [self.param_snref]
+        elif self.param_snpathref is not None:
+            return self.param_snpathref.split(".")
+        return None
+
+    def _get_dtc_value(self, param_values: Dict[str, Any]) -> Any:
+        """Return the value of the parameter which specifies the DTC."""
+        path = self.dtc_parameter_path
+        if path is None:
+            raise OdxError(f"Environment data description {self.short_name} does not "
+                           f"reference the parameter which specifies the DTC")
+
+        value: Any = param_values
+        for short_name in path:
+            if not isinstance(value, dict) or short_name not in value:
+                raise OdxError(f"The DTC parameter {'.'.join(path)} referenced by "
+                               f"{self.short_name} has not been specified")
+            value = value[short_name]
+
+        return value
+
     def convert_physical_to_bytes(self, physical_value, encode_state: EncodeState,
                                   bit_position: int) -> bytes:
         """Convert the physical value into bytes.
 
-        Since environmental data is supposed to never appear on the
-        wire, this method just raises an EncodeError exception.
+        The physical value is a dict of the values of the parameters
+        of all environment data objects which apply to the DTC
+        specified by the parameter referenced by the environment
+        data description.
         """
-        raise EncodeError("EnvironmentDataDescription DOPs cannot be encoded or decoded")
+        if bit_position != 0:
+            raise EncodeError("Environment data descriptions must be aligned, i.e., "
+                              f"bit_position=0, but {self.short_name} was passed the bit "
+                              f"position {bit_position}")
+        try:
+            trouble_code = self._get_trouble_code(
+                self._get_dtc_value(encode_state.parameter_values))
+        except OdxError as e:
+            raise EncodeError(str(e))
+
+        result = bytearray()
+        for env_data in self.get_env_datas(trouble_code):
+            result += env_data.convert_physical_to_bytes(
+                {
+                    param.short_name: physical_value[param.short_name]
+                    for param in env_data.parameters
+                    if param.short_name in physical_value
+                },
+                encode_state,
+                bit_position=0,
+            )
+        return bytes(result)
 
     def convert_bytes_to_physical(self, decode_state: DecodeState, bit_position: int = 0):
         """Extract the bytes from the PDU and convert them to the physical value.
 
-        Since environmental data is supposed to never appear on the
-        wire, this method just raises an DecodeError exception.
+        The environment data objects which apply to the DTC specified
+        by the referenced parameter are decoded consecutively and the
+        values of their parameters are merged into a single dict.
         """
-        raise DecodeError("EnvironmentDataDescription DOPs cannot be encoded or decoded")
+        if bit_position != 0:
+            raise DecodeError("Environment data descriptions must be aligned, i.e., "
+                              f"bit_position=0, but {self.short_name} was passed the bit "
+                              f"position {bit_position}")
+        param_values = {
+            pv.parameter.short_name: pv.value
+            for pv in decode_state.parameter_value_pairs
+        }
+        try:
+            trouble_code = self._get_trouble_code(self._get_dtc_value(param_values))
+        except OdxError as e:
+            raise DecodeError(str(e))
+
+        result: Dict[str, Any] = {}
+        next_byte_position = decode_state.next_byte_position
+        for env_data in self.get_env_datas(trouble_code):
+            env_data_decode_state = decode_state._replace(next_byte_position=next_byte_position)
+            env_data_values, next_byte_position = env_data.convert_bytes_to_physical(
+                env_data_decode_state)
+            result.update(env_data_values)
+
+        return result, next_byte_position
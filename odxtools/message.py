@@ -1,27 +1,76 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
-from typing import Union
+from typing import Any, Dict, Optional, Union
 
 
 class Message:
-    """A CAN message with its interpretation."""
+    """A CAN message with its interpretation.
 
-    def __init__(self, *, coded_message: Union[bytes, bytearray], service, structure,
-                 param_dict: dict):
+    Decoded messages should be treated as read-only: If the diag
+    layer which decoded the message features a `DecodeCache`, the
+    same object is returned for all identical telegrams.
+
+    If no parameter dict is specified, the message is "lazy", i.e.,
+    the coded message is only decoded when the parameter dict is
+    accessed for the first time. Accessing individual parameters via
+    `message[short_name]` only decodes the parameter in question if
+    its position within the message is known in advance. Note that
+    for lazy messages, `DecodeError`s are only raised (or warned
+    about) once the respective parameters are decoded.
+    """
+
+    def __init__(self,
+                 *,
+                 coded_message: Union[bytes, bytearray],
+                 service,
+                 structure,
+                 param_dict: Optional[dict] = None):
         """
         Parameters
         ----------
         coded_message : bytes or bytearray
         service : DiagService
         structure : Request or Response
-        param_dict : dict
+        param_dict : dict or None
+            the decoded parameters. If None, the parameters are
+            decoded on demand.
         """
         self.coded_message = coded_message
         self.service = service
         self.structure = structure
-        self.param_dict = param_dict
+        self._param_dict = param_dict
+        # values of the parameters of lazy messages which have been
+        # decoded individually
+        self._param_values: Dict[str, Any] = {}
+
+    @property
+    def param_dict(self) -> dict:
+        if self._param_dict is None:
+            self._param_dict = self.structure.decode(self.coded_message)
+        return self._param_dict
+
+    @param_dict.setter
+    def param_dict(self, value: dict) -> None:
+        self._param_dict = value
+
+    @property
+    def is_decoded(self) -> bool:
+        """True iff the parameter dict of the message is available
+        without decoding the coded message"""
+        return self._param_dict is not None
 
     def __getitem__(self, key: str):
+        if self._param_dict is not None:
+            return self._param_dict[key]
+
+        if key in self._param_values:
+            return self._param_values[key]
+
+        if self.structure.can_decode_parameter_individually(key):
+            value = self.structure.decode_parameter(self.coded_message, key)
+            self._param_values[key] = value
+            return value
+
         return self.param_dict[key]
 
     def __str__(self):
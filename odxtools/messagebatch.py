@@ -0,0 +1,272 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2022 MBition GmbH
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Sequence
+
+from .dataobjectproperty import DataObjectProperty, DtcDop
+from .diagcodedtypes import StandardLengthType
+from .exceptions import DecodeError
+from .odxtypes import DataType
+from .parameters import (CodedConstParameter, NrcConstParameter, PhysicalConstantParameter,
+                         ReservedParameter, ValueParameter)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from .service import DiagService
+    from .structures import BasicStructure
+
+
+class MessageBatch(NamedTuple):
+    """A group of messages which were decoded using the same
+    structure of the same service.
+
+    Instead of a parameter dict per message, the decoded values are
+    stored in columns, i.e., `columns[short_name][i]` is the value of
+    the parameter `short_name` of the message `indices[i]`.
+    """
+
+    service: "DiagService"
+    structure: "BasicStructure"
+    indices: List[int]
+    """The positions of the messages within the decoded sequence"""
+    columns: Dict[str, Any]
+    """Mapping from the short names of the parameters to their values"""
+    is_vectorized: bool
+    """If true, the columns are NumPy arrays. Else, they are lists of
+    the values which would be returned by `DiagLayer.decode()`.
+    Reserved parameters are not included in vectorized batches."""
+
+
+class BatchDecodeResult(NamedTuple):
+    """The result of `DiagLayer.decode_batch()`."""
+
+    batches: List[MessageBatch]
+    """The decoded messages grouped by service and structure"""
+    failures: Dict[int, DecodeError]
+    """Mapping from the positions of the messages which could not be
+    decoded to the respective errors"""
+
+
+class _VectorizedField(NamedTuple):
+    parameter: Any
+    name: str
+    """name of the field within the structured NumPy dtype"""
+    byte_length: int
+    bit_position: int
+    bit_length: int
+    base_data_type: DataType
+    is_highlow_byte_order: bool
+
+
+_VECTORIZABLE_BASE_DATA_TYPES = [
+    DataType.A_INT32,
+    DataType.A_UINT32,
+    DataType.A_FLOAT32,
+    DataType.A_FLOAT64,
+]
+
+
+class VectorizedLayout:
+    """Decodes many messages of a structure at once using NumPy.
+
+    This is only possible for structures with a static layout, i.e.,
+    if the positions of all parameters are known in advance and if
+    all parameters are numbers which are coded using a standard
+    length type. Use `from_structure()` to check whether a structure
+    meets these criteria.
+
+    The coded messages are interpreted as an array of records using a
+    structured NumPy dtype which is derived from the byte positions
+    and the coded types of the parameters. Values which are not
+    byte-aligned are subsequently shifted and masked.
+    """
+
+    def __init__(self, fields: List[_VectorizedField], dtype: Any, byte_length: int) -> None:
+        self.fields = fields
+        self.dtype = dtype
+        self.byte_length = byte_length
+        """The length of the messages which can be decoded"""
+
+    @staticmethod
+    def from_structure(structure: "BasicStructure") -> Optional["VectorizedLayout"]:
+        """Return the vectorized layout of a structure, or None if
+        its messages cannot be decoded in a vectorized fashion."""
+        if np is None:
+            return None
+
+        fields: List[_VectorizedField] = []
+        names: List[str] = []
+        formats: List[Any] = []
+        offsets: List[int] = []
+        next_byte_position = 0
+        byte_length = 0
+        for param in structure.parameters:
+            if isinstance(param, (CodedConstParameter, NrcConstParameter)):
+                diag_coded_type = param.diag_coded_type
+            elif isinstance(param, ReservedParameter):
+                diag_coded_type = None
+            elif isinstance(param, (ValueParameter, PhysicalConstantParameter)) and \
+                    _is_vectorizable_dop(param.dop):
+                diag_coded_type = param.dop.diag_coded_type  # type: ignore[union-attr]
+            else:
+                return None
+
+            if diag_coded_type is None:
+                bit_length = param.bit_length
+                base_data_type = DataType.A_UINT32
+                is_highlow_byte_order = True
+            elif isinstance(diag_coded_type, StandardLengthType) and \
+                    diag_coded_type.bit_mask is None and \
+                    diag_coded_type.base_data_type in _VECTORIZABLE_BASE_DATA_TYPES:
+                bit_length = diag_coded_type.bit_length
+                base_data_type = diag_coded_type.base_data_type
+                is_highlow_byte_order = diag_coded_type.is_highlow_byte_order
+            else:
+                return None
+
+            byte_position = param.byte_position
+            if byte_position is None:
+                byte_position = next_byte_position
+            bit_position = param.bit_position or 0
+            param_byte_length = (bit_position + bit_length + 7) // 8
+            if bit_length == 0 or param_byte_length > 8:
+                return None
+
+            byte_order = ">" if is_highlow_byte_order else "<"
+            if base_data_type in [DataType.A_FLOAT32, DataType.A_FLOAT64]:
+                if bit_position != 0 or bit_length not in [32, 64]:
+                    return None
+                field_format: Any = f"{byte_order}f{param_byte_length}"
+            elif bit_length > 32:
+                return None
+            elif param_byte_length in [1, 2, 4, 8]:
+                field_format = f"{byte_order}u{param_byte_length}"
+            else:
+                # the bytes are combined manually
+                field_format = ("u1", (param_byte_length,))
+
+            field = _VectorizedField(
+                parameter=param,
+                name=f"f{len(fields)}",
+                byte_length=param_byte_length,
+                bit_position=bit_position,
+                bit_length=bit_length,
+                base_data_type=base_data_type,
+                is_highlow_byte_order=is_highlow_byte_order,
+            )
+            fields.append(field)
+            names.append(field.name)
+            formats.append(field_format)
+            offsets.append(byte_position)
+
+            next_byte_position = max(next_byte_position, byte_position + param_byte_length)
+            byte_length = max(byte_length, byte_position + param_byte_length)
+
+        if len(fields) == 0:
+            return None
+
+        dtype = np.dtype({
+            "names": names,
+            "formats": formats,
+            "offsets": offsets,
+            "itemsize": byte_length,
+        })
+        return VectorizedLayout(fields, dtype, byte_length)
+
+    def decode(self, messages: Sequence[bytes]) -> Any:
+        """Decode messages of length `byte_length`.
+
+        Returns a tuple of a dict which maps the short names of the
+        parameters to arrays of their physical values and a boolean
+        array which specifies for each message whether it passed all
+        checks. The columns only contain the values of the messages
+        which passed the checks. Messages which did not pass them,
+        e.g., because of a mismatching constant or of an internal
+        value which is outside of the limits of a compu method, must
+        be decoded individually in order to get the proper
+        `DecodeError`.
+        """
+        records = np.frombuffer(b"".join(messages), dtype=self.dtype)
+        is_valid = np.ones(len(records), dtype=bool)
+        internal_columns: Dict[str, Any] = {}
+        for field in self.fields:
+            internal = self._extract_internal(field, records[field.name])
+            param = field.parameter
+
+            if isinstance(param, ReservedParameter):
+                is_valid &= internal == 0
+                continue
+            elif isinstance(param, CodedConstParameter):
+                is_valid &= internal == param.coded_value
+            elif isinstance(param, NrcConstParameter):
+                is_valid &= np.isin(internal, param.coded_values)
+            else:
+                is_valid &= param.dop.compu_method.is_valid_internal_array(internal)
+            internal_columns[param.short_name] = internal
+
+        # only the values which passed the checks can be converted
+        columns: Dict[str, Any] = {}
+        for field in self.fields:
+            param = field.parameter
+            if isinstance(param, ReservedParameter):
+                continue
+
+            internal = internal_columns[param.short_name][is_valid]
+            if isinstance(param, (CodedConstParameter, NrcConstParameter)):
+                columns[param.short_name] = internal
+                continue
+
+            columns[param.short_name] = \
+                param.dop.compu_method.convert_internal_to_physical_array(internal)
+
+        # physical constants can only be checked after the conversion
+        is_valid_physical = np.ones(np.count_nonzero(is_valid), dtype=bool)
+        for field in self.fields:
+            param = field.parameter
+            if isinstance(param, PhysicalConstantParameter):
+                is_valid_physical &= columns[param.short_name] == param.physical_constant_value
+        if not is_valid_physical.all():
+            is_valid[is_valid] = is_valid_physical
+            columns = {name: column[is_valid_physical] for name, column in columns.items()}
+
+        return columns, is_valid
+
+    @staticmethod
+    def _extract_internal(field: _VectorizedField, raw: Any) -> Any:
+        if field.base_data_type in [DataType.A_FLOAT32, DataType.A_FLOAT64]:
+            return raw.astype("float64")
+
+        if raw.ndim == 2:
+            # combine the bytes of a value whose length is not a power of two
+            byte_indices = range(field.byte_length)
+            if not field.is_highlow_byte_order:
+                byte_indices = reversed(byte_indices)  # type: ignore[assignment]
+            combined = np.zeros(len(raw), dtype="uint64")
+            for i in byte_indices:
+                combined = (combined << np.uint64(8)) | raw[:, i]
+            raw = combined
+
+        internal = (raw.astype("uint64") >> np.uint64(field.bit_position)) & np.uint64(
+            (1 << field.bit_length) - 1)
+        internal = internal.astype("int64")
+        if field.base_data_type == DataType.A_INT32:
+            # two's complement
+            sign_bit = 1 << (field.bit_length - 1)
+            internal = np.where(internal >= sign_bit, internal - 2 * sign_bit, internal)
+
+        return internal
+
+
+def _is_vectorizable_dop(dop: Any) -> bool:
+    if not isinstance(dop, DataObjectProperty) or isinstance(dop, DtcDop):
+        return False
+    if dop.compu_method is None:
+        return False
+
+    # the scalar decoding path refuses internal values whose python
+    # type does not match the internal type of the compu method
+    internal_type = dop.compu_method.internal_type.as_python_type()
+    return internal_type in [float, dop.diag_coded_type.base_data_type.as_python_type()]
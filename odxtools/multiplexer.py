@@ -2,8 +2,10 @@
 # Copyright (c) 2022 MBition GmbH
 from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+from .compumethods import Limit
+from .compumethods._intervalindex import IntervalIndex
 from .dataobjectproperty import DataObjectProperty, DopBase
 from .decodestate import DecodeState
 from .encodestate import EncodeState
@@ -146,6 +148,14 @@ class Multiplexer(DopBase):
     default_case: Optional[MultiplexerDefaultCase]
     cases: List[MultiplexerCase]
 
+    def __post_init__(self) -> None:
+        # the limits of the cases parsed using the type of the switch
+        # key, an index of these limits and the cases by name. These
+        # are computed when the references are resolved.
+        self._case_limits: List[Tuple[Any, Any]] = []
+        self._case_index: Optional[IntervalIndex] = None
+        self._case_indices_by_name: Dict[str, int] = {}
+
     @staticmethod
     def from_et(et_element, doc_frags: List[OdxDocFragment]) -> "Multiplexer":
         """Reads a Multiplexer from Diag Layer."""
@@ -190,6 +200,15 @@ class Multiplexer(DopBase):
         upper_limit = key_type.make_from(case.upper_limit)
         return lower_limit, upper_limit
 
+    def _build_case_index(self) -> IntervalIndex:
+        self._case_limits = [self._get_case_limits(case) for case in self.cases or []]
+        self._case_index = IntervalIndex([(Limit(lower_limit), Limit(upper_limit))
+                                          for lower_limit, upper_limit in self._case_limits])
+        self._case_indices_by_name = {}
+        for i, case in enumerate(self.cases or []):
+            self._case_indices_by_name.setdefault(case.short_name, i)
+        return self._case_index
+
     def convert_physical_to_bytes(self, physical_value, encode_state: EncodeState,
                                   bit_position: int) -> bytes:
 
@@ -205,39 +224,44 @@ class Multiplexer(DopBase):
         key_pos = self.switch_key.byte_position
         case_pos = self.byte_position
 
-        for case in self.cases or []:
-            if case.short_name == case_name:
-                if case._structure:
-                    case_bytes = case._structure.convert_physical_to_bytes(
-                        case_value, encode_state, 0)
-                else:
-                    case_bytes = bytes()
+        if self._case_index is None:
+            self._build_case_index()
+        case_idx = self._case_indices_by_name.get(case_name)
+        if case_idx is None:
+            raise EncodeError(f"The case {case_name} is not found in Multiplexer {self.short_name}")
+        case = self.cases[case_idx]
 
-                key_value, _ = self._get_case_limits(case)
-                sk_bit_position = self.switch_key.bit_position
-                sk_bit_position = sk_bit_position if sk_bit_position is not None else 0
-                key_bytes = self.switch_key._dop.convert_physical_to_bytes(
-                    key_value, encode_state, sk_bit_position)
+        if case._structure:
+            case_bytes = case._structure.convert_physical_to_bytes(case_value, encode_state, 0)
+        else:
+            case_bytes = bytes()
 
-                mux_len = max(len(key_bytes) + key_pos, len(case_bytes) + case_pos)
-                mux_bytes = bytearray(mux_len)
-                mux_bytes[key_pos:key_pos + len(key_bytes)] = key_bytes
-                mux_bytes[case_pos:case_pos + len(case_bytes)] = case_bytes
+        key_value, _ = self._case_limits[case_idx]
+        sk_bit_position = self.switch_key.bit_position
+        sk_bit_position = sk_bit_position if sk_bit_position is not None else 0
+        key_bytes = self.switch_key._dop.convert_physical_to_bytes(key_value, encode_state,
+                                                                   sk_bit_position)
 
-                return bytes(mux_bytes)
+        mux_len = max(len(key_bytes) + key_pos, len(case_bytes) + case_pos)
+        mux_bytes = bytearray(mux_len)
+        mux_bytes[key_pos:key_pos + len(key_bytes)] = key_bytes
+        mux_bytes[case_pos:case_pos + len(case_bytes)] = case_bytes
 
-        raise EncodeError(f"The case {case_name} is not found in Multiplexer {self.short_name}")
+        return bytes(mux_bytes)
 
     def convert_bytes_to_physical(self, decode_state: DecodeState, bit_position: int = 0):
 
         if bit_position != 0:
             raise DecodeError("Multiplexer must be aligned, i.e. bit_position=0, but "
                               f"{self.short_name} was passed the bit position {bit_position}")
-        byte_code = decode_state.coded_message[decode_state.next_byte_position:]
+        # the switch key and the case are decoded directly from the
+        # coded message, i.e., the positions are absolute
         key_decode_state = DecodeState(
-            coded_message=byte_code[self.switch_key.byte_position:],
+            coded_message=decode_state.coded_message,
             parameter_value_pairs=[],
-            next_byte_position=0,
+            next_byte_position=decode_state.next_byte_position + self.switch_key.byte_position,
+            length_keys=decode_state.length_keys,
+            table_keys=decode_state.table_keys,
         )
         bit_position_int = (
             self.switch_key.bit_position if self.switch_key.bit_position is not None else 0)
@@ -245,35 +269,31 @@ class Multiplexer(DopBase):
             key_decode_state, bit_position=bit_position_int)
 
         case_decode_state = DecodeState(
-            coded_message=byte_code[self.byte_position:],
+            coded_message=decode_state.coded_message,
             parameter_value_pairs=[],
-            next_byte_position=0,
+            next_byte_position=decode_state.next_byte_position + self.byte_position,
+            length_keys=decode_state.length_keys,
+            table_keys=decode_state.table_keys,
         )
-        case_found = False
-        case_next_byte = 0
-        case_value = None
-        for case in self.cases or []:
-            lower, upper = self._get_case_limits(case)
-            if lower <= key_value and key_value <= upper:
-                case_found = True
-                if case._structure:
-                    case_value, case_next_byte = case._structure.convert_bytes_to_physical(
-                        case_decode_state)
-                break
-
-        if not case_found and self.default_case is not None:
-            case_found = True
-            if self.default_case._structure:
-                case_value, case_next_byte = self.default_case._structure.convert_bytes_to_physical(
-                    case_decode_state)
-
-        if not case_found:
+        case_index = self._case_index
+        if case_index is None:
+            case_index = self._build_case_index()
+
+        i = case_index.find(key_value)
+        case: Union[MultiplexerCase, MultiplexerDefaultCase, None] = (
+            self.cases[i] if i >= 0 else self.default_case)
+        if case is None:
             raise DecodeError(
                 f"Failed to find a matching case in {self.short_name} for value {key_value}")
 
+        case_value = None
+        case_next_byte = case_decode_state.next_byte_position
+        if case._structure:
+            case_value, case_next_byte = case._structure.convert_bytes_to_physical(
+                case_decode_state)
+
         mux_value = OrderedDict({case.short_name: case_value})
-        mux_next_byte = decode_state.next_byte_position + max(
-            key_next_byte + self.switch_key.byte_position, case_next_byte + self.byte_position)
+        mux_next_byte = max(key_next_byte, case_next_byte)
         return mux_value, mux_next_byte
 
     def _build_odxlinks(self) -> Dict[OdxLinkId, Any]:
@@ -289,6 +309,9 @@ class Multiplexer(DopBase):
         for case in self.cases or []:
             case._resolve_references(odxlinks)
 
+        if self.switch_key._dop is not None:
+            self._build_case_index()
+
     def __repr__(self) -> str:
         return (f"Multiplexer('{self.short_name}', " + ", ".join([
             f"odx_id='{self.odx_id}'",
@@ -0,0 +1,123 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2022 MBition GmbH
+from typing import TYPE_CHECKING, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from .decodestatistics import DecodeStatistics
+from .message import Message
+from .service import DiagService
+from .structures import Response
+from .uds import NegativeResponseCodes, NegativeResponseId
+
+if TYPE_CHECKING:
+    from .diaglayer import DiagLayer
+
+_NEGATIVE_RESPONSE_CODES: Dict[int, NegativeResponseCodes] = {
+    nrc.value: nrc
+    for nrc in NegativeResponseCodes
+}
+
+
+class NegativeResponse(NamedTuple):
+    """A UDS negative response which has been classified without
+    decoding it.
+
+    Negative responses always exhibit the format `[0x7f,
+    service_id_of_request, response_code, ...]`. The result of the
+    classification provides these fields as well as the negative
+    responses of the diag layer's services which may be used to
+    decode the message. The full structured decode is only done on
+    demand by `decode()`.
+    """
+
+    coded_message: bytes
+    """The raw negative response"""
+    request_sid: int
+    """The service ID of the request which was rejected"""
+    response_code: int
+    """The negative response code (NRC)"""
+    candidates: List[Tuple[DiagService, Response]]
+    """(service, negative response) pairs which match the request SID
+    and the response code"""
+    diag_layer: "DiagLayer"
+    """The diag layer which classified the message"""
+
+    @property
+    def nrc(self) -> Optional[NegativeResponseCodes]:
+        """The response code as standardized by UDS (None if it is
+        not a standardized one)"""
+        return _NEGATIVE_RESPONSE_CODES.get(self.response_code)
+
+    @property
+    def is_response_pending(self) -> bool:
+        """True iff the ECU only indicated that it requires more time"""
+        return self.response_code == NegativeResponseCodes.ResponsePending
+
+    def decode(self,
+               request: Optional[Union[bytes, bytearray, Message]] = None,
+               stats: Optional[DecodeStatistics] = None) -> Iterable[Message]:
+        """Decode the negative response using the structures of the
+        diag layer.
+
+        If the request which triggered the response is specified,
+        `DiagLayer.decode_response()` is used, else `DiagLayer.decode()`.
+        """
+        if request is not None:
+            return self.diag_layer.decode_response(self.coded_message, request, stats=stats)
+        return self.diag_layer.decode(self.coded_message, stats=stats)
+
+
+class NegativeResponseIndex:
+    """Maps the request service IDs and the response codes of UDS
+    negative responses to the negative responses of diagnostic
+    services.
+
+    The request SID of a negative response is the first byte of the
+    service's request or the constant value specified by the
+    response. The response code is either constant, restricted to
+    the values of an NRC-CONST parameter at byte position 2, or
+    arbitrary. In the latter case and if the request SID cannot be
+    determined, the response is stored using `None` as a wildcard.
+    """
+
+    def __init__(self, services: Iterable[DiagService]) -> None:
+        self.entries: Dict[Tuple[Optional[int], Optional[int]], List[Tuple[DiagService,
+                                                                           Response]]] = {}
+        """Mapping from (request SID, response code) to the matching
+        (service, negative response) pairs"""
+
+        for service in services:
+            assert service.request is not None
+            assert service.negative_responses is not None
+
+            request_prefix = service.request.coded_const_prefix()
+            for response in service.negative_responses:
+                for key in self._compute_keys(response, request_prefix):
+                    self.entries.setdefault(key, []).append((service, response))
+
+    @staticmethod
+    def _compute_keys(response: Response,
+                      request_prefix: bytes) -> List[Tuple[Optional[int], Optional[int]]]:
+        prefix = response.coded_const_prefix(request_prefix=request_prefix)
+        if len(prefix) > 0 and prefix[0] != NegativeResponseId:
+            # the response cannot be decoded as a UDS negative response
+            return []
+
+        request_sid = prefix[1] if len(prefix) > 1 else None
+        if len(prefix) > 2:
+            return [(request_sid, prefix[2])]
+
+        for byte_position, byte_length, allowed_bytes in \
+                response.admissibility_checks.nrc_const_bytes:
+            if byte_position == 2 and byte_length == 1:
+                return [(request_sid, x[0]) for x in sorted(allowed_bytes)]
+
+        return [(request_sid, None)]
+
+    def find(self, request_sid: int, response_code: int) -> List[Tuple[DiagService, Response]]:
+        """Return the (service, negative response) pairs which match a
+        request SID and a response code"""
+        result: List[Tuple[DiagService, Response]] = []
+        for key in ((request_sid, response_code), (request_sid, None), (None, response_code),
+                    (None, None)):
+            result += self.entries.get(key, [])
+        return result
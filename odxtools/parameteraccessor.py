@@ -0,0 +1,131 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2022 MBition GmbH
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple, Union
+
+from .decodestate import DecodeState
+from .exceptions import OdxError
+from .message import Message
+from .parameters import Parameter, ParameterWithDOP
+
+if TYPE_CHECKING:
+    from .endofpdufield import EndOfPduField
+    from .structures import BasicStructure
+
+
+class ParameterAccessor:
+    """Extracts the value of a possibly nested parameter from the
+    messages of a structure.
+
+    The parameter is specified by a path of short names which are
+    separated by dots, e.g., `"name.english"` refers to the parameter
+    `english` of the structure which is used by the parameter `name`.
+    The path is resolved using the definition of the structure when
+    the accessor is created, i.e., paths which cannot be resolved
+    raise an `OdxError` right away:
+
+    .. code-block:: python
+
+        accessor = response.accessor("name.english")
+        for message in messages:
+            print(accessor(message))
+
+    Accessors can be applied to `Message` objects, to parameter dicts
+    and to raw messages. If the position of the parameter does not
+    depend on the message (see `is_static`), its value is decoded
+    directly from raw messages. Otherwise, only the top-level
+    parameter of the path is decoded.
+    """
+
+    def __init__(self, structure: "BasicStructure", path: str) -> None:
+        from .structures import BasicStructure
+
+        self.structure = structure
+        self.path = path
+        self.short_names: Tuple[str, ...] = tuple(path.split("."))
+
+        parameters = []
+        container: BasicStructure = structure
+        # byte position of the innermost structure within the message
+        # (None if it depends on the message)
+        byte_offset: Optional[int] = 0
+        for i, short_name in enumerate(self.short_names):
+            parameter_layout = container.layout.parameter_index.get(short_name)
+            if parameter_layout is None:
+                raise OdxError(f"Cannot resolve '{path}' for structure {structure.short_name}: "
+                               f"{container.short_name} does not feature a parameter "
+                               f"named '{short_name}'")
+            parameter = parameter_layout.parameter
+            parameters.append(parameter)
+
+            if i == len(self.short_names) - 1:
+                break
+
+            if not isinstance(parameter, ParameterWithDOP) or \
+                    not isinstance(parameter.dop, BasicStructure):
+                raise OdxError(f"Cannot resolve '{path}' for structure {structure.short_name}: "
+                               f"parameter '{short_name}' is not a structure")
+            if byte_offset is not None and parameter_layout.byte_position is not None and \
+                    parameter_layout.bit_position == 0:
+                byte_offset += parameter_layout.byte_position
+            else:
+                byte_offset = None
+            container = parameter.dop
+
+        self.parameters: Tuple[Union[Parameter, "EndOfPduField"], ...] = tuple(parameters)
+        """The parameters along the path"""
+
+        # position of the parameter if it can be decoded directly
+        self._static_position: Optional[Tuple[int, Parameter, int]] = None
+        if byte_offset is not None:
+            param_info = container._get_individually_decodable_parameters().get(
+                self.short_names[-1])
+            if param_info is not None:
+                self._static_position = (byte_offset, *param_info)
+
+    @property
+    def parameter(self) -> Union[Parameter, "EndOfPduField"]:
+        """The parameter which is accessed"""
+        return self.parameters[-1]
+
+    @property
+    def is_static(self) -> bool:
+        """True iff the value of the parameter can be decoded from raw
+        messages without decoding any other parameter"""
+        return self._static_position is not None
+
+    def __call__(self, message: Union[Message, Dict[str, Any], bytes, bytearray]) -> Any:
+        """Return the value of the parameter for a decoded message, a
+        parameter dict or a raw message."""
+        if isinstance(message, Message):
+            if message.structure is not self.structure:
+                raise ValueError(f"The message has been decoded using {message.structure}, "
+                                 f"not {self.structure}")
+            if not message.is_decoded:
+                return self.decode(message.coded_message)
+            message = message.param_dict
+
+        if isinstance(message, dict):
+            value: Any = message
+            for short_name in self.short_names:
+                value = value[short_name]
+            return value
+
+        return self.decode(message)
+
+    def decode(self, message: Union[bytes, bytearray]) -> Any:
+        """Decode the value of the parameter from a raw message."""
+        if self._static_position is None:
+            param_dict = self.structure.decode(message, fields=self.short_names[:1])
+            return self(param_dict)
+
+        byte_offset, param, byte_position = self._static_position
+        if byte_offset > 0:
+            # nested structures are decoded relative to their position
+            message = message[byte_offset:]
+        decode_state = DecodeState(
+            coded_message=message, parameter_value_pairs=[], next_byte_position=byte_position)
+        value, _ = param.decode_from_pdu(decode_state)
+        return value
+
+    def __repr__(self) -> str:
+        return f"ParameterAccessor({self.structure.short_name}, '{self.path}')"
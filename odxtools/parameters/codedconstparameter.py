@@ -1,12 +1,11 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
-import warnings
 from typing import ByteString, Union
 
+from ..codingpolicy import get_coding_policy
 from ..decodestate import DecodeState
 from ..diagcodedtypes import DiagCodedType
 from ..encodestate import EncodeState
-from ..exceptions import DecodeError
 from ..odxtypes import DataType
 from .parameterbase import Parameter
 
@@ -63,13 +62,11 @@ class CodedConstParameter(Parameter):
 
         # Check if the coded value in the message is correct.
         if self.coded_value != coded_val:
-            warnings.warn(
+            get_coding_policy().report_decode_error(
                 f"Coded constant parameter does not match! "
                 f"The parameter {self.short_name} expected coded value {self._coded_value_str} but got {coded_val} "
                 f"at byte position {decode_state.next_byte_position} "
-                f"in coded message {decode_state.coded_message.hex()}.",
-                DecodeError,
-            )
+                f"in coded message {decode_state.coded_message.hex()}.")
 
         return coded_val, next_byte_position
 
@@ -1,5 +1,6 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
+from ..decodestate import DecodeState
 from ..encodestate import EncodeState
 from .parameterwithdop import ParameterWithDOP
 
@@ -35,3 +36,12 @@ class LengthKeyParameter(ParameterWithDOP):
         encode_state.length_keys[self.odx_id] = physical_value
 
         return super(ParameterWithDOP, self).encode_into_pdu(encode_state)
+
+    def decode_from_pdu(self, decode_state: DecodeState):
+        phys_val, next_byte_position = super().decode_from_pdu(decode_state)
+
+        # Set the value of the length key in the length key dict so
+        # that the parameters referencing it can look it up quickly.
+        decode_state.length_keys[self.odx_id] = phys_val
+
+        return phys_val, next_byte_position
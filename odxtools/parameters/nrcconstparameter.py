@@ -1,12 +1,12 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
-import warnings
 from typing import List
 
+from ..codingpolicy import get_coding_policy
 from ..decodestate import DecodeState
 from ..diagcodedtypes import DiagCodedType
 from ..encodestate import EncodeState
-from ..exceptions import DecodeError, EncodeError
+from ..exceptions import EncodeError
 from ..odxtypes import DataType
 from .parameterbase import Parameter
 
@@ -78,13 +78,11 @@ class NrcConstParameter(Parameter):
 
         # Check if the coded value in the message is correct.
         if coded_value not in self.coded_values:
-            warnings.warn(
+            get_coding_policy().report_decode_error(
                 f"Coded constant parameter does not match! "
                 f"The parameter {self.short_name} expected a coded value in {self.coded_values} but got {coded_value} "
                 f"at byte position {decode_state.next_byte_position} "
-                f"in coded message {decode_state.coded_message.hex()}.",
-                DecodeError,
-            )
+                f"in coded message {decode_state.coded_message.hex()}.")
 
         return coded_value, next_byte_position
 
@@ -1,12 +1,12 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
 import abc
-import warnings
+import logging
 from typing import TYPE_CHECKING, List, Optional, Union
 
+from ..codingpolicy import get_coding_policy
 from ..decodestate import DecodeState
 from ..encodestate import EncodeState
-from ..exceptions import OdxWarning
 from ..globals import logger
 from ..odxlink import OdxLinkDatabase
 from ..specialdata import SpecialDataGroup
@@ -116,7 +116,7 @@ class Parameter(abc.ABC):
 
         Parameters:
         ----------
-        encode_state: EncodeState, i.e. a named tuple with attributes
+        encode_state: EncodeState, i.e. an object with the attributes
             * coded_message: bytes, the message encoded so far
             * parameter_values: List[ParameterValuePairs]
             * triggering_coded_request: bytes
@@ -140,18 +140,19 @@ class Parameter(abc.ABC):
         if len(old_rpc) < min_length:
             # Make byte code longer if necessary
             new_rpc += bytearray([0] * (min_length - len(old_rpc)))
+        policy = get_coding_policy()
         for byte_idx_val, byte_idx_rpc in enumerate(
                 range(byte_position, byte_position + len(byte_value))):
             # insert byte value
-            if new_rpc[byte_idx_rpc] & byte_value[byte_idx_val] != 0:
-                warnings.warn(
-                    f"Parameter {self.short_name} overlaps with another parameter (bytes are already set)",
-                    OdxWarning,
+            if policy.check_consistency and new_rpc[byte_idx_rpc] & byte_value[byte_idx_val] != 0:
+                policy.report_encode_error(
+                    f"Parameter {self.short_name} overlaps with another parameter (bytes are already set)"
                 )
             new_rpc[byte_idx_rpc] |= byte_value[byte_idx_val]
 
-        logger.debug(f"Param {self.short_name} inserts"
-                     f" 0x{byte_value.hex()} at byte pos {byte_position}")
+        if policy.debug_logging and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Param {self.short_name} inserts"
+                         f" 0x{byte_value.hex()} at byte pos {byte_position}")
         return new_rpc
 
     def _as_dict(self):
@@ -1,10 +1,8 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
-import warnings
-
+from ..codingpolicy import get_coding_policy
 from ..decodestate import DecodeState
 from ..encodestate import EncodeState
-from ..exceptions import DecodeError
 from .parameterwithdop import ParameterWithDOP
 
 
@@ -48,13 +46,11 @@ class PhysicalConstantParameter(ParameterWithDOP):
 
         # Check if decoded value matches expected value
         if phys_val != self.physical_constant_value:
-            warnings.warn(
+            get_coding_policy().report_decode_error(
                 f"Physical constant parameter does not match! "
                 f"The parameter {self.short_name} expected physical value {self.physical_constant_value!r} but got {phys_val!r} "
                 f"at byte position {next_byte_position} "
-                f"in coded message {decode_state.coded_message.hex()}.",
-                DecodeError,
-            )
+                f"in coded message {decode_state.coded_message.hex()}.")
         return phys_val, next_byte_position
 
     def __repr__(self) -> str:
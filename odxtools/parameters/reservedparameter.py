@@ -1,9 +1,7 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
-import warnings
-
+from ..codingpolicy import get_coding_policy
 from ..decodestate import DecodeState
-from ..exceptions import DecodeError
 from .parameterbase import Parameter
 
 
@@ -39,19 +37,21 @@ class ReservedParameter(Parameter):
         val_as_bytes = decode_state.coded_message[byte_position:byte_position + byte_length]
         next_byte_position = byte_position + byte_length
 
+        policy = get_coding_policy()
+        if not policy.check_consistency:
+            return None, next_byte_position
+
         # Check that reserved bits are 0
         expected = sum(2**i for i in range(bit_position_int, bit_position_int + self.bit_length))
         actual = int.from_bytes(val_as_bytes, "big")
 
         # Bit-wise compare if reserved bits are 0.
         if expected & actual != 0:
-            warnings.warn(
+            policy.report_decode_error(
                 f"Reserved bits must be Zero! "
                 f"The parameter {self.short_name} expected {self.bit_length} bits to be Zero starting at bit position {bit_position_int} "
                 f"at byte position {byte_position} "
-                f"in coded message {decode_state.coded_message.hex()}.",
-                DecodeError,
-            )
+                f"in coded message {decode_state.coded_message.hex()}.")
 
         return None, next_byte_position
 
@@ -1,17 +1,34 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Optional
 
+from ..decodestate import DecodeState
+from ..encodestate import EncodeState
+from ..exceptions import DecodeError, EncodeError, OdxError
 from ..odxlink import OdxLinkDatabase
+from ..table import Table, TableRow
 from .parameterbase import Parameter
 
 if TYPE_CHECKING:
-    from .diaglayer import DiagLayer
+    from ..diaglayer import DiagLayer
 
 
 class TableKeyParameter(Parameter):
+    """Table keys select a row of a table.
 
-    def __init__(self, *, odx_id, table_ref, table_snref, table_row_snref, table_row_ref, **kwargs):
+    If the parameter references a table, the key of the row is
+    coded using the key DOP of the table, and the physical value of
+    the parameter is the short name of the selected row. If it
+    references a table row, the row is selected statically and the
+    parameter does not occupy any bytes of the PDU.
+
+    The selected row is stored in the `table_keys` dict of the
+    decode or encode state, so that the TableStructParameters which
+    reference the table key can look it up.
+    """
+
+    def __init__(self, *, odx_id, table_ref, table_snref, table_row_snref, table_row_ref,
+                 **kwargs) -> None:
         super().__init__(parameter_type="TABLE-KEY", **kwargs)
         self.odx_id = odx_id
         self.table_ref = table_ref
@@ -19,33 +36,150 @@ class TableKeyParameter(Parameter):
         self.table_snref = table_snref
         self.table_row_snref = table_row_snref
 
+        self._table: Optional[Table] = None
+        self._table_row: Optional[TableRow] = None
+
+    @property
+    def table(self) -> Optional[Table]:
+        return self._table
+
+    @property
+    def table_row(self) -> Optional[TableRow]:
+        """The statically selected table row, if any"""
+        return self._table_row
+
+    @property
+    def bit_length(self) -> Optional[int]:
+        if self.table_row is not None:
+            return 0
+        if self.table is not None and self.table.key_dop is not None:
+            return self._key_dop.bit_length
+        return None
+
     def is_required(self):
-        raise NotImplementedError("TableKeyParameter.is_required is not implemented yet.")
+        return self.table_row is None
 
     def is_optional(self):
-        raise NotImplementedError("TableKeyParameter.is_optional is not implemented yet.")
+        return not self.is_required()
+
+    def get_coded_value(self, physical_value=None):
+        table_row = self._get_table_row(physical_value)
+        if self.table_row is not None:
+            # statically selected rows are not coded
+            return None
+        return self._key_dop.convert_physical_to_internal(self._get_key(table_row))
+
+    def get_coded_value_as_bytes(self, encode_state: EncodeState) -> bytes:
+        physical_value = encode_state.parameter_values.get(self.short_name)
+        if physical_value is None and self.table_row is None:
+            raise TypeError(f"A value for parameter '{self.short_name}' must be specified"
+                            f" as the parameter does not exhibit a default.")
+        table_row = self._get_table_row(physical_value)
+
+        # the table struct parameters which reference the table key
+        # require the selected row
+        encode_state.table_keys[self.short_name] = table_row
+
+        if self.table_row is not None:
+            # the row is selected statically, i.e., the key is not
+            # part of the PDU
+            return bytes()
+
+        bit_position_int = self.bit_position if self.bit_position is not None else 0
+        return self._key_dop.convert_physical_to_bytes(
+            self._get_key(table_row), encode_state, bit_position=bit_position_int)
+
+    def decode_from_pdu(self, decode_state: DecodeState):
+        if self.table_row is not None:
+            table_row = self.table_row
+            next_byte_position = decode_state.next_byte_position
+        else:
+            if self.byte_position is not None and \
+                    self.byte_position != decode_state.next_byte_position:
+                decode_state = decode_state._replace(next_byte_position=self.byte_position)
+
+            bit_position_int = self.bit_position if self.bit_position is not None else 0
+            key, next_byte_position = self._key_dop.convert_bytes_to_physical(
+                decode_state, bit_position=bit_position_int)
+
+            assert self.table is not None
+            table_row = self.table.get_table_row_by_key(key)  # type: ignore[assignment]
+            if table_row is None:
+                raise DecodeError(f"Table {self.table.short_name} referenced by parameter "
+                                  f"{self.short_name} does not feature a row with key {key!r}")
+
+        decode_state.table_keys[self.short_name] = table_row
+
+        return table_row.short_name, next_byte_position
+
+    @property
+    def _key_dop(self) -> Any:
+        if self.table is None or self.table.key_dop is None:
+            raise OdxError(f"The table of parameter {self.short_name} does not specify a key DOP")
+        return self.table.key_dop
+
+    def _get_table_row(self, physical_value: Any) -> TableRow:
+        """Return the table row which is selected by the value of the
+        parameter, i.e., by a table row or its short name."""
+        if self.table_row is not None:
+            if physical_value is not None and physical_value not in [
+                    self.table_row, self.table_row.short_name
+            ]:
+                raise EncodeError(f"Parameter {self.short_name} is constant and must be "
+                                  f"{self.table_row.short_name}, not {physical_value!r}")
+            return self.table_row
+
+        if isinstance(physical_value, str):
+            assert self.table is not None
+            table_row = self.table.get_table_row_by_short_name(physical_value)
+            if table_row is None:
+                raise EncodeError(f"Table {self.table.short_name} referenced by parameter "
+                                  f"{self.short_name} does not feature a row named "
+                                  f"{physical_value}")
+            return table_row
+
+        if not isinstance(physical_value, TableRow):
+            raise EncodeError(f"The value of parameter {self.short_name} must be a table row "
+                              f"or its short name, not {physical_value!r}")
+        return physical_value
+
+    def _get_key(self, table_row: TableRow) -> Any:
+        """Return the physical value of the key of a table row"""
+        key_dop = self._key_dop
+        return key_dop.physical_type.base_data_type.make_from(table_row.key)
 
-    def get_coded_value(self):
-        raise NotImplementedError("Encoding a TableKeyParameter is not implemented yet.")
+    def _build_odxlinks(self):
+        result = super()._build_odxlinks()
 
-    def get_coded_value_as_bytes(self):
-        raise NotImplementedError("Encoding a TableKeyParameter is not implemented yet.")
+        if self.odx_id is not None:
+            result[self.odx_id] = self
 
-    def decode_from_pdu(self, coded_message, default_byte_position=None):
-        raise NotImplementedError("Decoding a TableKeyParameter is not implemented yet.")
+        return result
 
     def _resolve_references(self, parent_dl: "DiagLayer", odxlinks: OdxLinkDatabase) -> None:
         super()._resolve_references(parent_dl, odxlinks)
-        self.table = None
+        self._table = None
+        self._table_row = None
         if self.table_snref:
-            self.table = parent_dl.local_diag_data_dictionary_spec.tables[self.table_snref]
+            ddds = parent_dl.local_diag_data_dictionary_spec
+            assert ddds is not None
+            self._table = ddds.tables[self.table_snref]
         if self.table_ref:
-            self.table = odxlinks.resolve(self.table_ref)
+            self._table = odxlinks.resolve(self.table_ref)
 
         if self.table_row_ref:
-            self.table_row = odxlinks.resolve(self.table_row_ref)
+            self._table_row = odxlinks.resolve(self.table_row_ref)
         if self.table_row_snref:
-            self.table_row = parent_dl.local_diag_data_dictionary_spec.tables[self.table_row_snref]
+            if self._table is None:
+                raise OdxError(f"The TABLE-ROW-SNREF of parameter {self.short_name} "
+                               "requires a table to be specified.")
+            self._table_row = next(
+                (tr for tr in self._table.table_rows if tr.short_name == self.table_row_snref),
+                None)
+            if self._table_row is None:
+                raise OdxError(f"Table {self._table.short_name} does not feature a row named "
+                               f"{self.table_row_snref}")
 
-        if self.table is None:
-            raise ValueError("Either table_key_ref or table_key_snref must be defined.")
+        if self._table is None and self._table_row is None:
+            raise OdxError("Either a table or a table row must be referenced "
+                           f"by parameter {self.short_name}.")
@@ -1,11 +1,30 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
+from typing import TYPE_CHECKING, Any, Iterable, Optional, Tuple
+
+from ..dataobjectproperty import DataObjectProperty
+from ..decodestate import DecodeState
+from ..encodestate import EncodeState
+from ..exceptions import DecodeError, EncodeError, OdxError
+from ..odxlink import OdxLinkDatabase
+from ..table import TableRow
 from .parameterbase import Parameter
+from .tablekeyparameter import TableKeyParameter
+
+if TYPE_CHECKING:
+    from ..diaglayer import DiagLayer
 
 
 class TableStructParameter(Parameter):
+    """The structure or DOP of the table row selected by a table key.
+
+    The physical value of the parameter is a tuple of the short name
+    of the selected table row and the value which is coded using the
+    structure or the DOP of the row. The table key must be located
+    before the table struct parameter.
+    """
 
-    def __init__(self, *, table_key_ref, table_key_snref, **kwargs):
+    def __init__(self, *, table_key_ref, table_key_snref, **kwargs) -> None:
         super().__init__(parameter_type="TABLE-STRUCT", **kwargs)
 
         self.table_key_ref = table_key_ref
@@ -14,17 +33,123 @@ class TableStructParameter(Parameter):
             raise OdxError("Either table_key_ref or table_key_snref "
                            "must be defined.")
 
+        self._table_key: Optional[TableKeyParameter] = None
+
+    @property
+    def table_key(self) -> Optional[TableKeyParameter]:
+        """The referenced table key parameter (None if the references
+        have not been resolved yet)"""
+        return self._table_key
+
+    @property
+    def table_key_short_name(self) -> str:
+        """The short name of the referenced table key parameter"""
+        if self.table_key_snref is not None:
+            return self.table_key_snref
+        if self._table_key is None:
+            raise OdxError(f"The table key of parameter {self.short_name} has not been resolved")
+        return self._table_key.short_name
+
     def is_required(self):
-        raise NotImplementedError("TableStructParameter.is_required is not implemented yet.")
+        return True
 
     def is_optional(self):
-        raise NotImplementedError("TableStructParameter.is_optional is not implemented yet.")
+        return False
+
+    def get_coded_value(self, physical_value=None):
+        table_row_short_name, value = self._split_physical_value(physical_value)
+        if self._table_key is None:
+            raise OdxError(f"The table key of parameter {self.short_name} has not been resolved")
+        table_row = self._table_key._get_table_row(table_row_short_name)
+
+        dop = self._get_dop(table_row)
+        if dop is None:
+            # the table row does not specify any data
+            return None
+        if isinstance(dop, DataObjectProperty):
+            return dop.convert_physical_to_internal(value)
+        return dop.convert_physical_to_internal(value, triggering_coded_request=None)
+
+    def get_coded_value_as_bytes(self, encode_state: EncodeState) -> bytes:
+        table_row_short_name, value = self._split_physical_value(
+            encode_state.parameter_values.get(self.short_name))
+
+        table_row = encode_state.table_keys.get(self.table_key_short_name)
+        if table_row is None:
+            raise EncodeError(f"The table key {self.table_key_short_name} referenced by "
+                              f"parameter {self.short_name} must be encoded first")
+        if table_row.short_name != table_row_short_name:
+            raise EncodeError(f"The table key {self.table_key_short_name} selects the row "
+                              f"{table_row.short_name} but parameter {self.short_name} "
+                              f"specifies a value for row {table_row_short_name}")
+
+        dop = self._get_dop(table_row)
+        if dop is None:
+            # the table row does not specify any data
+            return bytes()
+
+        bit_position_int = self.bit_position if self.bit_position is not None else 0
+        return dop.convert_physical_to_bytes(value, encode_state, bit_position=bit_position_int)
+
+    def decode_from_pdu(self, decode_state: DecodeState):
+        if self.byte_position is not None and self.byte_position != decode_state.next_byte_position:
+            decode_state = decode_state._replace(next_byte_position=self.byte_position)
+
+        table_row = decode_state.table_keys.get(self.table_key_short_name)
+        if table_row is None:
+            raise DecodeError(f"The table key {self.table_key_short_name} referenced by "
+                              f"parameter {self.short_name} has not been decoded")
+
+        dop = self._get_dop(table_row)
+        if dop is None:
+            # the table row does not specify any data
+            return (table_row.short_name, None), decode_state.next_byte_position
+
+        bit_position_int = self.bit_position if self.bit_position is not None else 0
+        value, next_byte_position = dop.convert_bytes_to_physical(
+            decode_state, bit_position=bit_position_int)
+
+        return (table_row.short_name, value), next_byte_position
+
+    def _split_physical_value(self, physical_value: Any) -> Tuple[str, Any]:
+        """Return the short name of the table row and the value of a
+        physical value of the parameter."""
+        if not isinstance(physical_value, (tuple, list)) or len(physical_value) != 2:
+            raise EncodeError(f"The value of parameter {self.short_name} must be a tuple of "
+                              f"the short name of a table row and the value of the row, "
+                              f"not {physical_value!r}")
+        return physical_value[0], physical_value[1]
+
+    @staticmethod
+    def _get_dop(table_row: TableRow) -> Optional[Any]:
+        if table_row.structure is not None:
+            return table_row.structure
+        return table_row.dop
+
+    def _resolve_references(self, parent_dl: "DiagLayer", odxlinks: OdxLinkDatabase) -> None:
+        super()._resolve_references(parent_dl, odxlinks)
+
+        if self.table_key_ref is not None:
+            table_key = odxlinks.resolve(self.table_key_ref)
+            if not isinstance(table_key, TableKeyParameter):
+                raise OdxError(f"The TABLE-KEY-REF of parameter {self.short_name} does not "
+                               f"reference a table key")
+            self._table_key = table_key
 
-    def get_coded_value(self):
-        raise NotImplementedError("Encoding a TableStructParameter is not implemented yet.")
+    def _resolve_table_key_snref(self, parameters: Iterable[Any]) -> None:
+        """Resolve the TABLE-KEY-SNREF using the parameters of the
+        structure which contains the table struct parameter."""
+        if self.table_key_snref is None:
+            return
 
-    def get_coded_value_as_bytes(self):
-        raise NotImplementedError("Encoding a TableStructParameter is not implemented yet.")
+        self._table_key = None
+        for param in parameters:
+            if param.short_name == self.table_key_snref:
+                if not isinstance(param, TableKeyParameter):
+                    raise OdxError(f"The TABLE-KEY-SNREF of parameter {self.short_name} does "
+                                   f"not reference a table key")
+                self._table_key = param
+                return
 
-    def decode_from_pdu(self, coded_message, default_byte_position=None):
-        raise NotImplementedError("Decoding a TableStructParameter is not implemented yet.")
+        raise OdxError(f"The table key {self.table_key_snref} referenced by parameter "
+                       f"{self.short_name} does not exist")
@@ -0,0 +1,72 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2022 MBition GmbH
+from collections import OrderedDict
+from typing import List, Tuple, Union
+
+from .service import DiagService
+from .serviceprefixtrie import ServicePrefixTrie
+
+
+class RequestCorrelationIndex:
+    """Bounded least-recently-used mapping from raw requests to the
+    services which are able to decode them.
+
+    `DiagLayer.decode_response()` uses the index to determine the
+    services whose responses need to be considered for a given
+    request. In traces of diagnostic communication, the same requests
+    are usually sent over and over again, so that most lookups only
+    require a single dict access instead of querying the service
+    prefix trie and checking the candidate services.
+
+    Only services whose request structure is admissible for the
+    request are correlated with it. If there are no such services,
+    all services of the prefix trie which match the request are
+    used, since the rejections of the admissibility checks
+    correspond to DecodeErrors which may have been configured to be
+    mere warnings.
+    """
+
+    def __init__(self, service_prefix_trie: ServicePrefixTrie, max_size: int = 4096) -> None:
+        if max_size < 1:
+            raise ValueError(
+                f"The size limit of request correlation indices must be positive, not {max_size}")
+
+        self.service_prefix_trie = service_prefix_trie
+        self.max_size = max_size
+        """Maximum number of correlated requests"""
+        self.hits = 0
+        """Number of lookups which were answered by the index"""
+        self.misses = 0
+        """Number of lookups of requests which had not been correlated"""
+
+        self._entries: "OrderedDict[bytes, Tuple[DiagService, ...]]" = OrderedDict()
+
+    def find(self, request: Union[bytes, bytearray]) -> List[DiagService]:
+        """Return the services which are able to decode a request."""
+        request = bytes(request)
+        entry = self._entries.get(request)
+        if entry is not None:
+            self._entries.move_to_end(request)
+            self.hits += 1
+            return list(entry)
+
+        self.misses += 1
+        possible_services = self.service_prefix_trie.find(request)
+        services = [
+            s for s in possible_services
+            if s.request is not None and s.request.is_admissible(request)
+        ]
+        if len(services) == 0:
+            services = possible_services
+
+        self._entries[request] = tuple(services)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return services
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return (f"RequestCorrelationIndex(max_size={self.max_size}, size={len(self)}, "
+                f"hits={self.hits}, misses={self.misses})")
@@ -1,6 +1,6 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
-from typing import Iterable, List, Optional, Union, cast
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union, cast
 from xml.etree import ElementTree
 
 from .admindata import AdminData
@@ -14,10 +14,28 @@ from .parameters import Parameter
 from .specialdata import SpecialDataGroup, create_sdgs_from_et
 from .state import State
 from .state_transition import StateTransition
-from .structures import Request, Response
+from .structures import BasicStructure, Request, Response
 from .utils import create_description_from_et, short_name_as_id
 
 
+class MessageTypeTable(NamedTuple):
+    """Lookup table to determine which messages of a service can be
+    used to decode a given payload.
+
+    The table is based on the first byte position where the constant
+    prefixes of the service's request and responses differ. Messages
+    whose prefix is too short to exhibit this byte must always be
+    considered.
+    """
+
+    byte_position: int
+    """Position of the first byte where the prefixes differ"""
+    candidates: Dict[int, List[Tuple[BasicStructure, bytes]]]
+    """(message, prefix) pairs which expect a given value at `byte_position`"""
+    unconditional_candidates: List[Tuple[BasicStructure, bytes]]
+    """(message, prefix) pairs whose prefix does not include `byte_position`"""
+
+
 class DiagService:
 
     def __init__(
@@ -109,6 +127,9 @@ class DiagService:
 
         self.sdgs = sdgs
 
+        self._message_type_table: Optional[MessageTypeTable] = None
+        self._response_type_table: Optional[MessageTypeTable] = None
+
     @staticmethod
     def from_et(et_element, doc_frags: List[OdxDocFragment]):
 
@@ -249,27 +270,131 @@ class DiagService:
         for sdg in self.sdgs:
             sdg._resolve_references(odxlinks)
 
-    def decode_message(self, message: Union[bytes, bytearray]) -> Message:
+        self._message_type_table = None
+        self._response_type_table = None
 
-        # Check if message is a request or positive or negative response
-        interpretable_message_types = []
+    def _build_message_type_table(self, message_types: List[BasicStructure]) -> MessageTypeTable:
+        """Build the lookup table for a subset of the request and the
+        responses of the service.
 
+        The prefixes of the responses are computed using the constant
+        prefix of the request, i.e., they include the bytes of the
+        MATCHING-REQUEST-PARAMs which are located within it.
+        """
+        assert self.request is not None
+
+        request_prefix = self.request.coded_const_prefix()
+        prefixes = [
+            (mt, mt.coded_const_prefix(request_prefix=request_prefix)) for mt in message_types
+        ]
+
+        # find the first byte where the prefixes differ
+        byte_position = 0
+        max_prefix_len = max((len(prefix) for _, prefix in prefixes), default=0)
+        while byte_position < max_prefix_len:
+            values = {
+                prefix[byte_position]
+                for _, prefix in prefixes
+                if len(prefix) > byte_position
+            }
+            if len(values) > 1:
+                break
+            byte_position += 1
+
+        candidates: Dict[int, List[Tuple[BasicStructure, bytes]]] = {}
+        unconditional_candidates: List[Tuple[BasicStructure, bytes]] = []
+        for mt, prefix in prefixes:
+            if len(prefix) > byte_position:
+                candidates.setdefault(prefix[byte_position], []).append((mt, prefix))
+            else:
+                unconditional_candidates.append((mt, prefix))
+
+        return MessageTypeTable(
+            byte_position=byte_position,
+            candidates=candidates,
+            unconditional_candidates=unconditional_candidates,
+        )
+
+    def _find_message_types(self,
+                            message: Union[bytes, bytearray],
+                            responses_only: bool = False) -> List[BasicStructure]:
+        """Return the request and responses of the service whose
+        constant prefix matches the message.
+
+        If `responses_only` is true, the request is not considered."""
         if (self.request is None or self.positive_responses is None or
                 self.negative_responses is None):
             raise ValueError("References couldn't be resolved or have not been resolved yet."
                              " Try calling `database.resolve_references()`.")
 
-        for message_type in [self.request, *self.positive_responses, *self.negative_responses]:
-            prefix = message_type.coded_const_prefix(
-                request_prefix=self.request.coded_const_prefix())
-            if all(b == message[i] for (i, b) in enumerate(prefix)):
-                interpretable_message_types.append(message_type)
+        if responses_only:
+            if self._response_type_table is None:
+                self._response_type_table = self._build_message_type_table(
+                    [*self.positive_responses, *self.negative_responses])
+            table = self._response_type_table
+        else:
+            if self._message_type_table is None:
+                self._message_type_table = self._build_message_type_table(
+                    [self.request, *self.positive_responses, *self.negative_responses])
+            table = self._message_type_table
+
+        candidates = table.unconditional_candidates
+        if len(message) > table.byte_position:
+            candidates = table.candidates.get(message[table.byte_position], []) + candidates
+        return [mt for mt, prefix in candidates if message.startswith(prefix)]
+
+    def is_admissible(self,
+                      message: Union[bytes, bytearray],
+                      triggering_request: Optional[Union[bytes, bytearray]] = None) -> bool:
+        """Check whether `decode_message()` might be able to decode a
+        message without running the full decoding machinery.
+
+        If `False` is returned, decoding the message fails or produces
+        a `DecodeError` warning. See `BasicStructure.is_admissible()`.
+        """
+        return self._find_admissible_message_type(message, triggering_request) is not None
+
+    def _find_admissible_message_type(self,
+                                      message: Union[bytes, bytearray],
+                                      triggering_request: Optional[Union[bytes, bytearray]] = None
+                                     ) -> Optional[BasicStructure]:
+        # if a triggering request is specified, the message must be
+        # one of the responses
+        message_types = self._find_message_types(
+            message, responses_only=triggering_request is not None)
+        if len(message_types) != 1 or not message_types[0].is_admissible(
+                message, triggering_request):
+            return None
+        return message_types[0]
+
+    def decode_message(self,
+                       message: Union[bytes, bytearray],
+                       lazy: bool = False,
+                       fields: Optional[Iterable[str]] = None) -> Message:
+        """Decode a request or response of the service.
+
+        If `lazy` is true, the parameters of the message are only
+        decoded on first access (see `Message`). Else, if `fields`
+        is specified, the parameter dict of the message only contains
+        the parameters with the given short names (see
+        `BasicStructure.decode()`).
+        """
+
+        # Check if message is a request or positive or negative response
+        interpretable_message_types = self._find_message_types(message)
 
         if len(interpretable_message_types) != 1:
             raise DecodeError(
                 f"The service {self.short_name} cannot decode the message {message.hex()}")
-        message_type = interpretable_message_types[0]
-        param_dict = message_type.decode(message)
+        return self._decode_message_as(
+            message, interpretable_message_types[0], lazy=lazy, fields=fields)
+
+    def _decode_message_as(self,
+                           message: Union[bytes, bytearray],
+                           message_type: BasicStructure,
+                           lazy: bool = False,
+                           fields: Optional[Iterable[str]] = None) -> Message:
+        param_dict = None if lazy else message_type.decode(message, fields=fields)
         return Message(
             coded_message=message, service=self, structure=message_type, param_dict=param_dict)
 
@@ -0,0 +1,114 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2022 MBition GmbH
+from itertools import chain
+from typing import Dict, Iterable, List, NamedTuple, Union
+
+from .service import DiagService
+
+
+class ServicePrefixTrieStatistics(NamedTuple):
+    num_services: int
+    """Number of services contained in the trie"""
+    num_leaves: int
+    """Number of distinct constant prefixes"""
+    depth: int
+    """Length of the longest constant prefix in bytes"""
+    num_ambiguous_leaves: int
+    """Number of constant prefixes which are shared by multiple services"""
+
+
+class ServicePrefixTrie:
+    """Maps the constant prefixes of requests and responses to
+    diagnostic services.
+
+    Instead of a tree of nodes, the trie is stored in compact form as
+    a dict which maps each constant prefix to the list of services
+    which use it. Looking up the candidate services for a message thus
+    requires a single dict lookup per distinct prefix length.
+
+    Example:
+    Let there be four services with corresponding requests:
+    * Request 1 has the coded constant prefix `12 34`.
+    * Request 2 has the coded constant prefix `12 34`.
+    * Request 3 has the coded constant prefix `12 56`.
+    * Request 4 has the coded constant prefix `12 56 00`.
+
+    Then, the leaves of the trie are given by the dict
+    ```
+    {b"\\x12\\x34": [<Service 1>, <Service 2>],
+     b"\\x12\\x56": [<Service 3>],
+     b"\\x12\\x56\\x00": [<Service 4>]}
+    ```
+    and the message `12 56 00 01` yields the candidates
+    `[<Service 3>, <Service 4>]`.
+    """
+
+    def __init__(self, services: Iterable[DiagService]) -> None:
+        self.leaves: Dict[bytes, List[DiagService]] = {}
+        """Mapping from constant prefixes to the services which use them"""
+
+        num_services = 0
+        for service in services:
+            num_services += 1
+            assert service.request is not None
+            assert service.positive_responses is not None
+            assert service.negative_responses is not None
+
+            # Compute prefixes for the request and all responses
+            request_prefix = service.request.coded_const_prefix()
+            prefixes = [request_prefix] + [
+                message.coded_const_prefix(request_prefix=request_prefix)
+                for message in chain(service.positive_responses, service.negative_responses)
+            ]
+            for prefix in prefixes:
+                if len(prefix) == 0:
+                    # messages without any constant prefix cannot
+                    # be attributed to a service
+                    continue
+
+                leaf = self.leaves.setdefault(prefix, [])
+                # the request and several responses of a service may
+                # exhibit the same prefix
+                if not leaf or leaf[-1] is not service:
+                    leaf.append(service)
+
+        self._num_services = num_services
+        self._prefix_lengths = sorted({len(prefix) for prefix in self.leaves})
+
+    def find(self, message: Union[bytes, bytearray]) -> List[DiagService]:
+        """Return the services whose request or responses have a
+        constant prefix matching the message.
+
+        Services with shorter matching prefixes come first.
+        """
+        message = bytes(message)
+        result: List[DiagService] = []
+        for prefix_length in self._prefix_lengths:
+            if prefix_length > len(message):
+                break
+            services = self.leaves.get(message[:prefix_length])
+            if services is not None:
+                result += services
+
+        return result
+
+    @property
+    def depth(self) -> int:
+        """Length of the longest constant prefix in bytes"""
+        return self._prefix_lengths[-1] if self._prefix_lengths else 0
+
+    @property
+    def ambiguous_leaves(self) -> Dict[bytes, List[DiagService]]:
+        """The constant prefixes which are used by more than one
+        service, i.e., messages for which a full decode of several
+        services must be attempted."""
+        return {prefix: services for prefix, services in self.leaves.items() if len(services) > 1}
+
+    @property
+    def statistics(self) -> ServicePrefixTrieStatistics:
+        return ServicePrefixTrieStatistics(
+            num_services=self._num_services,
+            num_leaves=len(self.leaves),
+            depth=self.depth,
+            num_ambiguous_leaves=len(self.ambiguous_leaves),
+        )
@@ -1,32 +1,184 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
+import logging
 import math
-import warnings
-from typing import (TYPE_CHECKING, Any, ByteString, Dict, Iterable, List, Optional, OrderedDict,
-                    Tuple, Union)
+from types import MappingProxyType
+from typing import (TYPE_CHECKING, Any, ByteString, Dict, FrozenSet, Iterable, Iterator, List,
+                    Mapping, NamedTuple, Optional, OrderedDict, Set, Tuple, Union)
 
+from .codingpolicy import get_coding_policy
 from .dataobjectproperty import DataObjectProperty, DopBase
 from .decodestate import DecodeState, ParameterValuePair
+from .diagcodedtypes import ParamLengthInfoType, StandardLengthType
 from .encodestate import EncodeState
-from .exceptions import DecodeError, EncodeError, OdxWarning
+from .exceptions import DecodeError, EncodeError, OdxError
 from .globals import logger
+from .messagebatch import VectorizedLayout
 from .nameditemlist import NamedItemList
 from .odxlink import OdxDocFragment, OdxLinkDatabase, OdxLinkId
 from .odxtypes import odxstr_to_bool
-from .parameters import (CodedConstParameter, MatchingRequestParameter, Parameter, ParameterWithDOP,
-                         ValueParameter, create_any_parameter_from_et)
+from .parameters import (CodedConstParameter, MatchingRequestParameter, NrcConstParameter,
+                         Parameter, ParameterWithDOP, ReservedParameter, ValueParameter,
+                         create_any_parameter_from_et)
 from .parameters.lengthkeyparameter import LengthKeyParameter
 from .parameters.tablekeyparameter import TableKeyParameter
+from .parameters.tablestructparameter import TableStructParameter
 from .specialdata import SpecialDataGroup, create_sdgs_from_et
 from .utils import create_description_from_et, short_name_as_id
 
 if TYPE_CHECKING:
     from .diaglayer import DiagLayer
     from .endofpdufield import EndOfPduField
+    from .parameteraccessor import ParameterAccessor
 
 ParameterDict = Dict[str, Union[Parameter, "ParameterDict"]]
 
 
+class AdmissibilityChecks(NamedTuple):
+    """Cheap checks which a message must pass in order to be
+    decodable by a structure.
+
+    All positions and lengths are given in bytes.
+    """
+
+    min_length: int
+    """Minimum length of the message"""
+    max_length: Optional[int]
+    """Maximum length of the message (None if unknown)"""
+    constant_bytes: List[Tuple[int, bytes]]
+    """(position, expected bytes) of the CODED-CONST parameters"""
+    nrc_const_bytes: List[Tuple[int, int, Set[bytes]]]
+    """(position, length, set of allowed bytes) of the NRC-CONST parameters"""
+    matching_request_bytes: List[Tuple[int, int, int]]
+    """(position, position in request, length) of the MATCHING-REQUEST-PARAMs"""
+
+
+class ParameterLayout(NamedTuple):
+    """The position and the size of a parameter within a structure
+    as far as they do not depend on the coded message."""
+
+    parameter: Union[Parameter, "EndOfPduField"]
+    byte_position: Optional[int]
+    """Byte position of the parameter (None if it depends on the
+    preceding parameters)"""
+    bit_position: int
+    """Bit position of the parameter within its first byte"""
+    bit_length: Optional[int]
+    """Number of bits covered by the parameter (None if variable)"""
+
+
+class StructureLayout(NamedTuple):
+    """Static layout of a structure.
+
+    The layout is computed once the references of the structure have
+    been resolved (see `BasicStructure.layout`) and must not be
+    modified.
+    """
+
+    parameters: Tuple[ParameterLayout, ...]
+    """Layouts of the parameters in the order of their specification"""
+    parameter_index: Mapping[str, ParameterLayout]
+    """Mapping from the short names of the parameters to their layouts"""
+    bit_length: Optional[int]
+    """Number of bits of the structure if it is fixed"""
+    min_length: int
+    """Minimum length of a coded message in bytes"""
+    max_length: Optional[int]
+    """Maximum length of a coded message in bytes (None if unknown)"""
+
+    @property
+    def is_fixed(self) -> bool:
+        """True iff the size of the structure does not depend on the
+        coded message"""
+        return self.bit_length is not None
+
+
+def _is_byte_aligned_standard_length(param: Parameter) -> bool:
+    dct = param.diag_coded_type  # type: ignore[attr-defined]
+    return (isinstance(dct, StandardLengthType) and dct.bit_mask is None and
+            not param.bit_position and dct.bit_length % 8 == 0)
+
+
+def _static_bit_length(param: Union[Parameter, "EndOfPduField"]) -> Optional[int]:
+    """Return the number of bits which a parameter occupies if this
+    does not depend on the decoded message."""
+    if isinstance(param, (CodedConstParameter, NrcConstParameter)):
+        if isinstance(param.diag_coded_type, StandardLengthType):
+            return param.diag_coded_type.bit_length
+    elif isinstance(param, (MatchingRequestParameter, ReservedParameter)):
+        return param.bit_length
+    elif isinstance(param, ParameterWithDOP) and isinstance(param.dop, DataObjectProperty):
+        if isinstance(param.dop.diag_coded_type, StandardLengthType):
+            return param.dop.diag_coded_type.bit_length
+
+    return None
+
+
+def _is_self_contained(param: Union[Parameter, "EndOfPduField"]) -> bool:
+    """Check whether a parameter can be decoded without knowing the
+    values of the other parameters of the structure."""
+    if isinstance(param, (CodedConstParameter, NrcConstParameter)):
+        return not isinstance(param.diag_coded_type, ParamLengthInfoType)
+    elif isinstance(param, (MatchingRequestParameter, ReservedParameter)):
+        return True
+    elif isinstance(param, ParameterWithDOP) and isinstance(param.dop, DataObjectProperty):
+        return not isinstance(param.dop.diag_coded_type, ParamLengthInfoType)
+
+    return False
+
+
+def _get_prerequisite_short_names(param: Union[Parameter, "EndOfPduField"]) -> Set[str]:
+    """Return the short names of the parameters of the enclosing
+    structure whose values are required to decode a parameter.
+
+    This is the case for environment data descriptions, which
+    select the environment data using the value of a DTC parameter.
+    """
+    from .endofpdufield import EndOfPduField
+    from .envdatadesc import EnvironmentDataDescription
+
+    if not isinstance(param, ParameterWithDOP):
+        return set()
+
+    dop = param.dop
+    if isinstance(dop, EndOfPduField):
+        dop = dop.structure
+    if isinstance(dop, EnvironmentDataDescription):
+        path = dop.dtc_parameter_path
+        if path is not None:
+            return {path[0]}
+
+    return set()
+
+
+class _ProjectionStep(NamedTuple):
+    """What needs to be done with a parameter if only some of the
+    parameters of a structure are to be decoded."""
+
+    parameter: Parameter
+    action: str
+    """"decode": the value is part of the result, "traverse": the
+    parameter must be processed to determine its end or the length
+    keys which it defines, "skip": the end of the parameter is
+    computed from its static length"""
+    byte_length: Optional[int]
+    """number of bytes covered by a skipped parameter"""
+
+
+def _traverse_parameter(param: Parameter, decode_state: DecodeState) -> int:
+    """Determine the end of a parameter without converting its value
+    to the physical type if possible."""
+    if isinstance(param, ParameterWithDOP) and \
+            not isinstance(param, LengthKeyParameter) and \
+            isinstance(param.dop, DataObjectProperty):
+        _, next_byte_position = param.dop.diag_coded_type.convert_bytes_to_internal(
+            decode_state, bit_position=param.bit_position or 0)
+        return next_byte_position
+
+    _, next_byte_position = param.decode_from_pdu(decode_state)
+    return next_byte_position
+
+
 class BasicStructure(DopBase):
 
     def __init__(
@@ -41,51 +193,313 @@ class BasicStructure(DopBase):
             short_name_as_id, parameters)
         self.byte_size = byte_size
 
+        # cache for the results of coded_const_prefix(), keyed by
+        # the request prefix
+        self._coded_const_prefixes: Dict[bytes, bytes] = {}
+        self._admissibility_checks: Optional[AdmissibilityChecks] = None
+        self._layout: Optional[StructureLayout] = None
+        self._parameter_dict: Optional[ParameterDict] = None
+        self._accessors: Dict[str, "ParameterAccessor"] = {}
+        self._individually_decodable_parameters: Optional[Dict[str, Tuple[Parameter, int]]] = None
+        # cache for the results of _get_projection_plan(), keyed by
+        # the set of requested short names
+        self._projection_plans: Dict[FrozenSet[str], List[_ProjectionStep]] = {}
+        self._vectorized_layout: Optional[VectorizedLayout] = None
+        self._vectorized_layout_computed = False
+
     @property
     def bit_length(self):
-        # Explicit size was specified
-        if self.byte_size:
-            return 8 * self.byte_size
+        return self.layout.bit_length
 
-        if all(p.bit_length is not None for p in self.parameters):
-            offset = 0
-            length = 0
-            for param in self.parameters:
-                if isinstance(param, ValueParameter) and hasattr(param.dop, "min_number_of_items"):
-                    # The param repeats itself, making bit_length calculation invalid
-                    # Temporary workaround
-                    # Can not import EndOfPduField to check on its type due to circular dependency
-                    return None
+    @property
+    def layout(self) -> StructureLayout:
+        """The static layout of the structure.
 
-                if param.byte_position is not None:
-                    bit_position_int = param.bit_position if param.bit_position is not None else 0
-                    byte_position_int = (
-                        param.byte_position if param.byte_position is not None else 0)
-                    offset = byte_position_int * 8 + bit_position_int
-                offset += param.bit_length
+        It is computed on first access after the references of the
+        structure have been resolved.
+        """
+        if self._layout is None:
+            self._layout = self._compute_layout()
+        return self._layout
+
+    @property
+    def vectorized_layout(self) -> Optional[VectorizedLayout]:
+        """The layout which is used to decode many messages of the
+        structure at once (None if this is not possible).
+
+        It is computed on first access after the references of the
+        structure have been resolved.
+        """
+        if not self._vectorized_layout_computed:
+            self._vectorized_layout = VectorizedLayout.from_structure(self)
+            self._vectorized_layout_computed = True
+        return self._vectorized_layout
+
+    def _compute_layout(self) -> StructureLayout:
+        parameter_layouts: List[ParameterLayout] = []
+        parameter_index: Dict[str, ParameterLayout] = {}
+
+        # absolute bit position where the next parameter starts if it
+        # does not specify a byte position (None if unknown)
+        offset: Optional[int] = 0
+        length = 0
+        is_fixed = True
+        for param in self.parameters:
+            bit_length = param.bit_length
+            if isinstance(param, ValueParameter) and hasattr(param.dop, "min_number_of_items"):
+                # The param repeats itself, making bit_length calculation invalid
+                # Temporary workaround
+                # Can not import EndOfPduField to check on its type due to circular dependency
+                bit_length = None
+
+            bit_position_int = param.bit_position if param.bit_position is not None else 0
+            byte_position = param.byte_position
+            if byte_position is not None:
+                offset = byte_position * 8 + bit_position_int
+            elif offset is not None:
+                byte_position = offset // 8
+                bit_position_int = offset % 8
+
+            parameter_layout = ParameterLayout(
+                parameter=param,
+                byte_position=byte_position,
+                bit_position=bit_position_int,
+                bit_length=bit_length,
+            )
+            parameter_layouts.append(parameter_layout)
+            parameter_index.setdefault(param.short_name, parameter_layout)
+
+            if bit_length is None or offset is None:
+                is_fixed = False
+                offset = None
+                continue
 
-                length = max(length, offset)
+            offset += bit_length
+            length = max(length, offset)
 
+        structure_bit_length: Optional[int] = None
+        if self.byte_size:
+            # Explicit size was specified
+            structure_bit_length = 8 * self.byte_size
+        elif is_fixed:
             # Round up to account for padding bits
-            return math.ceil(length / 8) * 8
+            structure_bit_length = math.ceil(length / 8) * 8
+
+        checks = self.admissibility_checks
+        return StructureLayout(
+            parameters=tuple(parameter_layouts),
+            parameter_index=MappingProxyType(parameter_index),
+            bit_length=structure_bit_length,
+            min_length=checks.min_length,
+            max_length=checks.max_length,
+        )
+
+    def coded_const_prefix(self, request_prefix: Union[bytes, bytearray] = bytes()) -> bytes:
+        """Return the constant bytes at the beginning of the structure.
 
-        # We were not able to calculate a static bit length
-        return None
+        The result is computed only once for each request prefix.
+        """
+        request_prefix = bytes(request_prefix)
+        prefix = self._coded_const_prefixes.get(request_prefix)
+        if prefix is not None:
+            return prefix
 
-    def coded_const_prefix(self, request_prefix: Union[bytes, bytearray] = bytes()):
-        prefix = bytearray()
-        encode_state = EncodeState(prefix, parameter_values={}, triggering_request=request_prefix)
+        encode_state = EncodeState(
+            bytearray(), parameter_values={}, triggering_request=request_prefix)
         for p in self.parameters:
             if isinstance(p, CodedConstParameter) and p.bit_length % 8 == 0:
-                prefix = p.encode_into_pdu(encode_state)
-                encode_state = EncodeState(prefix, *encode_state[1:])
+                encode_state.coded_message = p.encode_into_pdu(encode_state)
             elif isinstance(p, MatchingRequestParameter):
-                prefix = p.encode_into_pdu(encode_state)
-                encode_state = EncodeState(prefix, *encode_state[1:])
+                encode_state.coded_message = p.encode_into_pdu(encode_state)
             else:
                 break
+
+        prefix = bytes(encode_state.coded_message)
+        self._coded_const_prefixes[request_prefix] = prefix
         return prefix
 
+    @property
+    def admissibility_checks(self) -> AdmissibilityChecks:
+        """Cheap checks which a message must pass in order to be
+        decodable by the structure.
+
+        The checks only cover the parameters which are located at
+        a position which does not depend on the message.
+        """
+        if self._admissibility_checks is None:
+            self._admissibility_checks = self._compute_admissibility_checks()
+        return self._admissibility_checks
+
+    def _compute_admissibility_checks(self) -> AdmissibilityChecks:
+        min_length = 0
+        is_static = True
+        constant_bytes: List[Tuple[int, bytes]] = []
+        nrc_const_bytes: List[Tuple[int, int, Set[bytes]]] = []
+        matching_request_bytes: List[Tuple[int, int, int]] = []
+
+        # byte position of the next parameter if it does not specify
+        # one explicitly, i.e., the end of the parameters which have
+        # been processed so far (None if this depends on the message)
+        next_byte_position: Optional[int] = 0
+        for param in self.parameters:
+            byte_position = param.byte_position
+            if byte_position is None:
+                byte_position = next_byte_position
+
+            bit_length = _static_bit_length(param)
+            if byte_position is None or bit_length is None:
+                is_static = False
+                next_byte_position = None
+                continue
+
+            bit_position = param.bit_position or 0
+            byte_length = (bit_position + bit_length + 7) // 8
+            min_length = max(min_length, byte_position + byte_length)
+            if next_byte_position is not None:
+                next_byte_position = max(next_byte_position, byte_position + byte_length)
+
+            if isinstance(param, CodedConstParameter) and \
+                    _is_byte_aligned_standard_length(param):
+                encode_state = EncodeState(bytearray(), parameter_values={})
+                constant_bytes.append(
+                    (byte_position, bytes(param.get_coded_value_as_bytes(encode_state))))
+            elif isinstance(param, NrcConstParameter) and \
+                    _is_byte_aligned_standard_length(param):
+                encode_state = EncodeState(bytearray(), parameter_values={})
+                allowed_bytes = {
+                    bytes(param.diag_coded_type.convert_internal_to_bytes(v, encode_state, 0))
+                    for v in param.coded_values
+                }
+                nrc_const_bytes.append((byte_position, byte_length, allowed_bytes))
+            elif isinstance(param, MatchingRequestParameter) and bit_position == 0:
+                matching_request_bytes.append(
+                    (byte_position, param.request_byte_position, byte_length))
+
+        max_length = None
+        if is_static:
+            # encoded messages are padded to the size of the structure
+            max_length = max(min_length, self.byte_size or 0)
+
+        return AdmissibilityChecks(
+            min_length=min_length,
+            max_length=max_length,
+            constant_bytes=constant_bytes,
+            nrc_const_bytes=nrc_const_bytes,
+            matching_request_bytes=matching_request_bytes,
+        )
+
+    def _get_individually_decodable_parameters(self) -> Dict[str, Tuple[Parameter, int]]:
+        """Return a dict which maps the short names of the parameters
+        which can be decoded individually to the parameter object and
+        its byte position."""
+        if self._individually_decodable_parameters is not None:
+            return self._individually_decodable_parameters
+
+        result: Dict[str, Tuple[Parameter, int]] = {}
+        duplicate_names: Set[str] = set()
+        next_byte_position: Optional[int] = 0
+        for param in self.parameters:
+            byte_position = param.byte_position
+            if byte_position is None:
+                byte_position = next_byte_position
+
+            if param.short_name in result:
+                duplicate_names.add(param.short_name)
+            if byte_position is not None and _is_self_contained(param):
+                result[param.short_name] = (param, byte_position)
+
+            bit_length = _static_bit_length(param)
+            if byte_position is None or bit_length is None:
+                next_byte_position = None
+            elif next_byte_position is not None:
+                byte_length = ((param.bit_position or 0) + bit_length + 7) // 8
+                next_byte_position = max(next_byte_position, byte_position + byte_length)
+
+        # parameters with ambiguous short names are only available
+        # via the full parameter dict
+        for short_name in duplicate_names:
+            result.pop(short_name, None)
+
+        self._individually_decodable_parameters = result
+        return result
+
+    def can_decode_parameter_individually(self, short_name: str) -> bool:
+        """Check whether a parameter can be decoded without decoding
+        the remaining message.
+
+        This is the case if the position of the parameter does not
+        depend on the message and if its value does not depend on
+        any other parameter.
+        """
+        return short_name in self._get_individually_decodable_parameters()
+
+    def accessor(self, path: str) -> "ParameterAccessor":
+        """Return an accessor for the value of a possibly nested
+        parameter given by a dot-separated path of short names.
+
+        An `OdxError` is raised if the path cannot be resolved (see
+        `ParameterAccessor`). Accessors are created only once for
+        each path.
+        """
+        accessor = self._accessors.get(path)
+        if accessor is None:
+            from .parameteraccessor import ParameterAccessor
+
+            accessor = ParameterAccessor(self, path)
+            self._accessors[path] = accessor
+        return accessor
+
+    def decode_parameter(self, message: Union[bytes, bytearray], short_name: str) -> Any:
+        """Decode the value of a single parameter of a message.
+
+        If the parameter cannot be decoded individually, the complete
+        message is decoded.
+        """
+        param_info = self._get_individually_decodable_parameters().get(short_name)
+        if param_info is None:
+            return self.decode(message)[short_name]
+
+        param, byte_position = param_info
+        decode_state = DecodeState(
+            coded_message=message, parameter_value_pairs=[], next_byte_position=byte_position)
+        value, _ = param.decode_from_pdu(decode_state)
+        return value
+
+    def is_admissible(self,
+                      message: Union[bytes, bytearray],
+                      triggering_request: Optional[Union[bytes, bytearray]] = None) -> bool:
+        """Check whether the structure might be able to decode a message.
+
+        This is much cheaper than decoding the message. If `False` is
+        returned, decoding the message would fail or produce a
+        `DecodeError` warning, but not all messages for which `True`
+        is returned can be decoded.
+
+        If the triggering request is specified, the
+        MATCHING-REQUEST-PARAMs of the structure are checked as well.
+        """
+        checks = self.admissibility_checks
+
+        if len(message) < checks.min_length:
+            return False
+        if checks.max_length is not None and len(message) > checks.max_length:
+            return False
+
+        for pos, expected in checks.constant_bytes:
+            if message[pos:pos + len(expected)] != expected:
+                return False
+
+        for pos, length, allowed in checks.nrc_const_bytes:
+            if bytes(message[pos:pos + length]) not in allowed:
+                return False
+
+        if triggering_request is not None:
+            for pos, rq_pos, length in checks.matching_request_bytes:
+                if message[pos:pos + length] != triggering_request[rq_pos:rq_pos + length]:
+                    return False
+
+        return True
+
     @property
     def required_parameters(self) -> List[Parameter]:
         """Return the list of parameters which are required for
@@ -130,8 +544,10 @@ class BasicStructure(DopBase):
                                      param_values: dict,
                                      triggering_coded_request,
                                      is_end_of_pdu=True):
-        logger.debug(f"{self.short_name} encode RPC"
-                     f" with params={param_values}")
+        policy = get_coding_policy()
+        if policy.debug_logging and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"{self.short_name} encode RPC"
+                         f" with params={param_values}")
 
         coded_rpc = bytearray()
         encode_state = EncodeState(
@@ -145,18 +561,20 @@ class BasicStructure(DopBase):
         for param in self.parameters:
             if param == self.parameters[-1]:
                 # The last parameter is at the end of the PDU if the structure itself is at the end of the PDU
-                encode_state = encode_state._replace(is_end_of_pdu=is_end_of_pdu)
+                encode_state.is_end_of_pdu = is_end_of_pdu
 
             implicit_length_encoding = (
                 isinstance(param, LengthKeyParameter) and param.short_name not in param_values)
             if implicit_length_encoding:
-                # Mark this parameter since we need to re-encode it later on
-                length_encodings.append((param, encode_state))
+                # Mark this parameter since we need to re-encode it
+                # later on. (the encode state is advanced in place, so
+                # we need to keep a snapshot of it.)
+                length_encodings.append((param, encode_state._replace()))
                 # Give it a default value for now
                 encode_state.parameter_values[param.short_name] = 0
 
             coded_rpc = param.encode_into_pdu(encode_state)
-            encode_state = encode_state._replace(coded_message=coded_rpc)
+            encode_state.coded_message = coded_rpc
 
             if implicit_length_encoding:
                 # Undo length_keys changes
@@ -180,7 +598,8 @@ class BasicStructure(DopBase):
                 coded_rpc[i] |= b
 
         # Assert that length is as expected
-        self._validate_coded_rpc(coded_rpc)
+        if policy.check_consistency:
+            self._validate_coded_rpc(coded_rpc)
 
         return bytearray(coded_rpc)
 
@@ -203,8 +622,8 @@ class BasicStructure(DopBase):
             # We may have broke something
             # but it could be that bit_length was mis calculated and not the actual bytes are wrong
             # Could happen with overlapping parameters and parameters with gaps
-            warnings.warn(
-                self._get_encode_error_str("may have been", coded_rpc, bit_length), OdxWarning)
+            get_coding_policy().report_encode_error(
+                self._get_encode_error_str("may have been", coded_rpc, bit_length))
 
     def _get_encode_error_str(self, verb: str, coded_rpc: bytearray, bit_length: int):
 
@@ -233,24 +652,37 @@ class BasicStructure(DopBase):
                               f"{self.short_name} was passed the bit position {bit_position}")
         byte_code = decode_state.coded_message[decode_state.next_byte_position:]
         inner_decode_state = DecodeState(
-            coded_message=byte_code, parameter_value_pairs=[], next_byte_position=0)
+            coded_message=byte_code,
+            parameter_value_pairs=[],
+            next_byte_position=0,
+            length_keys=decode_state.length_keys,
+            table_keys=decode_state.table_keys,
+        )
+        parameter_value_pairs = inner_decode_state.parameter_value_pairs
 
+        # the decode state is used as a cursor which is advanced in
+        # place. Since parameters may be located anywhere within the
+        # structure, we need to keep track of the end of the
+        # structure separately.
+        next_byte_position = 0
         for parameter in self.parameters:
-            value, next_byte_position = parameter.decode_from_pdu(inner_decode_state)
+            if parameter.byte_position is not None:
+                inner_decode_state.next_byte_position = parameter.byte_position
+            else:
+                inner_decode_state.next_byte_position = next_byte_position
+
+            value, param_next_byte_position = parameter.decode_from_pdu(inner_decode_state)
+
+            parameter_value_pairs.append(ParameterValuePair(parameter, value))
+            next_byte_position = max(next_byte_position, param_next_byte_position)
 
-            inner_decode_state.parameter_value_pairs.append(ParameterValuePair(parameter, value))
-            inner_decode_state = DecodeState(
-                coded_message=byte_code,
-                parameter_value_pairs=inner_decode_state.parameter_value_pairs,
-                next_byte_position=max(inner_decode_state.next_byte_position, next_byte_position),
-            )
         # Construct the param dict.
         # TODO: Wouldn't it be prettier if we kept the information of each parameter
         #       instead of just using the short_name as the key and "forgetting" everything else?
         param_dict = OrderedDict(
-            (pv.parameter.short_name, pv.value) for pv in inner_decode_state.parameter_value_pairs)
+            (pv.parameter.short_name, pv.value) for pv in parameter_value_pairs)
 
-        return param_dict, decode_state.next_byte_position + inner_decode_state.next_byte_position
+        return param_dict, decode_state.next_byte_position + next_byte_position
 
     def encode(self, coded_request: Optional[ByteString] = None, **params) -> ByteString:
         """
@@ -265,24 +697,176 @@ class BasicStructure(DopBase):
         return self.convert_physical_to_internal(
             params, triggering_coded_request=coded_request, is_end_of_pdu=True)
 
-    def decode(self, message: Union[bytes, bytearray]):
+    def _get_projection_plan(self, fields: FrozenSet[str]) -> List[_ProjectionStep]:
+        """Determine the steps required to decode the parameters with
+        the given short names."""
+        plan = self._projection_plans.get(fields)
+        if plan is not None:
+            return plan
+
+        params: List[Parameter] = list(self.parameters)  # type: ignore[arg-type]
+
+        # the parameters which need to be decoded, i.e., the
+        # requested ones and the ones whose values are required to
+        # decode them
+        decoded_fields = set(fields)
+        for param in params:
+            if param.short_name in fields:
+                decoded_fields |= _get_prerequisite_short_names(param)
+
+        num_steps = 0
+        for i, param in enumerate(params):
+            if param.short_name in decoded_fields:
+                num_steps = i + 1
+
+        # the end of a parameter is only relevant if a later
+        # parameter which needs to be processed does not specify its
+        # byte position explicitly
+        end_needed = [False] * num_steps
+        for i in range(num_steps - 2, -1, -1):
+            end_needed[i] = end_needed[i + 1] or params[i + 1].byte_position is None
+
+        plan = []
+        for param, param_end_needed in zip(params, end_needed):
+            if param.short_name in decoded_fields:
+                plan.append(_ProjectionStep(param, "decode", None))
+            elif isinstance(param, (LengthKeyParameter, TableKeyParameter)):
+                # the value of length keys and table keys may be
+                # required by any subsequent parameter
+                plan.append(_ProjectionStep(param, "traverse", None))
+            elif param_end_needed:
+                bit_length = _static_bit_length(param)
+                if bit_length is not None:
+                    byte_length = ((param.bit_position or 0) + bit_length + 7) // 8
+                    plan.append(_ProjectionStep(param, "skip", byte_length))
+                else:
+                    plan.append(_ProjectionStep(param, "traverse", None))
+
+        self._projection_plans[fields] = plan
+        return plan
+
+    def _convert_bytes_to_physical_projected(self, decode_state: DecodeState,
+                                             fields: FrozenSet[str]) -> Dict[str, Any]:
+        """Decode only the parameters with the given short names.
+
+        Parameters which are neither requested nor required to locate
+        the requested ones are not looked at at all. Parameters
+        which are only required to locate the requested ones are
+        traversed without converting their values to the physical
+        type.
+        """
+        inner_decode_state = DecodeState(
+            coded_message=decode_state.coded_message[decode_state.next_byte_position:],
+            parameter_value_pairs=[],
+            next_byte_position=0,
+            length_keys=decode_state.length_keys,
+            table_keys=decode_state.table_keys,
+        )
+        parameter_value_pairs = inner_decode_state.parameter_value_pairs
+
+        next_byte_position = 0
+        for parameter, action, byte_length in self._get_projection_plan(fields):
+            if parameter.byte_position is not None:
+                inner_decode_state.next_byte_position = parameter.byte_position
+            else:
+                inner_decode_state.next_byte_position = next_byte_position
+
+            if action == "skip":
+                assert byte_length is not None
+                param_next_byte_position = inner_decode_state.next_byte_position + byte_length
+            elif action == "traverse":
+                param_next_byte_position = _traverse_parameter(parameter, inner_decode_state)
+            else:
+                value, param_next_byte_position = parameter.decode_from_pdu(inner_decode_state)
+                parameter_value_pairs.append(ParameterValuePair(parameter, value))
+
+            next_byte_position = max(next_byte_position, param_next_byte_position)
+
+        # the values of prerequisite parameters are not part of the result
+        return OrderedDict((pv.parameter.short_name, pv.value)
+                           for pv in parameter_value_pairs
+                           if pv.parameter.short_name in fields)
+
+    def decode_iter(self, message: Union[bytes, bytearray], short_name: str) -> Iterator[Any]:
+        """Decode the items of an end of PDU field of a message one by
+        one.
+
+        This allows to process responses with a very large number of
+        repeated items, e.g., the DTC records reported by a
+        ReadDTCInformation response, with constant memory. The
+        parameters preceding the field are only processed as far as
+        this is required to locate it (see `decode()`), and the
+        items are decoded lazily by `EndOfPduField.decode_iter()`.
+        """
+        from .endofpdufield import EndOfPduField
+
+        param = self.parameters.get(short_name)
+        if not isinstance(param, ParameterWithDOP) or not isinstance(param.dop, EndOfPduField):
+            raise OdxError(f"Structure {self.short_name} does not feature an end of PDU "
+                           f"field named '{short_name}'")
+
+        decode_state = DecodeState(
+            coded_message=message, parameter_value_pairs=[], next_byte_position=0)
+        next_byte_position = 0
+        for parameter, action, byte_length in self._get_projection_plan(frozenset([short_name])):
+            if parameter.byte_position is not None:
+                decode_state.next_byte_position = parameter.byte_position
+            else:
+                decode_state.next_byte_position = next_byte_position
+
+            if parameter is param:
+                break
+            elif action == "skip":
+                assert byte_length is not None
+                param_next_byte_position = decode_state.next_byte_position + byte_length
+            elif action == "traverse":
+                param_next_byte_position = _traverse_parameter(parameter, decode_state)
+            else:
+                # the value of the parameter is required to decode the items
+                value, param_next_byte_position = parameter.decode_from_pdu(decode_state)
+                decode_state.parameter_value_pairs.append(ParameterValuePair(parameter, value))
+
+            next_byte_position = max(next_byte_position, param_next_byte_position)
+
+        return param.dop.decode_iter(decode_state, bit_position=param.bit_position or 0)
+
+    def decode(self, message: Union[bytes, bytearray], fields: Optional[Iterable[str]] = None):
+        """Decode a message.
+
+        If `fields` is specified, only the parameters with the given
+        short names are decoded and returned. Short names which are
+        not featured by the structure are ignored. Since the
+        remainder of the message is not looked at, a message which
+        is longer or shorter than expected might go unnoticed in
+        this case.
+        """
         # dummy decode state to be passed to convert_bytes_to_physical
         decode_state = DecodeState(
             coded_message=message, parameter_value_pairs=[], next_byte_position=0)
+
+        if fields is not None:
+            return self._convert_bytes_to_physical_projected(decode_state, frozenset(fields))
+
         param_values, next_byte_position = self.convert_bytes_to_physical(decode_state)
-        if len(message) != next_byte_position:
-            warnings.warn(
+        policy = get_coding_policy()
+        if policy.check_consistency and len(message) != next_byte_position:
+            policy.report_decode_error(
                 f"The message {message.hex()} is longer than could be parsed."
-                f" Expected {next_byte_position} but got {len(message)}.",
-                DecodeError,
-            )
+                f" Expected {next_byte_position} but got {len(message)}.")
         return param_values
 
     def parameter_dict(self) -> ParameterDict:
         """
         Returns a dict with parameter short names as keys.
         The values are parameters for simple types or a nested dict for structures.
+
+        The dict is computed only once and must thus be treated as read-only.
         """
+        if self._parameter_dict is None:
+            self._parameter_dict = self._compute_parameter_dict()
+        return self._parameter_dict
+
+    def _compute_parameter_dict(self) -> ParameterDict:
         assert all(not isinstance(p, ParameterWithDOP) or isinstance(p.dop, DataObjectProperty) or
                    isinstance(p.dop, Structure) for p in self.parameters)
         param_dict: ParameterDict = {
@@ -313,6 +897,19 @@ class BasicStructure(DopBase):
 
         for p in self.parameters:
             p._resolve_references(parent_dl, odxlinks)
+        for p in self.parameters:
+            if isinstance(p, TableStructParameter):
+                p._resolve_table_key_snref(self.parameters)
+
+        self._coded_const_prefixes = {}
+        self._admissibility_checks = None
+        self._layout = None
+        self._parameter_dict = None
+        self._accessors = {}
+        self._individually_decodable_parameters = None
+        self._projection_plans = {}
+        self._vectorized_layout = None
+        self._vectorized_layout_computed = False
 
     def __message_format_lines(self, allow_unknown_lengths: bool = False) -> List[str]:
         # sort parameters
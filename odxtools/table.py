@@ -4,7 +4,7 @@ import abc
 from dataclasses import dataclass, field
 from typing import Any, Dict, Iterable, List, Optional
 
-from .dataobjectproperty import DopBase
+from .dataobjectproperty import DataObjectProperty, DopBase
 from .globals import logger
 from .odxlink import OdxDocFragment, OdxLinkDatabase, OdxLinkId, OdxLinkRef
 from .specialdata import SpecialDataGroup, create_sdgs_from_et
@@ -156,6 +156,9 @@ class Table(TableBase):
         self.description = description
         self.semantic = semantic
 
+        self._table_rows_by_key: Dict[Any, TableRow] = {}
+        self._table_rows_by_short_name: Dict[str, TableRow] = {}
+
     @staticmethod
     def from_et(et_element, doc_frags: List[OdxDocFragment]) -> "Table":
         """Reads a TABLE."""
@@ -204,6 +207,47 @@ class Table(TableBase):
         """The table rows (both local and referenced) in this table."""
         return self._local_table_rows + self._ref_table_rows
 
+    def get_table_row_by_key(self, key: Any) -> Optional[TableRow]:
+        """Return the table row for a physical value of the key DOP,
+        or None if the table does not feature a row with this key."""
+        if isinstance(key, bytearray):
+            key = bytes(key)
+        return self._table_rows_by_key.get(key)
+
+    def get_table_row_by_short_name(self, short_name: str) -> Optional[TableRow]:
+        """Return the table row with a given short name, or None if
+        the table does not feature such a row."""
+        return self._table_rows_by_short_name.get(short_name)
+
+    def _build_table_row_index(self) -> None:
+        """Build the dicts which map the keys and the short names to
+        the table rows.
+
+        The keys of the table rows are specified as strings. They are
+        converted to the physical type of the key DOP, so that the
+        decoded value of a table key can be looked up directly. If
+        several rows exhibit the same key or short name, the first
+        one is used.
+        """
+        key_type = None
+        if isinstance(self.key_dop, DataObjectProperty):
+            key_type = self.key_dop.physical_type.base_data_type
+
+        self._table_rows_by_key = {}
+        self._table_rows_by_short_name = {}
+        for table_row in self.table_rows:
+            key: Any = table_row.key
+            if key_type is not None and isinstance(key, str):
+                try:
+                    key = key_type.from_string(key)
+                except ValueError:
+                    logger.warning(f"Key '{key}' of table row {table_row.short_name} cannot be "
+                                   f"converted to {key_type.value}")
+            if isinstance(key, bytearray):
+                key = bytes(key)
+            self._table_rows_by_key.setdefault(key, table_row)
+            self._table_rows_by_short_name.setdefault(table_row.short_name, table_row)
+
     def _build_odxlinks(self) -> Dict[OdxLinkId, Any]:
         result = super()._build_odxlinks()
 
@@ -227,6 +271,8 @@ class Table(TableBase):
             assert isinstance(tr, TableRow)
             self._ref_table_rows.append(tr)
 
+        self._build_table_row_index()
+
     def __repr__(self) -> str:
         return (f"Table('{self.short_name}', " + ", ".join(
             [f"table_rows='{self.table_rows}'", f"key_dop_ref='{self.key_dop_ref}'"]) + ")")
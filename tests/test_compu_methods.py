@@ -8,7 +8,10 @@ from xml.etree import ElementTree
 import jinja2
 
 import odxtools
-from odxtools.compumethods import IntervalType, Limit, LinearCompuMethod, TabIntpCompuMethod
+from odxtools.compumethods import (NOT_CONVERTIBLE, CompuMethod, CompuScale, IdenticalCompuMethod,
+                                   IntervalType, Limit, LinearCompuMethod, ScaleLinearCompuMethod,
+                                   TabIntpCompuMethod, TexttableCompuMethod)
+from odxtools.compumethods._arrayutils import np
 from odxtools.compumethods.createanycompumethod import create_any_compu_method_from_et
 from odxtools.exceptions import DecodeError, EncodeError
 from odxtools.odxlink import OdxDocFragment
@@ -17,6 +20,96 @@ from odxtools.odxtypes import DataType
 doc_frags = [OdxDocFragment("UnitTest", "WinneThePoh")]
 
 
+class TestCompiledCompuMethods(unittest.TestCase):
+    """The compiled conversion functions must behave exactly like
+    the regular ones"""
+
+    internal_values = [-3, 0, 1, 2, 3, 7, 15, 16, 2.0, 2.5, float("nan"), "3", None]
+
+    def assert_compiled_equivalent(self, compu_method: CompuMethod) -> None:
+        internal_to_physical = compu_method.compile_internal_to_physical()
+        for internal_value in self.internal_values:
+            try:
+                if compu_method.is_valid_internal_value(internal_value):
+                    expected = compu_method.convert_internal_to_physical(internal_value)
+                else:
+                    expected = NOT_CONVERTIBLE
+            except Exception as e:
+                # invalid values which cannot even be checked must
+                # raise the same error
+                self.assertRaises(type(e), internal_to_physical, internal_value)
+                continue
+
+            actual = internal_to_physical(internal_value)
+            msg = f"internal value {internal_value!r}"
+            self.assertEqual(type(actual), type(expected), msg)
+            if expected == expected:
+                self.assertEqual(actual, expected, msg)
+            else:
+                # NaN
+                self.assertNotEqual(actual, actual, msg)
+
+    def test_compiled_linear_compu_method(self):
+        for internal_type, physical_type in [("A_INT32", "A_INT32"), ("A_UINT32", "A_FLOAT64"),
+                                             ("A_FLOAT64", "A_INT32"), ("A_FLOAT64", "A_FLOAT64")]:
+            for lower_limit, upper_limit in [
+                (None, None),
+                (Limit(2), Limit(15)),
+                (Limit(2, IntervalType.OPEN), Limit(15, IntervalType.OPEN)),
+                (Limit(float("-inf"), IntervalType.INFINITE), Limit(3)),
+            ]:
+                self.assert_compiled_equivalent(
+                    LinearCompuMethod(
+                        offset=1,
+                        factor=-5,
+                        denominator=3,
+                        internal_type=internal_type,
+                        physical_type=physical_type,
+                        internal_lower_limit=lower_limit,
+                        internal_upper_limit=upper_limit,
+                    ))
+
+    def test_compiled_identical_compu_method(self):
+        for data_type in ["A_INT32", "A_FLOAT64", "A_UNICODE2STRING"]:
+            self.assert_compiled_equivalent(
+                IdenticalCompuMethod(internal_type=data_type, physical_type=data_type))
+
+    def test_compiled_scale_compu_methods(self):
+        self.assert_compiled_equivalent(
+            TexttableCompuMethod(
+                internal_type=DataType.A_INT32,
+                internal_to_phys=[
+                    CompuScale(lower_limit=Limit(0), upper_limit=Limit(0), compu_const="zero"),
+                    CompuScale(
+                        lower_limit=Limit(1, IntervalType.OPEN),
+                        upper_limit=Limit(15),
+                        compu_inverse_value=7,
+                        compu_const="some"),
+                ],
+            ))
+        self.assert_compiled_equivalent(
+            ScaleLinearCompuMethod(linear_methods=[
+                LinearCompuMethod(
+                    offset=1,
+                    factor=2,
+                    denominator=1,
+                    internal_type="A_INT32",
+                    physical_type="A_INT32",
+                    internal_lower_limit=Limit(0),
+                    internal_upper_limit=Limit(3, IntervalType.OPEN),
+                ),
+                LinearCompuMethod(
+                    offset=100,
+                    factor=1,
+                    denominator=2,
+                    internal_type="A_INT32",
+                    physical_type="A_INT32",
+                    internal_lower_limit=Limit(3),
+                    internal_upper_limit=Limit(15),
+                ),
+            ]))
+
+
 class TestLinearCompuMethod(unittest.TestCase):
 
     def test_linear_compu_method_type_int_int(self):
@@ -143,6 +236,179 @@ class TestLinearCompuMethod(unittest.TestCase):
         self.assertFalse(compu_method.is_valid_physical_value(-75))
         self.assertFalse(compu_method.is_valid_physical_value(-13))
 
+    @unittest.skipIf(np is None, "NumPy is not available")
+    def test_linear_compu_method_arrays(self):
+        compu_method = LinearCompuMethod(
+            offset=1,
+            factor=-5,
+            denominator=3,
+            internal_type="A_INT32",
+            physical_type="A_FLOAT64",
+            internal_lower_limit=Limit(2, interval_type=IntervalType.OPEN),
+            internal_upper_limit=Limit(15),
+        )
+
+        internal_values = np.array([1, 2, 3, 10, 15, 16])
+        self.assertEqual(
+            compu_method.is_valid_internal_array(internal_values).tolist(),
+            [compu_method.is_valid_internal_value(x) for x in internal_values.tolist()])
+
+        internal_values = np.array([3, 10, 15])
+        physical_values = compu_method.convert_internal_to_physical_array(internal_values)
+        self.assertEqual(physical_values.tolist(), [
+            compu_method.convert_internal_to_physical(x) for x in internal_values.tolist()
+        ])
+        self.assertEqual(
+            compu_method.convert_physical_to_internal_array(physical_values).tolist(),
+            [compu_method.convert_physical_to_internal(x) for x in physical_values.tolist()])
+
+        self.assertFalse(compu_method.is_valid_internal_array(np.array([3.0])).any())
+        self.assertRaises(AssertionError, compu_method.convert_internal_to_physical_array,
+                          np.array([3, 16]))
+
+
+class TestScaleLinearCompuMethod(unittest.TestCase):
+
+    @unittest.skipIf(np is None, "NumPy is not available")
+    def test_scale_linear_compu_method_arrays(self):
+        compu_method = ScaleLinearCompuMethod(linear_methods=[
+            LinearCompuMethod(
+                offset=1,
+                factor=2,
+                denominator=1,
+                internal_type="A_UINT32",
+                physical_type="A_UINT32",
+                internal_lower_limit=Limit(0),
+                internal_upper_limit=Limit(10, interval_type=IntervalType.OPEN),
+            ),
+            LinearCompuMethod(
+                offset=100,
+                factor=1,
+                denominator=1,
+                internal_type="A_UINT32",
+                physical_type="A_UINT32",
+                internal_lower_limit=Limit(10),
+                internal_upper_limit=Limit(20),
+            ),
+            LinearCompuMethod(
+                offset=500,
+                factor=5,
+                denominator=1,
+                internal_type="A_UINT32",
+                physical_type="A_UINT32",
+                internal_lower_limit=Limit(20, interval_type=IntervalType.OPEN),
+                internal_upper_limit=Limit(30),
+            ),
+        ])
+
+        internal_values = np.array([0, 3, 9, 10, 15, 20, 21, 30, 31])
+        self.assertEqual(
+            compu_method.is_valid_internal_array(internal_values).tolist(),
+            [compu_method.is_valid_internal_value(x) for x in internal_values.tolist()])
+
+        internal_values = np.array([0, 3, 9, 10, 15, 20, 21, 30])
+        physical_values = compu_method.convert_internal_to_physical_array(internal_values)
+        self.assertEqual(physical_values.tolist(), [
+            compu_method.convert_internal_to_physical(x) for x in internal_values.tolist()
+        ])
+        self.assertEqual(
+            compu_method.convert_physical_to_internal_array(physical_values).tolist(),
+            [compu_method.convert_physical_to_internal(x) for x in physical_values.tolist()])
+
+        self.assertRaises(DecodeError, compu_method.convert_internal_to_physical, 31)
+        self.assertRaises(DecodeError, compu_method.convert_internal_to_physical_array,
+                          np.array([3, 31]))
+
+
+class TestTexttableCompuMethod(unittest.TestCase):
+
+    def test_texttable_compu_method_lookup(self):
+        # point scales in reverse order, followed by range scales
+        # which are adjacent to each other
+        scales = [
+            CompuScale(lower_limit=Limit(i), upper_limit=Limit(i), compu_const=f"code_{i}")
+            for i in reversed(range(1000))
+        ]
+        scales += [
+            CompuScale(
+                lower_limit=Limit(1000),
+                upper_limit=Limit(2000),
+                compu_inverse_value=1500,
+                compu_const="range_a"),
+            CompuScale(
+                lower_limit=Limit(2000, interval_type=IntervalType.OPEN),
+                upper_limit=Limit(3000, interval_type=IntervalType.OPEN),
+                compu_inverse_value=2500,
+                compu_const="range_b"),
+        ]
+        compu_method = TexttableCompuMethod(
+            internal_type=DataType.A_UINT32, internal_to_phys=scales)
+
+        self.assertEqual(compu_method.convert_internal_to_physical(0), "code_0")
+        self.assertEqual(compu_method.convert_internal_to_physical(123), "code_123")
+        self.assertEqual(compu_method.convert_internal_to_physical(1000), "range_a")
+        self.assertEqual(compu_method.convert_internal_to_physical(2000), "range_a")
+        self.assertEqual(compu_method.convert_internal_to_physical(2001), "range_b")
+        self.assertRaises(DecodeError, compu_method.convert_internal_to_physical, 3000)
+        self.assertRaises(DecodeError, compu_method.convert_internal_to_physical, -1)
+
+        self.assertEqual(compu_method.convert_physical_to_internal("code_123"), 123)
+        self.assertEqual(compu_method.convert_physical_to_internal("range_b"), 2500)
+        self.assertIsNone(compu_method.convert_physical_to_internal("code_1000"))
+        self.assertTrue(compu_method.is_valid_physical_value("code_999"))
+        self.assertFalse(compu_method.is_valid_physical_value("code_1000"))
+
+    def test_texttable_compu_method_overlapping_scales(self):
+        # if scales overlap, the first matching one is used
+        compu_method = TexttableCompuMethod(
+            internal_type=DataType.A_UINT32,
+            internal_to_phys=[
+                CompuScale(lower_limit=Limit(5), upper_limit=Limit(5), compu_const="five"),
+                CompuScale(
+                    lower_limit=Limit(0),
+                    upper_limit=Limit(10),
+                    compu_inverse_value=0,
+                    compu_const="small"),
+                CompuScale(lower_limit=Limit(10), upper_limit=Limit(10), compu_const="ten"),
+            ],
+        )
+        self.assertEqual(compu_method.convert_internal_to_physical(5), "five")
+        self.assertEqual(compu_method.convert_internal_to_physical(7), "small")
+        self.assertEqual(compu_method.convert_internal_to_physical(10), "small")
+
+    @unittest.skipIf(np is None, "NumPy is not available")
+    def test_texttable_compu_method_arrays(self):
+        compu_method = TexttableCompuMethod(
+            internal_type=DataType.A_UINT32,
+            internal_to_phys=[
+                CompuScale(lower_limit=Limit(0), upper_limit=Limit(0), compu_const="off"),
+                CompuScale(
+                    lower_limit=Limit(1),
+                    upper_limit=Limit(9),
+                    compu_inverse_value=5,
+                    compu_const="on"),
+                CompuScale(lower_limit=Limit(20), upper_limit=Limit(20), compu_const="error"),
+            ],
+        )
+
+        internal_values = np.array([0, 1, 5, 9, 10, 20, 21])
+        self.assertEqual(
+            compu_method.is_valid_internal_array(internal_values).tolist(),
+            [compu_method.is_valid_internal_value(x) for x in internal_values.tolist()])
+
+        internal_values = np.array([0, 1, 5, 9, 20])
+        physical_values = compu_method.convert_internal_to_physical_array(internal_values)
+        self.assertEqual(physical_values.tolist(), ["off", "on", "on", "on", "error"])
+        self.assertEqual(
+            compu_method.convert_physical_to_internal_array(physical_values).tolist(),
+            [0, 5, 5, 5, 20])
+
+        self.assertEqual(
+            compu_method.is_valid_physical_array(np.array(["on", "invalid"])).tolist(),
+            [True, False])
+        self.assertRaises(DecodeError, compu_method.convert_internal_to_physical_array,
+                          np.array([0, 10]))
+
 
 class TestTabIntpCompuMethod(unittest.TestCase):
 
@@ -224,6 +490,38 @@ class TestTabIntpCompuMethod(unittest.TestCase):
         self.assertRaises(EncodeError, method.convert_physical_to_internal, -2)
         self.assertRaises(EncodeError, method.convert_physical_to_internal, 2.1)
 
+    def test_tabintp_non_monotonic(self):
+        # the first matching segment is used if the points are not
+        # increasing
+        method = TabIntpCompuMethod(
+            internal_type=DataType.A_INT32,
+            physical_type=DataType.A_FLOAT32,
+            internal_points=[0, 10, 5],
+            physical_points=[0, 10, 20],
+        )
+        self.assertEqual(method.convert_internal_to_physical(5), 5)
+        self.assertEqual(method.convert_internal_to_physical(10), 10)
+        self.assertEqual(method.convert_physical_to_internal(15), 7)
+
+    @unittest.skipIf(np is None, "NumPy is not available")
+    def test_tabintp_convert_arrays(self):
+        method = self.compumethod
+
+        internal_values = np.array([0, 2, 3, 5, 10, 20, 25, 30])
+        physical_values = method.convert_internal_to_physical_array(internal_values)
+        self.assertEqual(physical_values.tolist(),
+                         [method.convert_internal_to_physical(x) for x in internal_values.tolist()])
+        self.assertEqual(
+            method.convert_physical_to_internal_array(physical_values).tolist(),
+            [method.convert_physical_to_internal(x) for x in physical_values.tolist()])
+
+        self.assertEqual(
+            method.is_valid_internal_array(np.array([-2, 0, 30, 31])).tolist(),
+            [False, True, True, False])
+        self.assertRaises(DecodeError, method.convert_internal_to_physical_array, np.array([0, 31]))
+        self.assertRaises(EncodeError, method.convert_physical_to_internal_array,
+                          np.array([0.0, 2.1]))
+
     def test_read_odx(self):
         expected = self.compumethod
 
@@ -1,22 +1,35 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
 import unittest
+from typing import Optional
 
-from odxtools.compumethods import IdenticalCompuMethod, LinearCompuMethod
+from odxtools.compumethods import (CompuMethod, IdenticalCompuMethod, IntervalType, Limit,
+                                   LinearCompuMethod)
 from odxtools.dataobjectproperty import DataObjectProperty, DiagnosticTroubleCode, DtcDop
-from odxtools.diagcodedtypes import LeadingLengthInfoType, MinMaxLengthType, StandardLengthType
+from odxtools.decodestate import DecodeState
+from odxtools.decodestatistics import DecodeStatistics
+from odxtools.diagcodedtypes import (DiagCodedType, LeadingLengthInfoType, MinMaxLengthType,
+                                     StandardLengthType)
 from odxtools.diaglayer import DiagLayer
 from odxtools.diaglayertype import DIAG_LAYER_TYPE
 from odxtools.endofpdufield import EndOfPduField
-from odxtools.exceptions import DecodeError
+from odxtools.envdata import EnvironmentData
+from odxtools.envdatadesc import EnvironmentDataDescription
+from odxtools.exceptions import DecodeError, EncodeError, OdxError
 from odxtools.message import Message
+from odxtools.messagebatch import VectorizedLayout, np
+from odxtools.multiplexer import (Multiplexer, MultiplexerCase, MultiplexerDefaultCase,
+                                  MultiplexerSwitchKey)
 from odxtools.odxlink import OdxDocFragment, OdxLinkDatabase, OdxLinkId, OdxLinkRef
 from odxtools.odxtypes import DataType
 from odxtools.parameters import (CodedConstParameter, MatchingRequestParameter,
-                                 PhysicalConstantParameter, ValueParameter)
+                                 PhysicalConstantParameter, ReservedParameter, TableKeyParameter,
+                                 TableStructParameter, ValueParameter)
 from odxtools.physicaltype import PhysicalType
 from odxtools.service import DiagService
+from odxtools.serviceprefixtrie import ServicePrefixTrieStatistics
 from odxtools.structures import Request, Response, Structure
+from odxtools.table import Table, TableRow
 
 doc_frags = [OdxDocFragment("UnitTest", "WinneThePoh")]
 
@@ -176,23 +189,190 @@ class TestIdentifyingService(unittest.TestCase):
         )
         diag_layer.finalize_init(odxlinks=odxlinks)
 
+        trie = diag_layer.service_prefix_trie
         self.assertEqual(
-            diag_layer._build_coded_prefix_tree(),
-            {0x7D: {
-                0xAB: {
-                    -1: [service]
-                },
-                0xC: {
-                    0xDE: {
-                        -1: [service2]
-                    },
-                    0x86: {
-                        -1: [service2]
-                    }
-                }
-            }},
+            trie.leaves,
+            {
+                bytes([0x7D, 0xAB]): [service],
+                bytes([0x7D, 0x0C, 0xDE]): [service2],
+                bytes([0x7D, 0x0C, 0x86]): [service2],
+            },
+        )
+        self.assertEqual(trie.find(bytes([0x7D, 0xAB, 0x01])), [service])
+        self.assertEqual(trie.find(bytes([0x7D, 0x0C, 0x86])), [service2])
+        self.assertEqual(trie.find(bytes([0x7D, 0x0C])), [])
+        self.assertEqual(trie.depth, 3)
+        self.assertEqual(trie.ambiguous_leaves, {})
+        self.assertEqual(
+            trie.statistics,
+            ServicePrefixTrieStatistics(
+                num_services=2, num_leaves=3, depth=3, num_ambiguous_leaves=0),
+        )
+
+    def test_candidate_pruning(self):
+        diag_coded_type = StandardLengthType(
+            base_data_type="A_UINT32",
+            base_type_encoding=None,
+            bit_length=8,
+            bit_mask=None,
+            is_condensed_raw=None,
+            is_highlow_byte_order_raw=None,
+        )
+        sid_param = CodedConstParameter(
+            short_name="SID",
+            long_name=None,
+            description=None,
+            semantic=None,
+            diag_coded_type=diag_coded_type,
+            coded_value=0x31,
+            byte_position=0,
+            bit_position=None,
+            sdgs=[],
+        )
+
+        # two services which exhibit the same constant prefix but
+        # whose requests exhibit different lengths
+        services = []
+        for i, bit_length in enumerate([8, 16]):
+            request = Request(
+                odx_id=OdxLinkId(f"request_id{i}", doc_frags),
+                short_name=f"request_sn{i}",
+                long_name=None,
+                description=None,
+                is_visible_raw=None,
+                parameters=[
+                    sid_param,
+                    ReservedParameter(
+                        short_name="reserved",
+                        long_name=None,
+                        description=None,
+                        semantic=None,
+                        bit_length=bit_length,
+                        byte_position=None,
+                        bit_position=None,
+                        sdgs=[],
+                    ),
+                ],
+                byte_size=None,
+            )
+            services.append(
+                DiagService(
+                    odx_id=OdxLinkId(f"service_id{i}", doc_frags),
+                    short_name=f"service_sn{i}",
+                    long_name=None,
+                    description=None,
+                    admin_data=None,
+                    semantic=None,
+                    audience=None,
+                    functional_class_refs=[],
+                    pre_condition_state_refs=[],
+                    state_transition_refs=[],
+                    request=request,
+                    positive_responses=[],
+                    negative_responses=[],
+                    sdgs=[],
+                ))
+
+        diag_layer = DiagLayer(
+            variant_type=DIAG_LAYER_TYPE.BASE_VARIANT,
+            odx_id=OdxLinkId("dl_id", doc_frags),
+            short_name="dl_sn",
+            long_name=None,
+            description=None,
+            parent_refs=[],
+            communication_parameters=[],
+            services=services,
+            requests=[s.request for s in services],
+            positive_responses=[],
+            negative_responses=[],
+            single_ecu_jobs=[],
+            diag_comm_refs=[],
+            diag_data_dictionary_spec=None,
+            additional_audiences=[],
+            functional_classes=[],
+            states=[],
+            state_transitions=[],
+            import_refs=[],
+            sdgs=[],
+        )
+        diag_layer.finalize_init()
+
+        stats = DecodeStatistics()
+        messages = diag_layer.decode(bytes([0x31, 0x00, 0x00]), stats=stats)
+        self.assertEqual([m.service for m in messages], [services[1]])
+        self.assertEqual(
+            stats, DecodeStatistics(num_messages=1, num_candidates=2, num_pruned=1, num_failed=0))
+
+        messages = diag_layer.decode(bytes([0x31, 0x00]), stats=stats)
+        self.assertEqual([m.service for m in messages], [services[0]])
+        self.assertEqual(
+            stats, DecodeStatistics(num_messages=2, num_candidates=4, num_pruned=2, num_failed=0))
+
+    def test_admissibility_checks(self):
+        diag_coded_type = StandardLengthType(
+            base_data_type="A_UINT32",
+            base_type_encoding=None,
+            bit_length=8,
+            bit_mask=None,
+            is_condensed_raw=None,
+            is_highlow_byte_order_raw=None,
         )
 
+        def coded_const(short_name: str, coded_value: int,
+                        byte_position: Optional[int]) -> CodedConstParameter:
+            return CodedConstParameter(
+                short_name=short_name,
+                long_name=None,
+                description=None,
+                semantic=None,
+                diag_coded_type=diag_coded_type,
+                coded_value=coded_value,
+                byte_position=byte_position,
+                bit_position=None,
+                sdgs=[],
+            )
+
+        request = Request(
+            odx_id=OdxLinkId("request_id", doc_frags),
+            short_name="request_sn",
+            long_name=None,
+            description=None,
+            is_visible_raw=None,
+            parameters=[
+                coded_const("SID", 0x31, 0),
+                ReservedParameter(
+                    short_name="reserved",
+                    long_name=None,
+                    description=None,
+                    semantic=None,
+                    bit_length=16,
+                    byte_position=None,
+                    bit_position=None,
+                    sdgs=[],
+                ),
+                # overlaps with the reserved parameter
+                coded_const("overlapping", 0x00, 1),
+                # located after the end of the reserved parameter
+                coded_const("implicit", 0x12, None),
+            ],
+            byte_size=6,
+        )
+        odxlinks = OdxLinkDatabase()
+        odxlinks.update(request._build_odxlinks())
+        request._resolve_references(None, odxlinks)  # type: ignore[arg-type]
+
+        checks = request.admissibility_checks
+        self.assertEqual(checks.constant_bytes, [(0, b"\x31"), (1, b"\x00"), (3, b"\x12")])
+        # messages are padded to the byte size of the structure
+        self.assertEqual((checks.min_length, checks.max_length), (4, 6))
+        self.assertEqual(request.bit_length, 48)
+
+        coded_message = request.encode()
+        self.assertEqual(coded_message, bytes([0x31, 0x00, 0x00, 0x12, 0x00, 0x00]))
+        self.assertTrue(request.is_admissible(coded_message))
+        self.assertTrue(request.is_admissible(coded_message[:4]))
+        self.assertFalse(request.is_admissible(bytes([0x31, 0x00, 0x12, 0x00])))
+
 
 class TestDecoding(unittest.TestCase):
 
@@ -403,16 +583,8 @@ class TestDecoding(unittest.TestCase):
             sdgs=[],
         )
         diag_layer.finalize_init(odxlinks=odxlinks)
-        self.assertDictEqual(diag_layer._build_coded_prefix_tree(),
-                             {0x12: {
-                                 0x34: {
-                                     0x56: {
-                                         0x78: {
-                                             -1: [service]
-                                         }
-                                     }
-                                 }
-                             }})
+        self.assertDictEqual(diag_layer.service_prefix_trie.leaves,
+                             {bytes([0x12, 0x34, 0x56, 0x78]): [service]})
 
         coded_message = bytes([0x12, 0x34, 0x56, 0x78])
         expected_message = Message(
@@ -790,6 +962,37 @@ class TestDecoding(unittest.TestCase):
         self.assertEqual(expected_message.structure, decoded_message.structure)
         self.assertEqual(expected_message.param_dict, decoded_message.param_dict)
 
+        # decode the items of the field one by one
+        decode_state = DecodeState(bytes([0x12, 0x34, 0x34, 0x34]), [], 1)
+        items = eopf.decode_iter(decode_state)
+        self.assertEqual(next(items), {"struct_param_1": 4, "struct_param_2": 3})
+        self.assertEqual(decode_state.next_byte_position, 2)
+        self.assertEqual(len(list(items)), 2)
+        self.assertEqual(decode_state.next_byte_position, 4)
+
+        # the field can also be streamed from the complete message
+        items = req.decode_iter(bytes([0x12, 0x34, 0x34, 0x34]), "eopf_param")
+        self.assertEqual(next(items), {"struct_param_1": 4, "struct_param_2": 3})
+        self.assertEqual(len(list(items)), 2)
+        self.assertEqual(
+            list(diag_layer.decode_iter(bytes([0x12, 0x34]), "eopf_param")), [{
+                "struct_param_1": 4,
+                "struct_param_2": 3
+            }])
+        self.assertRaises(OdxError, req.decode_iter, coded_message, "SID")
+        self.assertRaises(DecodeError, diag_layer.decode_iter, coded_message, "foo")
+
+        # the number of items is limited by the field
+        eopf.max_number_of_items = 2
+        decode_state = DecodeState(bytes([0x12, 0x34, 0x34, 0x34]), [], 1)
+        self.assertEqual(len(list(eopf.decode_iter(decode_state))), 2)
+        self.assertEqual(decode_state.next_byte_position, 3)
+
+        eopf.min_number_of_items = 2
+        decode_state = DecodeState(bytes([0x12, 0x34]), [], 1)
+        with self.assertRaises(DecodeError):
+            list(eopf.decode_iter(decode_state))
+
     def test_decode_request_linear_compu_method(self):
         odxlinks = OdxLinkDatabase()
 
@@ -1084,6 +1287,161 @@ class TestDecoding(unittest.TestCase):
             self.assertEqual(expected_message.structure, decoded_message.structure)
             self.assertEqual(expected_message.param_dict, decoded_message.param_dict)
 
+    def test_decode_multiplexer(self):
+        odxlinks = OdxLinkDatabase()
+
+        def uint_dop(odx_id: str, bit_length: int) -> DataObjectProperty:
+            result = DataObjectProperty(
+                odx_id=OdxLinkId(odx_id, doc_frags),
+                short_name=odx_id,
+                long_name=None,
+                description=None,
+                is_visible_raw=None,
+                diag_coded_type=StandardLengthType(
+                    base_data_type="A_UINT32",
+                    base_type_encoding=None,
+                    bit_length=bit_length,
+                    bit_mask=None,
+                    is_condensed_raw=None,
+                    is_highlow_byte_order_raw=None,
+                ),
+                physical_type=PhysicalType(DataType.A_UINT32, display_radix=None, precision=None),
+                compu_method=IdenticalCompuMethod(
+                    internal_type="A_UINT32", physical_type="A_UINT32"),
+                unit_ref=None,
+                sdgs=[],
+            )
+            odxlinks.update({result.odx_id: result})
+            return result
+
+        def value_param(short_name: str, dop_id: OdxLinkId,
+                        byte_position: Optional[int]) -> ValueParameter:
+            return ValueParameter(
+                short_name=short_name,
+                long_name=None,
+                description=None,
+                semantic=None,
+                dop_ref=OdxLinkRef.from_id(dop_id),
+                dop_snref=None,
+                physical_default_value_raw=None,
+                byte_position=byte_position,
+                bit_position=None,
+                sdgs=[],
+            )
+
+        def structure(odx_id: str, dop: DataObjectProperty) -> Structure:
+            result = Structure(
+                odx_id=OdxLinkId(odx_id, doc_frags),
+                short_name=odx_id,
+                long_name=None,
+                description=None,
+                is_visible_raw=None,
+                parameters=[value_param(f"{odx_id}_value", dop.odx_id, None)],
+                byte_size=None,
+            )
+            odxlinks.update({result.odx_id: result})
+            return result
+
+        def case(short_name: str, lower_limit: str, upper_limit: str,
+                 struct: Structure) -> MultiplexerCase:
+            return MultiplexerCase(
+                short_name=short_name,
+                long_name=short_name,
+                structure_ref=OdxLinkRef.from_id(struct.odx_id),
+                lower_limit=lower_limit,
+                upper_limit=upper_limit,
+            )
+
+        key_dop = uint_dop("key", 8)
+        struct8 = structure("struct8", uint_dop("uint8", 8))
+        struct16 = structure("struct16", uint_dop("uint16", 16))
+        mux = Multiplexer(
+            odx_id=OdxLinkId("mux", doc_frags),
+            short_name="mux",
+            long_name="mux",
+            byte_position=1,
+            switch_key=MultiplexerSwitchKey(
+                byte_position=0,
+                bit_position=None,
+                dop_ref=OdxLinkRef.from_id(key_dop.odx_id),
+            ),
+            default_case=MultiplexerDefaultCase(
+                short_name="default", long_name="default", structure_ref=None),
+            cases=[
+                # the cases are not sorted, and the first matching
+                # case is used if they overlap
+                case("range", "20", "30", struct8),
+                case("point", "10", "10", struct16),
+                case("small", "0", "9", struct8),
+                case("overlapped", "25", "25", struct16),
+            ],
+        )
+        odxlinks.update({mux.odx_id: mux})
+        params = [
+            CodedConstParameter(
+                short_name="SID",
+                long_name=None,
+                description=None,
+                semantic=None,
+                diag_coded_type=key_dop.diag_coded_type,
+                coded_value=0x12,
+                byte_position=0,
+                bit_position=None,
+                sdgs=[],
+            ),
+            value_param("mux_param", mux.odx_id, 1),
+        ]
+        request = Request(
+            odx_id=OdxLinkId("request", doc_frags),
+            short_name="request",
+            long_name=None,
+            description=None,
+            is_visible_raw=None,
+            parameters=params,
+            byte_size=None,
+        )
+        mux._resolve_references(odxlinks)
+        for struct in [struct8, struct16]:
+            struct._resolve_references(None, odxlinks)  # type: ignore
+        request._resolve_references(None, odxlinks)  # type: ignore
+
+        for coded_message, expected_value in [
+            (bytes([0x12, 0x00, 0x01]), {
+                "small": {
+                    "struct8_value": 0x01
+                }
+            }),
+            (bytes([0x12, 0x0A, 0x12, 0x34]), {
+                "point": {
+                    "struct16_value": 0x1234
+                }
+            }),
+            (bytes([0x12, 0x19, 0x56]), {
+                "range": {
+                    "struct8_value": 0x56
+                }
+            }),
+            (bytes([0x12, 0x0B]), {
+                "default": None
+            }),
+        ]:
+            self.assertEqual(
+                request.decode(coded_message), {
+                    "SID": 0x12,
+                    "mux_param": expected_value
+                })
+
+        self.assertEqual(
+            request.encode(mux_param={"point": {
+                "struct16_value": 0x1234
+            }}), bytes([0x12, 0x0A, 0x12, 0x34]))
+        self.assertEqual(
+            request.encode(mux_param={"range": {
+                "struct8_value": 0x56
+            }}), bytes([0x12, 0x14, 0x56]))
+        with self.assertRaises(EncodeError):
+            request.encode(mux_param={"unknown": {}})
+
     def test_decode_dtc(self):
         odxlinks = OdxLinkDatabase()
         diag_coded_type = StandardLengthType(
@@ -1176,6 +1534,18 @@ class TestDecoding(unittest.TestCase):
         coded_message = bytes([0x12, 0x34])
         decoded_param_dict = pos_response.decode(coded_message)
         self.assertEqual(decoded_param_dict["DTC_Param"], dtc1)
+        self.assertIs(decoded_param_dict["DTC_Param"], dtc1)
+
+        # undocumented trouble codes are decoded to placeholders
+        undocumented_dtc = pos_response.decode(bytes([0x12, 0x78]))["DTC_Param"]
+        self.assertEqual(undocumented_dtc.trouble_code, 0x78)
+        self.assertIsNone(undocumented_dtc.short_name)
+        self.assertIs(pos_response.decode(bytes([0x12, 0x78]))["DTC_Param"], undocumented_dtc)
+
+        # DTCs can be encoded using their short names
+        self.assertEqual(pos_response.encode(DTC_Param="P56_sn"), bytes([0x12, 0x56]))
+        self.assertEqual(pos_response.encode(DTC_Param=dtc1), bytes([0x12, 0x34]))
+        self.assertRaises(EncodeError, pos_response.encode, DTC_Param="P78_sn")
 
 
 class TestDecodingAndEncoding(unittest.TestCase):
@@ -1397,6 +1767,601 @@ class TestDecodingAndEncoding(unittest.TestCase):
 
         self.assertRaises(DecodeError, request.decode, bytes([0x12, 0x34]))
 
+    def test_decode_selected_fields(self):
+        odxlinks = OdxLinkDatabase()
+        uint8_dop = DataObjectProperty(
+            odx_id=OdxLinkId("UINT8_DOP_ID", doc_frags),
+            short_name="UINT8_DOP",
+            long_name=None,
+            description=None,
+            is_visible_raw=None,
+            diag_coded_type=StandardLengthType(
+                base_data_type="A_UINT32",
+                base_type_encoding=None,
+                bit_length=8,
+                bit_mask=None,
+                is_condensed_raw=None,
+                is_highlow_byte_order_raw=None,
+            ),
+            physical_type=PhysicalType(DataType.A_UINT32, display_radix=None, precision=None),
+            compu_method=IdenticalCompuMethod(
+                internal_type=DataType.A_UINT32, physical_type=DataType.A_UINT32),
+            unit_ref=None,
+            sdgs=[],
+        )
+        bytes_dop = DataObjectProperty(
+            odx_id=OdxLinkId("BYTES_DOP_ID", doc_frags),
+            short_name="BYTES_DOP",
+            long_name=None,
+            description=None,
+            is_visible_raw=None,
+            diag_coded_type=LeadingLengthInfoType(
+                base_data_type=DataType.A_BYTEFIELD,
+                bit_length=8,
+                base_type_encoding=None,
+                is_highlow_byte_order_raw=None,
+            ),
+            physical_type=PhysicalType(DataType.A_BYTEFIELD, display_radix=None, precision=None),
+            compu_method=IdenticalCompuMethod(
+                internal_type=DataType.A_BYTEFIELD, physical_type=DataType.A_BYTEFIELD),
+            unit_ref=None,
+            sdgs=[],
+        )
+        odxlinks.update({uint8_dop.odx_id: uint8_dop, bytes_dop.odx_id: bytes_dop})
+
+        constant_param = PhysicalConstantParameter(
+            short_name="constant",
+            long_name=None,
+            description=None,
+            semantic=None,
+            physical_constant_value=0x34,
+            dop_ref=OdxLinkRef.from_id(uint8_dop.odx_id),
+            dop_snref=None,
+            byte_position=None,
+            bit_position=None,
+            sdgs=[],
+        )
+        bytes_param = ValueParameter(
+            short_name="data",
+            long_name=None,
+            description=None,
+            semantic=None,
+            dop_ref=OdxLinkRef.from_id(bytes_dop.odx_id),
+            dop_snref=None,
+            physical_default_value_raw=None,
+            byte_position=None,
+            bit_position=None,
+            sdgs=[],
+        )
+        value_param = ValueParameter(
+            short_name="value",
+            long_name=None,
+            description=None,
+            semantic=None,
+            dop_ref=OdxLinkRef.from_id(uint8_dop.odx_id),
+            dop_snref=None,
+            physical_default_value_raw=None,
+            byte_position=None,
+            bit_position=None,
+            sdgs=[],
+        )
+        request = Request(
+            odx_id=OdxLinkId("request", doc_frags),
+            short_name="Request",
+            long_name=None,
+            description=None,
+            is_visible_raw=None,
+            parameters=[self.parameter_sid, constant_param, bytes_param, value_param],
+            byte_size=None,
+        )
+        for param in [constant_param, bytes_param, value_param]:
+            param._resolve_references(None, odxlinks)  # type: ignore
+
+        coded_message = bytes([0x12, 0x34, 0x02, 0xAB, 0xCD, 0x56])
+        self.assertEqual(
+            dict(request.decode(coded_message)), {
+                "SID": 0x12,
+                "constant": 0x34,
+                "data": bytes([0xAB, 0xCD]),
+                "value": 0x56
+            })
+
+        # the position of the value depends on the length of the
+        # variable-length parameter
+        self.assertEqual(dict(request.decode(coded_message, fields=["value"])), {"value": 0x56})
+        self.assertEqual(
+            dict(request.decode(coded_message, fields=["data", "SID", "unknown"])), {
+                "SID": 0x12,
+                "data": bytes([0xAB, 0xCD])
+            })
+
+        # the physical constant is only checked if it is requested
+        coded_message = bytes([0x12, 0x35, 0x01, 0xAB, 0x56])
+        self.assertEqual(dict(request.decode(coded_message, fields=["value"])), {"value": 0x56})
+        self.assertRaises(DecodeError, request.decode, coded_message, fields=["constant", "value"])
+
+    def test_decode_table_struct(self):
+        odxlinks = OdxLinkDatabase()
+        uint8_dop = DataObjectProperty(
+            odx_id=OdxLinkId("UINT8_DOP_ID", doc_frags),
+            short_name="UINT8_DOP",
+            long_name=None,
+            description=None,
+            is_visible_raw=None,
+            diag_coded_type=StandardLengthType(
+                base_data_type="A_UINT32",
+                base_type_encoding=None,
+                bit_length=8,
+                bit_mask=None,
+                is_condensed_raw=None,
+                is_highlow_byte_order_raw=None,
+            ),
+            physical_type=PhysicalType(DataType.A_UINT32, display_radix=None, precision=None),
+            compu_method=IdenticalCompuMethod(
+                internal_type=DataType.A_UINT32, physical_type=DataType.A_UINT32),
+            unit_ref=None,
+            sdgs=[],
+        )
+        struct_param = ValueParameter(
+            short_name="struct_param",
+            long_name=None,
+            description=None,
+            semantic=None,
+            dop_ref=OdxLinkRef.from_id(uint8_dop.odx_id),
+            dop_snref=None,
+            physical_default_value_raw=None,
+            byte_position=None,
+            bit_position=None,
+            sdgs=[],
+        )
+        struct = Structure(
+            odx_id=OdxLinkId("struct_id", doc_frags),
+            short_name="struct",
+            long_name=None,
+            description=None,
+            is_visible_raw=None,
+            parameters=[struct_param],
+            byte_size=None,
+        )
+        table_rows = [
+            TableRow(
+                odx_id=OdxLinkId(f"table.row_{short_name}", doc_frags),
+                short_name=short_name,
+                long_name=None,
+                description=None,
+                semantic=None,
+                key=key,
+                dop_ref=dop_ref,
+                structure_ref=structure_ref,
+                sdgs=[],
+            ) for short_name, key, dop_ref, structure_ref in [
+                ("value_row", "1", OdxLinkRef.from_id(uint8_dop.odx_id), None),
+                ("struct_row", "2", None, OdxLinkRef.from_id(struct.odx_id)),
+                ("empty_row", "3", None, None),
+            ]
+        ]
+        table = Table(
+            odx_id=OdxLinkId("table", doc_frags),
+            short_name="table",
+            long_name=None,
+            description=None,
+            semantic=None,
+            key_dop_ref=OdxLinkRef.from_id(uint8_dop.odx_id),
+            table_rows=table_rows,
+            table_row_refs=[],
+            sdgs=[],
+        )
+        key_param = TableKeyParameter(
+            odx_id=OdxLinkId("table_key", doc_frags),
+            short_name="key",
+            long_name=None,
+            description=None,
+            semantic=None,
+            table_ref=OdxLinkRef.from_id(table.odx_id),
+            table_snref=None,
+            table_row_ref=None,
+            table_row_snref=None,
+            byte_position=None,
+            bit_position=None,
+            sdgs=[],
+        )
+        table_struct_param = TableStructParameter(
+            short_name="data",
+            long_name=None,
+            description=None,
+            semantic=None,
+            table_key_ref=OdxLinkRef.from_id(key_param.odx_id),
+            table_key_snref=None,
+            byte_position=None,
+            bit_position=None,
+            sdgs=[],
+        )
+        value_param = ValueParameter(
+            short_name="value",
+            long_name=None,
+            description=None,
+            semantic=None,
+            dop_ref=OdxLinkRef.from_id(uint8_dop.odx_id),
+            dop_snref=None,
+            physical_default_value_raw=None,
+            byte_position=None,
+            bit_position=None,
+            sdgs=[],
+        )
+        request = Request(
+            odx_id=OdxLinkId("request", doc_frags),
+            short_name="Request",
+            long_name=None,
+            description=None,
+            is_visible_raw=None,
+            parameters=[self.parameter_sid, key_param, table_struct_param, value_param],
+            byte_size=None,
+        )
+        # the references have not been resolved yet
+        self.assertIsNone(key_param.table)
+        self.assertIsNone(key_param.table_row)
+        self.assertIsNone(key_param.bit_length)
+        self.assertTrue(key_param.is_required())
+        self.assertIsNone(table_struct_param.table_key)
+
+        odxlinks.update({uint8_dop.odx_id: uint8_dop, struct.odx_id: struct, table.odx_id: table})
+        odxlinks.update(table._build_odxlinks())
+        odxlinks.update(request._build_odxlinks())
+        struct._resolve_references(None, odxlinks)  # type: ignore[arg-type]
+        table._resolve_references(odxlinks)
+        request._resolve_references(None, odxlinks)  # type: ignore[arg-type]
+
+        self.assertEqual(table.get_table_row_by_key(2), table_rows[1])
+        self.assertIsNone(table.get_table_row_by_key(4))
+
+        for coded_message, expected_data in [
+            (bytes([0x12, 0x01, 0xAB, 0x56]), ("value_row", 0xAB)),
+            (bytes([0x12, 0x02, 0xAB, 0x56]), ("struct_row", {
+                "struct_param": 0xAB
+            })),
+            (bytes([0x12, 0x03, 0x56]), ("empty_row", None)),
+        ]:
+            self.assertEqual(
+                dict(request.decode(coded_message)), {
+                    "SID": 0x12,
+                    "key": expected_data[0],
+                    "data": expected_data,
+                    "value": 0x56
+                })
+            # the position of the value depends on the selected table row
+            self.assertEqual(dict(request.decode(coded_message, fields=["value"])), {"value": 0x56})
+            self.assertEqual(
+                request.encode(key=expected_data[0], data=expected_data, value=0x56), coded_message)
+
+        self.assertRaises(DecodeError, request.decode, bytes([0x12, 0x04, 0x56]))
+        self.assertRaises(
+            EncodeError, request.encode, key="value_row", data=("struct_row", {}), value=0x56)
+
+        self.assertIs(table_struct_param.table_key, key_param)
+        self.assertEqual(table_struct_param.get_coded_value(("value_row", 0xAB)), 0xAB)
+        self.assertEqual(
+            table_struct_param.get_coded_value(("struct_row", {
+                "struct_param": 0xAB
+            })), bytes([0xAB]))
+        self.assertIsNone(table_struct_param.get_coded_value(("empty_row", None)))
+        self.assertRaises(EncodeError, table_struct_param.get_coded_value, 0xAB)
+
+        # table keys may be referenced by their short name
+        table_struct_param.table_key_ref = None
+        table_struct_param.table_key_snref = "key"
+        request._resolve_references(None, odxlinks)  # type: ignore[arg-type]
+        self.assertIs(table_struct_param.table_key, key_param)
+        self.assertEqual(
+            request.encode(key="value_row", data=("value_row", 0xAB), value=0x56),
+            bytes([0x12, 0x01, 0xAB, 0x56]))
+
+        # a table key which references a table row is not coded
+        key_param.table_ref = None
+        key_param.table_row_ref = OdxLinkRef.from_id(table_rows[0].odx_id)
+        key_param._resolve_references(None, odxlinks)  # type: ignore[arg-type]
+        self.assertEqual(
+            dict(request.decode(bytes([0x12, 0xAB, 0x56]))), {
+                "SID": 0x12,
+                "key": "value_row",
+                "data": ("value_row", 0xAB),
+                "value": 0x56
+            })
+        self.assertEqual(
+            request.encode(data=("value_row", 0xAB), value=0x56), bytes([0x12, 0xAB, 0x56]))
+
+    def test_decode_env_data_desc(self):
+        odxlinks = OdxLinkDatabase()
+        diag_coded_type = StandardLengthType(
+            base_data_type="A_UINT32",
+            base_type_encoding=None,
+            bit_length=8,
+            bit_mask=None,
+            is_condensed_raw=None,
+            is_highlow_byte_order_raw=None,
+        )
+        uint8_dop = DataObjectProperty(
+            odx_id=OdxLinkId("UINT8_DOP_ID", doc_frags),
+            short_name="UINT8_DOP",
+            long_name=None,
+            description=None,
+            is_visible_raw=None,
+            diag_coded_type=diag_coded_type,
+            physical_type=PhysicalType(DataType.A_UINT32, display_radix=None, precision=None),
+            compu_method=IdenticalCompuMethod(
+                internal_type=DataType.A_UINT32, physical_type=DataType.A_UINT32),
+            unit_ref=None,
+            sdgs=[],
+        )
+        dtcs = [
+            DiagnosticTroubleCode(
+                odx_id=OdxLinkId(f"dtc_{trouble_code:x}", doc_frags),
+                short_name=f"P{trouble_code:x}",
+                trouble_code=trouble_code,
+                text=None,
+                display_trouble_code=None,
+                level=None,
+                is_temporary_raw=None,
+                sdgs=[],
+            ) for trouble_code in [0x34, 0x56]
+        ]
+        dtc_dop = DtcDop(
+            odx_id=OdxLinkId("dtc_dop", doc_frags),
+            short_name="dtc_dop",
+            long_name=None,
+            description=None,
+            diag_coded_type=diag_coded_type,
+            linked_dtc_dops=[],
+            physical_type=PhysicalType(DataType.A_UINT32, display_radix=None, precision=None),
+            compu_method=IdenticalCompuMethod(
+                internal_type=DataType.A_UINT32, physical_type=DataType.A_UINT32),
+            unit_ref=None,
+            dtcs_raw=dtcs,
+            is_visible_raw=None,
+            sdgs=[],
+        )
+
+        def value_param(short_name: str, dop_ref: OdxLinkRef) -> ValueParameter:
+            return ValueParameter(
+                short_name=short_name,
+                long_name=None,
+                description=None,
+                semantic=None,
+                dop_ref=dop_ref,
+                dop_snref=None,
+                physical_default_value_raw=None,
+                byte_position=None,
+                bit_position=None,
+                sdgs=[],
+            )
+
+        env_datas = [
+            EnvironmentData(
+                odx_id=OdxLinkId(f"env_data.{short_name}", doc_frags),
+                short_name=short_name,
+                long_name=None,
+                description=None,
+                is_visible_raw=None,
+                parameters=[value_param(param_name, OdxLinkRef.from_id(uint8_dop.odx_id))],
+                byte_size=None,
+                dtc_values=dtc_values,
+            ) for short_name, param_name, dtc_values in [
+                # environment data which applies to all DTCs
+                ("common", "mileage", []),
+                ("p34", "temperature", [0x34]),
+                ("p12", "voltage", [0x12]),
+            ]
+        ]
+        env_data_desc = EnvironmentDataDescription(
+            odx_id=OdxLinkId("env_data_desc", doc_frags),
+            short_name="env_data_desc",
+            long_name=None,
+            description=None,
+            is_visible_raw=None,
+            param_snref="DTC",
+            param_snpathref=None,
+            env_datas=[],
+            env_data_refs=[OdxLinkRef.from_id(env_data.odx_id) for env_data in env_datas],
+        )
+        response = Response(
+            odx_id=OdxLinkId("response", doc_frags),
+            short_name="response",
+            long_name=None,
+            description=None,
+            is_visible_raw=None,
+            response_type="POS-RESPONSE",
+            parameters=[
+                self.parameter_sid,
+                value_param("DTC", OdxLinkRef.from_id(dtc_dop.odx_id)),
+                value_param("env_data", OdxLinkRef.from_id(env_data_desc.odx_id)),
+            ],
+            byte_size=None,
+        )
+        odxlinks.update({uint8_dop.odx_id: uint8_dop, env_data_desc.odx_id: env_data_desc})
+        odxlinks.update(dtc_dop._build_odxlinks())
+        for env_data in env_datas:
+            odxlinks.update(env_data._build_odxlinks())
+        dtc_dop._resolve_references(odxlinks)
+        for env_data in env_datas:
+            env_data._resolve_references(None, odxlinks)  # type: ignore[arg-type]
+        env_data_desc._resolve_references(None, odxlinks)  # type: ignore[arg-type]
+        response._resolve_references(None, odxlinks)  # type: ignore[arg-type]
+
+        self.assertEqual(env_data_desc.get_env_datas(0x34), env_datas[:2])
+        self.assertEqual(env_data_desc.get_env_datas(0x56), env_datas[:1])
+
+        for coded_message, dtc, expected_env_data in [
+            (bytes([0x12, 0x34, 0x10, 0x20]), dtcs[0], {
+                "mileage": 0x10,
+                "temperature": 0x20
+            }),
+            (bytes([0x12, 0x56, 0x10]), dtcs[1], {
+                "mileage": 0x10
+            }),
+        ]:
+            self.assertEqual(
+                dict(response.decode(coded_message)), {
+                    "SID": 0x12,
+                    "DTC": dtc,
+                    "env_data": expected_env_data
+                })
+            self.assertEqual(response.encode(DTC=dtc, env_data=expected_env_data), coded_message)
+
+            # the DTC parameter is decoded implicitly if only the
+            # environment data is requested
+            self.assertEqual(
+                dict(response.decode(coded_message, fields=["env_data"])),
+                {"env_data": expected_env_data})
+            self.assertEqual(response.accessor("env_data")(coded_message), expected_env_data)
+
+        # the environment data may be repeated until the end of the PDU
+        eopf = EndOfPduField(
+            odx_id=OdxLinkId("eopf", doc_frags),
+            short_name="eopf",
+            long_name=None,
+            description=None,
+            structure_ref=None,
+            structure_snref=None,
+            env_data_desc_ref=OdxLinkRef.from_id(env_data_desc.odx_id),
+            env_data_desc_snref=None,
+            min_number_of_items=None,
+            max_number_of_items=None,
+            is_visible_raw=True,
+        )
+        odxlinks.update({eopf.odx_id: eopf})
+        eopf._resolve_references(None, odxlinks)  # type: ignore[arg-type]
+        response.parameters[2].dop_ref = OdxLinkRef.from_id(eopf.odx_id)
+        response._resolve_references(None, odxlinks)  # type: ignore[arg-type]
+        self.assertEqual(
+            list(response.decode_iter(bytes([0x12, 0x56, 0x10, 0x11]), "env_data")), [{
+                "mileage": 0x10
+            }, {
+                "mileage": 0x11
+            }])
+
+    @unittest.skipIf(np is None, "NumPy is not available")
+    def test_vectorized_layout(self):
+        odxlinks = OdxLinkDatabase()
+
+        def dop(odx_id: str, diag_coded_type: DiagCodedType,
+                compu_method: CompuMethod) -> DataObjectProperty:
+            result = DataObjectProperty(
+                odx_id=OdxLinkId(odx_id, doc_frags),
+                short_name=odx_id,
+                long_name=None,
+                description=None,
+                is_visible_raw=None,
+                diag_coded_type=diag_coded_type,
+                physical_type=PhysicalType(
+                    compu_method.physical_type, display_radix=None, precision=None),
+                compu_method=compu_method,
+                unit_ref=None,
+                sdgs=[],
+            )
+            odxlinks.update({result.odx_id: result})
+            return result
+
+        def value_param(short_name: str, dop: DataObjectProperty, byte_position: Optional[int],
+                        bit_position: Optional[int]) -> ValueParameter:
+            return ValueParameter(
+                short_name=short_name,
+                long_name=None,
+                description=None,
+                semantic=None,
+                dop_ref=OdxLinkRef.from_id(dop.odx_id),
+                dop_snref=None,
+                physical_default_value_raw=None,
+                byte_position=byte_position,
+                bit_position=bit_position,
+                sdgs=[],
+            )
+
+        signed_dop = dop(
+            "signed",
+            StandardLengthType(
+                base_data_type="A_INT32",
+                base_type_encoding=None,
+                bit_length=12,
+                bit_mask=None,
+                is_condensed_raw=None,
+                is_highlow_byte_order_raw=None,
+            ),
+            IdenticalCompuMethod(internal_type="A_INT32", physical_type="A_INT32"),
+        )
+        linear_dop = dop(
+            "linear",
+            StandardLengthType(
+                base_data_type="A_UINT32",
+                base_type_encoding=None,
+                bit_length=24,
+                bit_mask=None,
+                is_condensed_raw=None,
+                is_highlow_byte_order_raw=False,
+            ),
+            LinearCompuMethod(
+                offset=-40,
+                factor=0.5,
+                denominator=1,
+                internal_type="A_UINT32",
+                physical_type="A_FLOAT64",
+                internal_lower_limit=None,
+                internal_upper_limit=Limit(0x100000, IntervalType.OPEN),
+            ),
+        )
+        float_dop = dop(
+            "float",
+            StandardLengthType(
+                base_data_type="A_FLOAT32",
+                base_type_encoding=None,
+                bit_length=32,
+                bit_mask=None,
+                is_condensed_raw=None,
+                is_highlow_byte_order_raw=None,
+            ),
+            IdenticalCompuMethod(internal_type="A_FLOAT32", physical_type="A_FLOAT32"),
+        )
+        params = [
+            self.parameter_sid,
+            value_param("signed", signed_dop, 1, 4),
+            value_param("linear", linear_dop, 3, None),
+            value_param("float", float_dop, None, None),
+        ]
+        request = Request(
+            odx_id=OdxLinkId("request", doc_frags),
+            short_name="Request",
+            long_name=None,
+            description=None,
+            is_visible_raw=None,
+            parameters=params,
+            byte_size=None,
+        )
+        for param in params:
+            param._resolve_references(None, odxlinks)  # type: ignore
+
+        layout = VectorizedLayout.from_structure(request)
+        assert layout is not None
+        self.assertEqual(layout.byte_length, 10)
+
+        coded_messages = [
+            bytes(request.encode(signed=signed, linear=linear, float=0.25))
+            for signed, linear in [(-2048, 0x0), (-1, -40.0), (0, 100.5), (2047, 524247.5)]
+        ]
+        # internal value of the linear parameter outside of its limits
+        coded_messages.append(bytes([0x12, 0x00, 0x00, 0x00, 0x00, 0x10, 0, 0, 0, 0]))
+        # mismatching coded constant
+        coded_messages.append(bytes([0x13]) + coded_messages[0][1:])
+
+        columns, is_valid = layout.decode(coded_messages)
+        self.assertEqual(list(is_valid), [True, True, True, True, False, False])
+        for i, coded_message in enumerate(coded_messages[:4]):
+            param_dict = request.decode(coded_message)
+            for short_name, value in param_dict.items():
+                self.assertEqual(columns[short_name][i], value)
+
+        # structures featuring parameters of variable length cannot be
+        # vectorized
+        request.parameters.append(self.parameter_termination_end_of_pdu)
+        self.assertIsNone(VectorizedLayout.from_structure(request))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -320,6 +320,31 @@ class TestStandardLengthType(unittest.TestCase):
         self.assertEqual(internal, bytes([0x34, 0x56]))
         self.assertEqual(next_byte, 3)
 
+    def test_compiled_formats_are_reused(self):
+        dct = StandardLengthType(
+            base_data_type="A_UINT32",
+            base_type_encoding=None,
+            bit_length=5,
+            bit_mask=None,
+            is_condensed_raw=None,
+            is_highlow_byte_order_raw=None,
+        )
+        for _ in range(3):
+            state = DecodeState(bytes([0x1, 0x72, 0x3]), [], 1)
+            internal, next_byte = dct.convert_bytes_to_internal(state, bit_position=1)
+            self.assertEqual(internal, 25)
+            self.assertEqual(next_byte, 2)
+
+            byte_val = dct.convert_internal_to_bytes(25, EncodeState(bytes(), {}), bit_position=1)
+            self.assertEqual(byte_val, bytes([0x32]))
+
+        # only the format for bit position 1 has been compiled
+        self.assertEqual(list(dct._compiled_formats.keys()), [1])
+
+        byte_val = dct.convert_internal_to_bytes(25, EncodeState(bytes(), {}), bit_position=3)
+        self.assertEqual(byte_val, bytes([0xC8]))
+        self.assertEqual(sorted(dct._compiled_formats.keys()), [1, 3])
+
 
 class TestParamLengthInfoType(unittest.TestCase):
 
@@ -356,6 +381,25 @@ class TestParamLengthInfoType(unittest.TestCase):
         self.assertEqual(internal, 0x1234)
         self.assertEqual(next_byte, 3)
 
+    def test_decode_param_info_length_type_missing_key(self):
+        length_key_id = OdxLinkId("param.length_key", doc_frags)
+        dct = ParamLengthInfoType(
+            base_data_type="A_UINT32",
+            base_type_encoding=None,
+            length_key_id=length_key_id,
+            is_highlow_byte_order_raw=None,
+        )
+        state = DecodeState(bytes([0x10, 0x12, 0x34, 0x56]), [], next_byte_position=1)
+        self.assertRaises(DecodeError, dct.convert_bytes_to_internal, state, bit_position=0)
+
+        # length keys decoded by enclosing structures are shared via the decode state
+        inner_state = DecodeState(
+            bytes([0x12, 0x34, 0x56]), [], next_byte_position=0, length_keys=state.length_keys)
+        state.length_keys[length_key_id] = 8
+        internal, next_byte = dct.convert_bytes_to_internal(inner_state, bit_position=0)
+        self.assertEqual(internal, 0x12)
+        self.assertEqual(next_byte, 1)
+
     def test_encode_param_info_length_type_uint(self):
         length_key_id = OdxLinkId("param.length_key", doc_frags)
         dct = ParamLengthInfoType(
@@ -609,6 +653,51 @@ class TestMinMaxLengthType(unittest.TestCase):
             self.assertEqual(internal, bytes([0x34, 0x56, 0x78]))
             self.assertEqual(next_byte, 4)
 
+    def test_decode_min_max_length_type_unicode2_alignment(self):
+        """The termination character of UTF-16 strings must be aligned to the characters."""
+        dct = MinMaxLengthType(
+            base_data_type="A_UNICODE2STRING",
+            base_type_encoding=None,
+            min_length=2,
+            max_length=None,
+            termination="ZERO",
+            is_highlow_byte_order_raw=None,
+        )
+        # "\u0100\u0041" contains two zero bytes which straddle the
+        # boundary of the characters
+        coded = "\u0100\u0041".encode("utf-16-be") + bytes([0x00, 0x00, 0x12])
+        state = DecodeState(bytes([0x12]) + coded, [], 1)
+        internal, next_byte = dct.convert_bytes_to_internal(state, bit_position=0)
+        self.assertEqual(internal, "\u0100\u0041")
+        self.assertEqual(next_byte, 7)
+
+        # without a termination character, the string ends with the PDU
+        state = DecodeState(bytes([0x12]) + "\u0100\u0041".encode("utf-16-be"), [], 1)
+        internal, next_byte = dct.convert_bytes_to_internal(state, bit_position=0)
+        self.assertEqual(internal, "\u0100\u0041")
+        self.assertEqual(next_byte, 5)
+
+    def test_decode_min_max_length_type_terminations(self):
+        """The termination character is only searched after min length and before max length."""
+        for termination, char in [("ZERO", 0x00), ("HEX-FF", 0xFF)]:
+            dct = MinMaxLengthType(
+                base_data_type="A_BYTEFIELD",
+                base_type_encoding=None,
+                min_length=1,
+                max_length=4,
+                termination=termination,
+                is_highlow_byte_order_raw=None,
+            )
+            state = DecodeState(bytes([0x12, char, 0x34, char, 0x56, char]), [], 1)
+            internal, next_byte = dct.convert_bytes_to_internal(state, bit_position=0)
+            self.assertEqual(internal, bytes([char, 0x34]))
+            self.assertEqual(next_byte, 4)
+
+            state = DecodeState(bytes([0x12, 0x34, 0x56, 0x78, 0x9A, char]), [], 1)
+            internal, next_byte = dct.convert_bytes_to_internal(state, bit_position=0)
+            self.assertEqual(internal, bytes([0x34, 0x56, 0x78, 0x9A]))
+            self.assertEqual(next_byte, 5)
+
     def test_encode_min_max_length_type_hex_ff(self):
         dct = MinMaxLengthType(
             base_data_type="A_BYTEFIELD",
@@ -1,50 +1,140 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2023 MBition GmbH
 
-import json
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List
 
 import pytest
 
+from odxtools.compumethods import IdenticalCompuMethod
+from odxtools.dataobjectproperty import DataObjectProperty
+from odxtools.diagcodedtypes import DiagCodedType, MinMaxLengthType, StandardLengthType
 from odxtools.diaglayer import DiagLayer
 from odxtools.diaglayertype import DIAG_LAYER_TYPE
 from odxtools.ecu_variant_matcher import EcuVariantMatcher
 from odxtools.ecu_variant_patterns import EcuVariantPattern, MatchingParameter
 from odxtools.exceptions import OdxError
-from odxtools.odxlink import OdxDocFragment, OdxLinkDatabase, OdxLinkId
+from odxtools.message import Message
+from odxtools.odxlink import OdxDocFragment, OdxLinkDatabase, OdxLinkId, OdxLinkRef
+from odxtools.odxtypes import DataType
+from odxtools.parameters import ValueParameter
+from odxtools.physicaltype import PhysicalType
 from odxtools.service import DiagService
-from odxtools.structures import Request, Response
+from odxtools.structures import Request, Response, Structure
 
 doc_frags = [OdxDocFragment(doc_name="pytest", doc_type="WinneThePoh")]
 
 odxlinks = OdxLinkDatabase()
 
 
+def make_dop(short_name: str, diag_coded_type: DiagCodedType,
+             data_type: DataType) -> DataObjectProperty:
+    dop = DataObjectProperty(
+        odx_id=OdxLinkId(local_id=short_name, doc_fragments=doc_frags),
+        short_name=short_name,
+        long_name=None,
+        description=None,
+        is_visible_raw=None,
+        diag_coded_type=diag_coded_type,
+        physical_type=PhysicalType(data_type, display_radix=None, precision=None),
+        compu_method=IdenticalCompuMethod(
+            internal_type=diag_coded_type.base_data_type, physical_type=data_type),
+        unit_ref=None,
+        sdgs=[],
+    )
+    odxlinks.update({dop.odx_id: dop})
+    return dop
+
+
+def make_value_param(short_name: str, dop_id: OdxLinkId) -> ValueParameter:
+    return ValueParameter(
+        short_name=short_name,
+        long_name=None,
+        description=None,
+        semantic=None,
+        dop_ref=OdxLinkRef.from_id(dop_id),
+        dop_snref=None,
+        physical_default_value_raw=None,
+        byte_position=0,
+        bit_position=None,
+        sdgs=[],
+    )
+
+
 @pytest.fixture
-def dummy_response(monkeypatch: pytest.MonkeyPatch) -> Response:
+def ident_response() -> Response:
+    # the response consists of a two byte identifier
+    id_dop = make_dop(
+        "id_dop",
+        StandardLengthType(
+            base_data_type="A_UINT32",
+            base_type_encoding=None,
+            bit_length=16,
+            bit_mask=None,
+            is_condensed_raw=None,
+            is_highlow_byte_order_raw=None,
+        ),
+        DataType.A_UINT32,
+    )
     resp = Response(
-        odx_id=OdxLinkId(local_id="dummy_resp", doc_fragments=doc_frags),
-        short_name="dummy_resp",
+        odx_id=OdxLinkId(local_id="ident_resp", doc_fragments=doc_frags),
+        short_name="ident_resp",
         long_name=None,
         description=None,
         is_visible_raw=None,
-        parameters=[],
+        parameters=[make_value_param("id", id_dop.odx_id)],
         response_type="POS-RESPONSE",
         byte_size=None,
     )
     odxlinks.update({resp.odx_id: resp})
+    resp._resolve_references(None, odxlinks)  # type: ignore[arg-type]
+    return resp
+
 
-    def decode(message: Union[bytes, bytearray]):
-        msg_str = message.decode(encoding="utf-8")
-        msg_dict = json.loads(msg_str)
-        return msg_dict
+@pytest.fixture
+def supplier_response() -> Response:
+    # the response consists of a structure which contains the
+    # english name of the supplier
+    name_dop = make_dop(
+        "name_dop",
+        MinMaxLengthType(
+            base_data_type="A_ASCIISTRING",
+            base_type_encoding=None,
+            min_length=0,
+            max_length=None,
+            termination="END-OF-PDU",
+            is_highlow_byte_order_raw=None,
+        ),
+        DataType.A_UNICODE2STRING,
+    )
+    name_struct = Structure(
+        odx_id=OdxLinkId(local_id="name_struct", doc_fragments=doc_frags),
+        short_name="name_struct",
+        long_name=None,
+        description=None,
+        is_visible_raw=None,
+        parameters=[make_value_param("english", name_dop.odx_id)],
+        byte_size=None,
+    )
+    odxlinks.update({name_struct.odx_id: name_struct})
+    name_struct._resolve_references(None, odxlinks)  # type: ignore[arg-type]
 
-    monkeypatch.setattr(resp, "decode", decode)
+    resp = Response(
+        odx_id=OdxLinkId(local_id="supplier_resp", doc_fragments=doc_frags),
+        short_name="supplier_resp",
+        long_name=None,
+        description=None,
+        is_visible_raw=None,
+        parameters=[make_value_param("name", name_struct.odx_id)],
+        response_type="POS-RESPONSE",
+        byte_size=None,
+    )
+    odxlinks.update({resp.odx_id: resp})
+    resp._resolve_references(None, odxlinks)  # type: ignore[arg-type]
     return resp
 
 
 @pytest.fixture()
-def ident_service(monkeypatch, dummy_response: Response) -> DiagService:
+def ident_service(monkeypatch, ident_response: Response) -> DiagService:
     dummy_req = Request(
         odx_id=OdxLinkId(local_id="dummy_req", doc_fragments=doc_frags),
         short_name="dummy_req",
@@ -68,7 +158,7 @@ def ident_service(monkeypatch, dummy_response: Response) -> DiagService:
         pre_condition_state_refs=[],
         state_transition_refs=[],
         request=dummy_req,
-        positive_responses=[dummy_response],
+        positive_responses=[ident_response],
         negative_responses=[],
         sdgs=[],
     )
@@ -81,7 +171,7 @@ def ident_service(monkeypatch, dummy_response: Response) -> DiagService:
 
 
 @pytest.fixture
-def supplier_service(monkeypatch, dummy_response: Response) -> DiagService:
+def supplier_service(monkeypatch, supplier_response: Response) -> DiagService:
     dummy_req = Request(
         odx_id=OdxLinkId(local_id="dummy_req", doc_fragments=doc_frags),
         short_name="dummy_req",
@@ -105,7 +195,7 @@ def supplier_service(monkeypatch, dummy_response: Response) -> DiagService:
         pre_condition_state_refs=[],
         state_transition_refs=[],
         request=dummy_req,
-        positive_responses=[dummy_response],
+        positive_responses=[supplier_response],
         negative_responses=[],
         sdgs=[],
     )
@@ -267,7 +357,10 @@ def ecu_variants(ecu_variant_1: DiagLayer, ecu_variant_2: DiagLayer,
 
 
 def as_bytes(dikt: Dict[str, Any]) -> bytes:
-    return bytes(json.dumps(dikt), "utf-8")
+    """Encode the response of the ident service or the supplier service"""
+    if "id" in dikt:
+        return int(dikt["id"]).to_bytes(2, "big")
+    return dikt["name"]["english"].encode("ascii")
 
 
 @pytest.mark.parametrize("use_cache", [True, False])
@@ -403,11 +496,15 @@ def test_request_loop_idempotency(ecu_variants: List[DiagLayer], use_cache: bool
 
 @pytest.mark.parametrize("use_cache", [True, False])
 def test_unresolvable_snpathref(ecu_variants: List[DiagLayer], use_cache: bool):
+    # the snpathref cannot be resolved, because id is not a struct
+    ecu_variants[0].ecu_variant_patterns[0].matching_parameters[0].out_param_if = "id.english"
+
     # stores the responses for each request for the ecu-under-test
     req_resp_mapping = {
         b"\x22\x10\00": as_bytes({"id": 1000}),
-        # the snpathref cannot be resolved, because name is not a struct
-        b"\x22\x20\00": as_bytes({"name": "supplier_C"}),
+        b"\x22\x20\00": as_bytes({"name": {
+            "english": "supplier_C"
+        }}),
     }
 
     matcher = EcuVariantMatcher(
@@ -419,3 +516,26 @@ def test_unresolvable_snpathref(ecu_variants: List[DiagLayer], use_cache: bool):
         for req in matcher.request_loop():
             resp = req_resp_mapping[req]
             matcher.evaluate(resp)
+
+
+def test_parameter_accessor(ident_response: Response, supplier_response: Response):
+    accessor = supplier_response.accessor("name.english")
+    assert supplier_response.accessor("name.english") is accessor
+    assert accessor.is_static
+    assert accessor.parameter.short_name == "english"
+
+    raw_response = as_bytes({"name": {"english": "supplier_A"}})
+    assert accessor(raw_response) == "supplier_A"
+    assert accessor({"name": {"english": "supplier_B"}}) == "supplier_B"
+    message = Message(
+        coded_message=raw_response, service=None, structure=supplier_response, param_dict=None)
+    assert accessor(message) == "supplier_A"
+    assert not message.is_decoded
+    with pytest.raises(ValueError):
+        ident_response.accessor("id")(message)
+
+    # paths are resolved when the accessor is created
+    with pytest.raises(OdxError):
+        supplier_response.accessor("name.german")
+    with pytest.raises(OdxError):
+        ident_response.accessor("id.english")
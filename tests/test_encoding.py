@@ -5,6 +5,7 @@ import unittest
 from odxtools.compumethods import LinearCompuMethod
 from odxtools.dataobjectproperty import DataObjectProperty
 from odxtools.diagcodedtypes import StandardLengthType
+from odxtools.encodestate import EncodeState
 from odxtools.exceptions import EncodeError
 from odxtools.odxlink import OdxDocFragment, OdxLinkDatabase, OdxLinkId, OdxLinkRef
 from odxtools.parameters import CodedConstParameter, NrcConstParameter, ValueParameter
@@ -273,6 +274,25 @@ class TestEncodeRequest(unittest.TestCase):
         self.assertEqual(req.encode(), bytearray([0x12, 0x34, 0x56]))
         self.assertEqual(req.bit_length, 24)
 
+    def test_encode_state(self):
+        state1 = EncodeState(bytearray([0x12]), {})
+        state2 = EncodeState(bytearray([0x12]), {})
+        state1.length_keys[OdxLinkId("length_key", doc_frags)] = 8
+        # the length keys must not be shared between encode states
+        self.assertEqual(state2.length_keys, {})
+
+        # the encode state is advanced in place, but copies can still
+        # be made using the NamedTuple-like API
+        state3 = state1._replace(coded_message=bytearray([0x34]), is_end_of_pdu=True)
+        self.assertEqual(state1.coded_message, bytearray([0x12]))
+        self.assertFalse(state1.is_end_of_pdu)
+        self.assertEqual(state3.coded_message, bytearray([0x34]))
+        self.assertTrue(state3.is_end_of_pdu)
+        self.assertIs(state3.length_keys, state1.length_keys)
+
+        state1.coded_message = bytearray([0x56])
+        self.assertEqual(state1._asdict()["coded_message"], bytearray([0x56]))
+
     def test_issue_70(self):
         self.skipTest("Not fixed yet")
         # see https://github.com/mercedes-benz/odxtools/issues/70
@@ -1,9 +1,19 @@
 # SPDX-License-Identifier: MIT
 # Copyright (c) 2022 MBition GmbH
 import unittest
-
+import warnings
+
+from odxtools.codingpolicy import (FAST, PERMISSIVE, coding_policy, get_coding_policy,
+                                   set_coding_policy)
+from odxtools.dataobjectproperty import DataObjectProperty
+from odxtools.decodecache import DecodeCache
+from odxtools.decodestatistics import DecodeStatistics
+from odxtools.exceptions import DecodeError
 from odxtools.load_pdx_file import load_pdx_file
+from odxtools.messagebatch import np
 from odxtools.odxlink import OdxLinkRef
+from odxtools.requestcorrelation import RequestCorrelationIndex
+from odxtools.uds import NegativeResponseCodes
 
 try:
     from unittest.mock import patch  # type: ignore
@@ -233,6 +243,326 @@ class TestDecode(unittest.TestCase):
         self.assertEqual(m.structure, pos_response)
         self.assertEqual(m.param_dict, {"sid": 0xFA, "num_flips_done": bytearray([0x03])})
 
+    def test_decode_message(self):
+        ecu = odxdb.ecus.somersault_lazy
+        service = ecu.services.do_forward_flips
+        raw_request_message = service(forward_soberness_check=0x12, num_flips=3)
+        pos_response = service.positive_responses.grudging_forward
+        neg_response = service.negative_responses.flips_not_done
+
+        m = service.decode_message(raw_request_message)
+        self.assertEqual(m.structure, service.request)
+
+        m = service.decode_message(pos_response.encode(raw_request_message))
+        self.assertEqual(m.structure, pos_response)
+
+        m = service.decode_message(
+            neg_response.encode(raw_request_message, flips_successfully_done=2))
+        self.assertEqual(m.structure, neg_response)
+        self.assertEqual(m.param_dict["flips_successfully_done"], 2)
+
+        # messages which are shorter than the constant prefixes
+        # cannot be decoded
+        with self.assertRaises(DecodeError):
+            service.decode_message(bytes([0x7F]))
+
+    def test_admissibility_checks(self):
+        ecu = odxdb.ecus.somersault_lazy
+        service = ecu.services.do_forward_flips
+        raw_request_message = service(forward_soberness_check=0x12, num_flips=3)
+        neg_response = service.negative_responses.flips_not_done
+
+        self.assertTrue(neg_response.is_admissible(bytes([0x7F, 0xBA, 0x01, 0x02])))
+        # too short or too long
+        self.assertFalse(neg_response.is_admissible(bytes([0x7F, 0xBA, 0x01])))
+        self.assertFalse(neg_response.is_admissible(bytes([0x7F, 0xBA, 0x01, 0x02, 0x03])))
+        # wrong coded constant
+        self.assertFalse(neg_response.is_admissible(bytes([0x7E, 0xBA, 0x01, 0x02])))
+        # undefined NRC-CONST value
+        self.assertFalse(neg_response.is_admissible(bytes([0x7F, 0xBA, 0x05, 0x02])))
+        # matching request parameter
+        self.assertTrue(
+            neg_response.is_admissible(bytes([0x7F, 0xBA, 0x01, 0x02]), raw_request_message))
+        self.assertFalse(
+            neg_response.is_admissible(bytes([0x7F, 0xBB, 0x01, 0x02]), raw_request_message))
+
+        self.assertTrue(service.is_admissible(bytes([0x7F, 0xBA, 0x01, 0x02])))
+        self.assertFalse(service.is_admissible(bytes([0x7F, 0xBA, 0x05, 0x02])))
+
+        stats = DecodeStatistics()
+        ecu.decode(bytes([0x7F, 0xBA, 0x01, 0x02]), stats=stats)
+        ecu.decode_response(bytes([0x50, 0x00]), bytes([0x10, 0x01]), stats=stats)
+        self.assertEqual(
+            stats, DecodeStatistics(num_messages=2, num_candidates=2, num_pruned=0, num_failed=0))
+
+        # if all candidates are rejected, they are fully decoded
+        # nevertheless because DecodeErrors might be mere warnings
+        with self.assertRaises(DecodeError):
+            ecu.decode(bytes([0x7F, 0xBA, 0x05, 0x02]), stats=stats)
+        self.assertEqual(
+            stats, DecodeStatistics(num_messages=3, num_candidates=3, num_pruned=0, num_failed=1))
+
+    def test_classify_negative_response(self):
+        ecu = odxdb.ecus.somersault_lazy
+        service = ecu.services.do_forward_flips
+        neg_response = service.negative_responses.flips_not_done
+
+        # not a negative response
+        self.assertIsNone(ecu.classify_negative_response(bytes([0x7F, 0xBA])))
+        self.assertIsNone(ecu.classify_negative_response(bytes([0x50, 0x01, 0x02])))
+
+        nr = ecu.classify_negative_response(bytes([0x7F, 0xBA, 0x01, 0x02]))
+        assert nr is not None
+        self.assertEqual(nr.request_sid, 0xBA)
+        self.assertEqual(nr.response_code, 0x01)
+        self.assertIsNone(nr.nrc)
+        self.assertFalse(nr.is_response_pending)
+        self.assertEqual(nr.candidates, [(service, neg_response)])
+
+        # the structured decode is done on demand
+        m = list(nr.decode())[0]
+        self.assertEqual(m.structure, neg_response)
+        self.assertEqual(m.param_dict["flips_successfully_done"], 2)
+
+        # response codes which are not allowed by the NRC-CONST
+        # parameter do not match any negative response
+        nr = ecu.classify_negative_response(bytes([0x7F, 0xBA, 0x78]))
+        assert nr is not None
+        self.assertEqual(nr.nrc, NegativeResponseCodes.ResponsePending)
+        self.assertTrue(nr.is_response_pending)
+        self.assertEqual(nr.candidates, [])
+
+    def test_decode_cache(self):
+        ecu = odxdb.ecus.somersault_lazy
+        service = ecu.services.do_forward_flips
+        raw_request_message = service(forward_soberness_check=0x12, num_flips=3)
+        raw_response_message = service.positive_responses.grudging_forward.encode(
+            raw_request_message)
+
+        cache = DecodeCache(max_size=2)
+        ecu.decode_cache = cache
+        try:
+            messages = ecu.decode(raw_request_message)
+            self.assertEqual((cache.hits, cache.misses, len(cache)), (0, 1, 1))
+
+            # decoding the same telegram again yields the cached objects
+            messages2 = ecu.decode(bytearray(raw_request_message))
+            self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 1, 1))
+            self.assertIs(messages2[0], messages[0])
+
+            # responses are cached separately for each request
+            response = ecu.decode_response(raw_response_message, raw_request_message)
+            self.assertEqual(response[0].param_dict["num_flips_done"], bytes([0x03]))
+            ecu.decode_response(raw_response_message, messages[0])
+            self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 3, 2))
+            self.assertEqual(cache.evictions, 1)
+
+            # failed decodes are not cached
+            with self.assertRaises(DecodeError):
+                ecu.decode(bytes([0xBA, 0x01]))
+            self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 4, 2))
+        finally:
+            ecu.decode_cache = None
+
+        self.assertRaises(ValueError, DecodeCache, max_size=0)
+
+    def test_request_correlation(self):
+        ecu = odxdb.ecus.somersault_lazy
+        service = ecu.services.do_forward_flips
+        raw_request_message = service(forward_soberness_check=0x12, num_flips=3)
+        raw_response_message = service.positive_responses.grudging_forward.encode(
+            raw_request_message)
+
+        index = RequestCorrelationIndex(ecu.service_prefix_trie, max_size=1)
+        self.assertEqual(index.find(raw_request_message), [service])
+        self.assertEqual(index.find(bytearray(raw_request_message)), [service])
+        self.assertEqual((index.hits, index.misses, len(index)), (1, 1, 1))
+        self.assertEqual(index.find(bytes([0x10, 0x00])), [ecu.services.session_start])
+        self.assertEqual((index.hits, index.misses, len(index)), (1, 2, 1))
+        # requests which are not admissible for any service are
+        # correlated with all candidates of the prefix trie
+        self.assertEqual(index.find(bytes([0xBA])), [service])
+        self.assertRaises(ValueError, RequestCorrelationIndex, ecu.service_prefix_trie, max_size=0)
+
+        stats = DecodeStatistics()
+        response = ecu.decode_response(raw_response_message, raw_request_message, stats=stats)
+        self.assertEqual(response[0].param_dict["num_flips_done"], bytes([0x03]))
+        self.assertEqual(
+            stats, DecodeStatistics(num_messages=1, num_candidates=1, num_pruned=0, num_failed=0))
+
+        # given a triggering request, only responses are admissible
+        self.assertTrue(service.is_admissible(raw_request_message))
+        self.assertFalse(service.is_admissible(raw_request_message, raw_request_message))
+
+    def test_coding_policies(self):
+        ecu = odxdb.ecus.somersault_lazy
+        request = ecu.services.session_start.request
+
+        # trailing bytes are reported according to the policy
+        with coding_policy("strict"):
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", DecodeError)
+                self.assertRaises(DecodeError, request.decode, bytes([0x10, 0x00, 0xFF]))
+        with coding_policy(PERMISSIVE):
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always", DecodeError)
+                request.decode(bytes([0x10, 0x00, 0xFF]))
+            self.assertEqual([w.category for w in caught], [DecodeError])
+        with coding_policy(FAST) as policy:
+            self.assertIs(get_coding_policy(), policy)
+            self.assertEqual(request.decode(bytes([0x10, 0x00, 0xFF])), {"sid": 0x10, "odx_id": 0})
+
+            # constant parameters are checked nevertheless
+            self.assertRaises(DecodeError, request.decode, bytes([0x10, 0x01]))
+        self.assertIs(get_coding_policy(), PERMISSIVE)
+
+        # decoded messages are cached separately for each policy
+        ecu.decode_cache = DecodeCache()
+        try:
+            with coding_policy(FAST):
+                self.assertEqual(len(ecu.decode(bytes([0x10, 0x00, 0xFF]))), 1)
+            with coding_policy("strict"):
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", DecodeError)
+                    self.assertRaises(DecodeError, ecu.decode, bytes([0x10, 0x00, 0xFF]))
+            self.assertEqual((ecu.decode_cache.hits, ecu.decode_cache.misses), (0, 2))
+        finally:
+            ecu.decode_cache = None
+
+        self.assertRaises(ValueError, set_coding_policy, "sloppy")
+
+    def test_structure_layout(self):
+        ecu = odxdb.ecus.somersault_lazy
+        neg_response = ecu.services.do_forward_flips.negative_responses.flips_not_done
+
+        layout = neg_response.layout
+        self.assertIs(neg_response.layout, layout)
+        self.assertTrue(layout.is_fixed)
+        self.assertEqual(layout.bit_length, 32)
+        self.assertEqual(neg_response.bit_length, 32)
+        self.assertEqual((layout.min_length, layout.max_length), (4, 4))
+        self.assertEqual([
+            (pl.parameter.short_name, pl.byte_position, pl.bit_length) for pl in layout.parameters
+        ], [("sid", 0, 8), ("rq_sid", 1, 8), ("reason", 2, 8), ("flips_successfully_done", 3, 8)])
+        self.assertIs(layout.parameter_index["reason"].parameter, neg_response.parameters.reason)
+        with self.assertRaises(TypeError):
+            layout.parameter_index["foo"] = layout.parameters[0]  # type: ignore[index]
+
+        self.assertIs(neg_response.parameter_dict(), neg_response.parameter_dict())
+
+    def test_decode_lazy(self):
+        ecu = odxdb.ecus.somersault_lazy
+        service = ecu.services.do_forward_flips
+        raw_request_message = service(forward_soberness_check=0x12, num_flips=3)
+
+        messages = ecu.decode(raw_request_message, lazy=True)
+        self.assertEqual(len(messages), 1)
+        m = messages[0]
+        self.assertEqual(m.structure, service.request)
+        self.assertFalse(m.is_decoded)
+
+        # parameters at fixed positions are decoded individually
+        self.assertTrue(service.request.can_decode_parameter_individually("num_flips"))
+        self.assertEqual(m["num_flips"], 3)
+        self.assertFalse(m.is_decoded)
+
+        # accessing the parameter dict decodes the complete message
+        self.assertEqual(m.param_dict, {
+            "sid": 0xBA,
+            "forward_soberness_check": 0x12,
+            "num_flips": 3
+        })
+        self.assertTrue(m.is_decoded)
+
+        pos_response = service.positive_responses.grudging_forward
+        raw_response_message = pos_response.encode(raw_request_message)
+        m = ecu.decode_response(raw_response_message, raw_request_message, lazy=True)[0]
+        self.assertFalse(m.is_decoded)
+        self.assertEqual(m["num_flips_done"], bytes([0x03]))
+
+    def test_decode_selected_fields(self):
+        ecu = odxdb.ecus.somersault_lazy
+        service = ecu.services.do_forward_flips
+        raw_request_message = service(forward_soberness_check=0x12, num_flips=3)
+
+        messages = ecu.decode(raw_request_message, fields=["num_flips"])
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0].structure, service.request)
+        self.assertEqual(messages[0].param_dict, {"num_flips": 3})
+
+        raw_response_message = service.positive_responses.grudging_forward.encode(
+            raw_request_message)
+        messages = ecu.decode_response(raw_response_message, raw_request_message, fields=("sid",))
+        self.assertEqual(messages[0].param_dict, {"sid": 0xFA})
+
+    def test_decode_batch(self):
+        ecu = odxdb.ecus.somersault_lazy
+        service = ecu.services.do_forward_flips
+        coded_messages = [
+            service(forward_soberness_check=0x12, num_flips=num_flips) for num_flips in range(3)
+        ]
+        coded_messages.insert(1, bytes([0x7F, 0xBA, 0x00, 0x01]))
+        # messages which cannot be decoded do not abort the batch
+        coded_messages.append(bytes([0xBA, 0x12]))
+
+        batches, failures = ecu.decode_batch(coded_messages)
+        self.assertEqual([(batch.structure.short_name, batch.indices) for batch in batches],
+                         [("do_forward_flips", [0, 2, 3]), ("flips_not_done", [1])])
+        self.assertEqual(list(failures), [4])
+        self.assertIsInstance(failures[4], DecodeError)
+        self.assertIs(service.request.vectorized_layout, service.request.vectorized_layout)
+
+        # the vectorized path is only available if NumPy is installed
+        self.assertEqual(batches[0].is_vectorized, np is not None)
+        self.assertEqual(list(batches[0].columns["num_flips"]), [0, 1, 2])
+        self.assertEqual(list(batches[0].columns["forward_soberness_check"]), [0x12] * 3)
+        self.assertFalse(batches[1].is_vectorized)
+        self.assertEqual(batches[1].columns, {
+            "sid": [0x7F],
+            "rq_sid": [bytes([0xBA])],
+            "reason": [0],
+            "flips_successfully_done": [1],
+        })
+
+    def test_conversion_tables(self):
+        ecu = odxdb.ecus.somersault_lazy
+        telegrams = []
+        for service_name, rq_params, rsp_params in [
+            ("session_start", {}, {
+                "can_do_backward_flips": "true"
+            }),
+            ("report_status", {}, {
+                "dizzyness_level": 42,
+                "happiness_level": 100
+            }),
+        ]:
+            service = ecu.services[service_name]
+            request = service(**rq_params)
+            response = service.positive_responses[0].encode(request, **rsp_params)
+            telegrams.append((request, response))
+
+        expected = [ecu.decode_response(response, request) for request, response in telegrams]
+
+        # the budget is respected
+        self.assertEqual(ecu.build_conversion_tables(max_entries=255), 0)
+        self.assertFalse(ecu.data_object_properties.boolean.has_conversion_table)
+
+        try:
+            self.assertEqual(ecu.build_conversion_tables(), 7)
+            self.assertTrue(ecu.data_object_properties.boolean.has_conversion_table)
+            for (request, response), expected_messages in zip(telegrams, expected):
+                self.assertEqual([m.param_dict for m in ecu.decode_response(response, request)],
+                                 [m.param_dict for m in expected_messages])
+
+            # invalid internal values still raise the regular error
+            invalid_response = bytes([0x50, 0x03])
+            with self.assertRaises(DecodeError):
+                ecu.decode_response(invalid_response, telegrams[0][0])
+        finally:
+            for dop in ecu.data_object_properties:
+                if isinstance(dop, DataObjectProperty):
+                    dop.clear_conversion_table()
+
 
 class TestNavigation(unittest.TestCase):
 